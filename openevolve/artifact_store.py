@@ -0,0 +1,448 @@
+"""
+Content-addressed artifact store
+
+Artifact contents are compressed and stored once per distinct content, as blobs named by
+their SHA-256 hash, so the identical stderr or traceback of thousands of programs takes
+the space of one. Each program has a small JSON manifest mapping its artifact names to
+blob hashes. Blobs are compressed with zstd when the zstandard package is installed and
+with zlib otherwise; the codec is detected when reading, so stores written with either
+can be read back.
+
+Layout under the store directory:
+
+    manifests/<program_id>.json
+    blobs/<first two hash characters>/<hash>
+"""
+
+import codecs
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_DIR = "manifests"
+BLOB_DIR = "blobs"
+
+# Magic number at the start of every zstd frame
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def compress(data: bytes, level: int = 3) -> bytes:
+    """Compress data with zstd if available, otherwise zlib"""
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def decompress(data: bytes) -> bytes:
+    """Decompress data written by compress(), whichever codec was used"""
+    if data.startswith(ZSTD_MAGIC):
+        if zstandard is None:
+            raise RuntimeError("Artifact blob is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class _ZlibReader:
+    """File-like reader decompressing a zlib stream only as far as it is read"""
+
+    def __init__(self, f: BinaryIO, chunk_size: int = 16 * 1024):
+        self._file = f
+        self._chunk_size = chunk_size
+        self._decompressor = zlib.decompressobj()
+        self._buffer = b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            data = self._buffer + self._decompressor.decompress(
+                self._decompressor.unconsumed_tail + self._file.read()
+            )
+            self._buffer = b""
+            return data + self._decompressor.flush()
+
+        while len(self._buffer) < size and not self._decompressor.eof:
+            chunk = self._decompressor.unconsumed_tail or self._file.read(self._chunk_size)
+            if not chunk:
+                break
+            self._buffer += self._decompressor.decompress(chunk, size - len(self._buffer))
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+def read_text_prefix(stream: Any, max_chars: int) -> bytes:
+    """
+    Read only as many bytes as the first max_chars characters of UTF-8 text need
+
+    Args:
+        stream: Binary stream supporting read(size)
+        max_chars: Number of characters to read (invalid bytes count as one each)
+
+    Returns:
+        Bytes read, holding at least max_chars characters unless the stream ended
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    chunks = []
+    chars = 0
+    while chars < max_chars:
+        # Every character takes at least one byte, so this never reads past max_chars
+        chunk = stream.read(max_chars - chars)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        chars += len(decoder.decode(chunk))
+    return b"".join(chunks)
+
+
+class ArtifactStore:
+    """
+    Deduplicating, compressed storage of program artifacts with garbage collection
+    """
+
+    def __init__(self, path: str, compression_level: int = 3):
+        self.path = path
+        self.compression_level = compression_level
+        os.makedirs(os.path.join(path, MANIFEST_DIR), exist_ok=True)
+        os.makedirs(os.path.join(path, BLOB_DIR), exist_ok=True)
+
+        # Serializes writes with garbage collection, so a blob is never collected between
+        # being written and being referenced by its manifest
+        self._lock = threading.Lock()
+        self._gc_thread: Optional[threading.Thread] = None
+        self._gc_stop = threading.Event()
+
+    @staticmethod
+    def is_store(path: str) -> bool:
+        """Check whether a directory is an artifact store"""
+        return os.path.isdir(os.path.join(path, MANIFEST_DIR))
+
+    def _manifest_path(self, program_id: str) -> str:
+        return os.path.join(self.path, MANIFEST_DIR, f"{program_id}.json")
+
+    def _blob_path(self, content_hash: str) -> str:
+        return os.path.join(self.path, BLOB_DIR, content_hash[:2], content_hash)
+
+    def has(self, program_id: str) -> bool:
+        """Check whether a program has a manifest"""
+        return os.path.exists(self._manifest_path(program_id))
+
+    def _read_manifest(self, program_id: str) -> Dict[str, Dict[str, Union[str, int, bool]]]:
+        """Artifact entries of a program's manifest (empty if it has none)"""
+        try:
+            with open(self._manifest_path(program_id), "r") as f:
+                return json.load(f)["artifacts"]
+        except FileNotFoundError:
+            return {}
+
+    def _write_blob(self, data: bytes) -> Tuple[str, int]:
+        """
+        Store content unless it is already present
+
+        Returns:
+            Hash of the content and the number of bytes written (0 if deduplicated)
+        """
+        content_hash = hashlib.sha256(data).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        if os.path.exists(blob_path):
+            # Refresh the modification time so the blob counts as recently used
+            os.utime(blob_path)
+            return content_hash, 0
+
+        compressed = compress(data, self.compression_level)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        tmp_path = f"{blob_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, blob_path)
+        return content_hash, len(compressed)
+
+    def put(self, program_id: str, artifacts: Dict[str, Union[str, bytes]]) -> int:
+        """
+        Store artifacts of a program, adding to any it already has
+
+        Args:
+            program_id: ID of the program
+            artifacts: Dictionary of artifact name to content
+
+        Returns:
+            Number of compressed bytes written (content already in the store is free)
+        """
+        written = 0
+        with self._lock:
+            entries = self._read_manifest(program_id)
+            for key, value in artifacts.items():
+                binary = isinstance(value, bytes)
+                data = value if binary else str(value).encode("utf-8")
+                content_hash, size = self._write_blob(data)
+                entries[key] = {"hash": content_hash, "size": len(data), "binary": binary}
+                written += size
+
+            manifest = {"program_id": program_id, "created": time.time(), "artifacts": entries}
+            manifest_path = self._manifest_path(program_id)
+            tmp_path = f"{manifest_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, manifest_path)
+
+        logger.debug(
+            f"Stored {len(artifacts)} artifacts for program {program_id} "
+            f"({written} new compressed bytes)"
+        )
+        return written
+
+    def _open_blob(self, f: BinaryIO) -> Any:
+        """Stream decompressing an open blob file"""
+        magic = f.read(len(ZSTD_MAGIC))
+        f.seek(0)
+        if magic == ZSTD_MAGIC:
+            if zstandard is None:
+                raise RuntimeError(
+                    "Artifact blob is zstd-compressed but zstandard is not installed"
+                )
+            return zstandard.ZstdDecompressor().stream_reader(f)
+        return _ZlibReader(f)
+
+    def get(
+        self, program_id: str, max_length: Optional[int] = None
+    ) -> Dict[str, Union[str, bytes]]:
+        """
+        Retrieve the artifacts of a program
+
+        Args:
+            program_id: ID of the program
+            max_length: If set, artifacts longer than this many characters are only read
+                (and decompressed) as far as their first max_length + 1 characters, enough
+                to truncate them for display
+
+        Returns:
+            Dictionary of artifact name to content
+        """
+        artifacts = {}
+        try:
+            entries = self._read_manifest(program_id)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to read artifact manifest of program {program_id}: {e}")
+            return artifacts
+
+        for key, entry in entries.items():
+            try:
+                with open(self._blob_path(entry["hash"]), "rb") as f:
+                    stream = self._open_blob(f)
+                    if max_length is None or entry["size"] <= max_length:
+                        data = stream.read()
+                    else:
+                        data = read_text_prefix(stream, max_length + 1)
+            except Exception as e:
+                logger.warning(f"Failed to read artifact {key} of program {program_id}: {e}")
+                continue
+            if entry.get("binary"):
+                artifacts[key] = data
+            else:
+                artifacts[key] = data.decode("utf-8", errors="ignore" if max_length else "strict")
+        return artifacts
+
+    def delete(self, program_id: str) -> None:
+        """Delete the manifest of a program (its blobs are freed by garbage collection)"""
+        try:
+            os.remove(self._manifest_path(program_id))
+        except FileNotFoundError:
+            pass
+
+    def collect_garbage(
+        self, live_ids: Iterable[str], retention_days: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Delete expired manifests and the blobs no manifest references
+
+        Args:
+            live_ids: IDs of the programs whose artifacts must be kept
+            retention_days: Manifests of other programs are deleted once older than this;
+                None keeps all manifests and only frees unreferenced blobs
+
+        Returns:
+            Number of deleted manifests and deleted blobs
+        """
+        live_ids = set(live_ids)
+        deleted_manifests = 0
+        deleted_blobs = 0
+
+        with self._lock:
+            start = time.time()
+            manifest_dir = os.path.join(self.path, MANIFEST_DIR)
+            referenced: Set[str] = set()
+            for filename in os.listdir(manifest_dir):
+                if not filename.endswith(".json"):
+                    continue
+                program_id = filename[:-5]
+                manifest_path = os.path.join(manifest_dir, filename)
+                try:
+                    age = start - os.path.getmtime(manifest_path)
+                    if (
+                        retention_days is not None
+                        and program_id not in live_ids
+                        and age > retention_days * 86400
+                    ):
+                        os.remove(manifest_path)
+                        deleted_manifests += 1
+                        continue
+                    with open(manifest_path, "r") as f:
+                        entries = json.load(f)["artifacts"]
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Skipping unreadable artifact manifest {manifest_path}: {e}")
+                    continue
+                referenced.update(entry["hash"] for entry in entries.values())
+
+            blob_root = os.path.join(self.path, BLOB_DIR)
+            for prefix in os.listdir(blob_root):
+                prefix_dir = os.path.join(blob_root, prefix)
+                if not os.path.isdir(prefix_dir):
+                    continue
+                for filename in os.listdir(prefix_dir):
+                    if filename in referenced:
+                        continue
+                    blob_path = os.path.join(prefix_dir, filename)
+                    try:
+                        # Blobs written since the scan started (e.g. by another process)
+                        # may belong to a manifest that is not written yet
+                        if os.path.getmtime(blob_path) < start:
+                            os.remove(blob_path)
+                            deleted_blobs += 1
+                    except OSError:
+                        pass
+
+        if deleted_manifests or deleted_blobs:
+            logger.info(
+                f"Artifact garbage collection deleted {deleted_manifests} manifests "
+                f"and {deleted_blobs} blobs"
+            )
+        return deleted_manifests, deleted_blobs
+
+    def start_gc(
+        self,
+        live_ids: Callable[[], Iterable[str]],
+        retention_days: Optional[float],
+        interval: float = 3600.0,
+    ) -> None:
+        """
+        Run garbage collection periodically on a background thread
+
+        Args:
+            live_ids: Returns the IDs of the programs whose artifacts must be kept
+            retention_days: See collect_garbage()
+            interval: Seconds between collections
+        """
+        if self._gc_thread is not None:
+            return
+
+        def run() -> None:
+            while not self._gc_stop.wait(interval):
+                try:
+                    self.collect_garbage(live_ids(), retention_days)
+                except Exception as e:
+                    logger.warning(f"Artifact garbage collection failed: {e}")
+
+        self._gc_thread = threading.Thread(target=run, name="artifact-gc", daemon=True)
+        self._gc_thread.start()
+
+    def stop_gc(self) -> None:
+        """Stop the background garbage collection thread"""
+        if self._gc_thread is None:
+            return
+        self._gc_stop.set()
+        self._gc_thread.join()
+        self._gc_thread = None
+        self._gc_stop.clear()
+
+    def total_size(self) -> int:
+        """Total size of the stored blobs in bytes"""
+        total = 0
+        for root, _, filenames in os.walk(os.path.join(self.path, BLOB_DIR)):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in filenames)
+        return total
+
+
+def artifacts_size(artifacts: Dict[str, Union[str, bytes]]) -> int:
+    """Approximate memory footprint of artifact values in bytes"""
+    return sum(len(value) for value in artifacts.values())
+
+
+class ArtifactCache:
+    """
+    Least-recently-used cache of loaded program artifacts, bounded by their size in bytes
+
+    One form of each program's artifacts is cached: either complete, or truncated to a
+    display length.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: (
+            "OrderedDict[str, Tuple[Optional[int], Dict[str, Union[str, bytes]], int]]"
+        ) = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, program_id: str, max_length: Optional[int] = None
+    ) -> Optional[Dict[str, Union[str, bytes]]]:
+        """
+        Get the cached artifacts of a program, marking them as recently used
+
+        Args:
+            program_id: ID of the program
+            max_length: Display length the artifacts were truncated to (None if complete)
+
+        Returns:
+            Artifacts, or None if not cached in this form
+        """
+        entry = self._entries.get(program_id)
+        if entry is None or entry[0] != max_length:
+            return None
+        self._entries.move_to_end(program_id)
+        return entry[1]
+
+    def put(
+        self,
+        program_id: str,
+        artifacts: Dict[str, Union[str, bytes]],
+        max_length: Optional[int] = None,
+    ) -> None:
+        """Cache the artifacts of a program, evicting the least recently used to fit"""
+        self.discard(program_id)
+        size = artifacts_size(artifacts)
+        if size > self.max_bytes:
+            return
+        self._entries[program_id] = (max_length, artifacts, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, _, evicted_size) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+
+    def discard(self, program_id: str) -> None:
+        """Remove the artifacts of a program if cached"""
+        entry = self._entries.pop(program_id, None)
+        if entry is not None:
+            self.size -= entry[2]
@@ -0,0 +1,253 @@
+"""
+Binary checkpoint index for fast loading of large program databases
+
+A checkpoint stores the code of every program back to back in a blob file, the other
+program fields as a JSON array, and a fixed-width table with one row per program (id,
+parent, island, generation, metrics, code hash and the byte ranges of its code and
+record). The files are memory-mapped when read, so tools that only need a few columns
+never parse the records, and loading a database parses a single JSON document instead
+of opening one file per program.
+"""
+
+import dataclasses
+import json
+import logging
+import mmap
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.npy"
+BLOB_FILE = "programs.blob"
+RECORDS_FILE = "records.json"
+SKETCH_FILE = "sketches.npy"
+
+# Prefix of the index columns holding metric values
+METRIC_PREFIX = "metric:"
+
+
+def write_checkpoint_index(
+    path: str,
+    programs: Iterable[Any],
+    islands: Dict[str, int],
+    sketches: Optional[Dict[str, np.ndarray]] = None,
+    code_hashes: Optional[Dict[str, str]] = None,
+    fsync: bool = False,
+) -> None:
+    """
+    Write the programs of a database as an index, code blob, records and sketches
+
+    Args:
+        path: Directory to write to
+        programs: Programs to write
+        islands: Island of each program ID (programs not on an island get -1)
+        sketches: MinHash sketches by program ID, persisted so they need not be recomputed
+        code_hashes: Hashes of the normalized code by program ID
+        fsync: Whether to force the files to stable storage
+    """
+    programs = list(programs)
+    sketches = sketches or {}
+    code_hashes = code_hashes or {}
+
+    # Shallow field dictionaries serialize like Program.to_dict() without its deep copies
+    field_names = [f.name for f in dataclasses.fields(programs[0])] if programs else []
+    field_names = [name for name in field_names if name != "code"]
+    codes = [program.code.encode("utf-8") for program in programs]
+    records = [
+        json.dumps({name: getattr(program, name) for name in field_names}).encode("utf-8")
+        for program in programs
+    ]
+    metric_names = sorted(
+        {
+            name
+            for program in programs
+            for name, value in program.metrics.items()
+            if isinstance(value, (int, float))
+        }
+    )
+    id_width = max([len(program.id.encode("utf-8")) for program in programs] + [1])
+    dtype = [
+        ("id", f"S{id_width}"),
+        ("parent_id", f"S{id_width}"),
+        ("island", "i4"),
+        ("generation", "i4"),
+        ("iteration_found", "i4"),
+        ("timestamp", "f8"),
+        ("code_offset", "i8"),
+        ("code_length", "i8"),
+        ("record_offset", "i8"),
+        ("record_length", "i8"),
+        ("code_hash", "S64"),
+    ] + [(METRIC_PREFIX + name, "f8") for name in metric_names]
+
+    code_lengths = np.array([len(code) for code in codes], dtype=np.int64)
+    record_lengths = np.array([len(record) for record in records], dtype=np.int64)
+    table = np.zeros(len(programs), dtype=dtype)
+    table["id"] = [program.id.encode("utf-8") for program in programs]
+    table["parent_id"] = [(program.parent_id or "").encode("utf-8") for program in programs]
+    table["island"] = [islands.get(program.id, -1) for program in programs]
+    table["generation"] = [program.generation for program in programs]
+    table["iteration_found"] = [program.iteration_found for program in programs]
+    table["timestamp"] = [program.timestamp for program in programs]
+    table["code_offset"] = np.cumsum(code_lengths) - code_lengths
+    table["code_length"] = code_lengths
+    # Records are written as a JSON array: after the opening "[", each record is preceded
+    # by the records before it and one "," separator per record
+    table["record_offset"] = np.cumsum(record_lengths) - record_lengths + np.arange(len(records))
+    table["record_offset"] += 1
+    table["record_length"] = record_lengths
+    table["code_hash"] = [code_hashes.get(program.id, "").encode("ascii") for program in programs]
+    for name in metric_names:
+        table[METRIC_PREFIX + name] = [
+            _metric_value(program.metrics.get(name)) for program in programs
+        ]
+
+    _write_bytes(os.path.join(path, BLOB_FILE), codes, fsync)
+    _write_bytes(os.path.join(path, RECORDS_FILE), [b"[", b",".join(records), b"]"], fsync)
+
+    # Sketches are stored row-aligned with the index; rows without one are left at zero
+    sketch_rows = [sketches.get(program.id) for program in programs]
+    sketch_size = next((len(sketch) for sketch in sketch_rows if sketch is not None), 0)
+    if sketch_size:
+        sketch_table = np.zeros((len(programs), sketch_size), dtype=np.uint64)
+        for row, sketch in enumerate(sketch_rows):
+            if sketch is not None and len(sketch) == sketch_size:
+                sketch_table[row] = sketch
+        _save_array(os.path.join(path, SKETCH_FILE), sketch_table, fsync)
+
+    # The index goes last: a directory with an index has complete data files
+    _save_array(os.path.join(path, INDEX_FILE), table, fsync)
+
+
+def _metric_value(value: Any) -> float:
+    """Index value of a metric (NaN if missing or not numeric)"""
+    return float(value) if isinstance(value, (int, float)) else np.nan
+
+
+def _write_bytes(path: str, chunks: List[bytes], fsync: bool) -> None:
+    """Write chunks of bytes to a file"""
+    with open(path, "wb") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _save_array(path: str, array: np.ndarray, fsync: bool) -> None:
+    """Save an array in .npy format"""
+    with open(path, "wb") as f:
+        np.save(f, array)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _map_file(f: Any) -> Any:
+    """Memory-map an open file for reading (empty files cannot be mapped)"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class CheckpointIndex:
+    """
+    Read-only, memory-mapped view of a checkpoint index
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        index_path = os.path.join(path, INDEX_FILE)
+        try:
+            self.table = np.load(index_path, mmap_mode="r")
+        except ValueError:  # Empty arrays cannot be memory-mapped
+            self.table = np.load(index_path)
+
+        self._files = [
+            open(os.path.join(path, BLOB_FILE), "rb"),
+            open(os.path.join(path, RECORDS_FILE), "rb"),
+        ]
+        self._blob, self._records = [_map_file(f) for f in self._files]
+
+        self.sketches = None
+        sketch_path = os.path.join(path, SKETCH_FILE)
+        if os.path.exists(sketch_path) and len(self.table):
+            self.sketches = np.load(sketch_path, mmap_mode="r")
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a directory contains a checkpoint index"""
+        return all(
+            os.path.exists(os.path.join(path, name))
+            for name in (INDEX_FILE, BLOB_FILE, RECORDS_FILE)
+        )
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    @property
+    def metric_names(self) -> List[str]:
+        """Names of the metrics with an index column"""
+        return [
+            name[len(METRIC_PREFIX) :]
+            for name in self.table.dtype.names
+            if name.startswith(METRIC_PREFIX)
+        ]
+
+    def ids(self) -> List[str]:
+        """Program IDs, in row order"""
+        return [value.decode("utf-8") for value in self.table["id"].tolist()]
+
+    def metrics(self, row: int) -> Dict[str, float]:
+        """Numeric metrics of a program, read from the index without parsing its record"""
+        entry = self.table[row]
+        metrics = {}
+        for name in self.metric_names:
+            value = float(entry[METRIC_PREFIX + name])
+            if not np.isnan(value):
+                metrics[name] = value
+        return metrics
+
+    def code(self, row: int) -> str:
+        """Code of a program"""
+        offset = int(self.table["code_offset"][row])
+        length = int(self.table["code_length"][row])
+        return self._blob[offset : offset + length].decode("utf-8")
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Full program dictionary (as from Program.to_dict) of a row"""
+        offset = int(self.table["record_offset"][row])
+        length = int(self.table["record_length"][row])
+        record = json.loads(self._records[offset : offset + length])
+        record["code"] = self.code(row)
+        return record
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over the program dictionaries of all rows"""
+        records = json.loads(self._records[:]) if len(self.table) else []
+        offsets = self.table["code_offset"].tolist()
+        lengths = self.table["code_length"].tolist()
+        for record, offset, length in zip(records, offsets, lengths):
+            record["code"] = self._blob[offset : offset + length].decode("utf-8")
+            yield record
+
+    def code_hashes(self) -> List[Optional[str]]:
+        """Hashes of the normalized program code (None where not stored), in row order"""
+        return [value.decode("ascii") or None for value in self.table["code_hash"].tolist()]
+
+    def close(self) -> None:
+        """Release the memory maps"""
+        for mapped in (self._blob, self._records):
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self) -> "CheckpointIndex":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,110 @@
+"""
+Background checkpoint writer for OpenEvolve
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def write_file(path: str, data: str, fsync: bool = False) -> None:
+    """
+    Write a text file, optionally forcing it to stable storage
+
+    Args:
+        path: File path
+        data: File contents
+        fsync: Whether to fsync the file before returning
+    """
+    with open(path, "w") as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def fsync_dir(path: str) -> None:
+    """Force the entries of a directory (e.g. after a rename) to stable storage"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:  # Directories cannot be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CheckpointWriter:
+    """
+    Runs checkpoint writes on a background thread
+
+    Checkpoints are taken as in-memory snapshots by the caller and written here, so the
+    evolution loop does not wait on serialization and disk I/O. At most max_pending
+    writes are in flight (queued or running); submitting another one blocks until the
+    oldest has finished, which keeps memory bounded when writes fall behind.
+    """
+
+    def __init__(self, max_pending: int = 1):
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Process queued writes until the stop sentinel is received"""
+        while True:
+            write = self._queue.get()
+            try:
+                if write is None:
+                    return
+                write()
+            except BaseException as e:
+                logger.error(f"Error writing checkpoint: {str(e)}")
+                if self._error is None:
+                    self._error = e
+            finally:
+                if write is not None:
+                    self._slots.release()
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        """Re-raise the first error of a background write in the calling thread"""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("A checkpoint failed to write") from error
+
+    def submit(self, write: Callable[[], None]) -> None:
+        """
+        Queue a write, waiting if too many writes are still in progress
+
+        Args:
+            write: Function performing the write; it must only use snapshotted state
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Previous checkpoint is still being written; waiting for it")
+            start = time.time()
+            self._slots.acquire()
+            logger.info(f"Waited {time.time() - start:.2f}s for the checkpoint writer")
+        self._queue.put(write)
+
+    def flush(self) -> None:
+        """Wait until all queued writes have finished, raising if any of them failed"""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Finish all queued writes and stop the background thread"""
+        if not self._thread.is_alive():
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_error()
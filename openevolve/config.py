@@ -120,6 +120,17 @@ class PromptConfig:
     num_top_programs: int = 3
     num_diverse_programs: int = 2
 
+    # Section order of user prompts: "default", or "cache_friendly" (stable sections
+    # first, so consecutive prompts share a prefix that provider prompt caches can reuse)
+    prompt_layout: str = "default"
+
+    # Token budget of system + user prompt; optional sections (artifacts, top programs,
+    # previous attempts, diverse programs) are packed by value until it is used up
+    max_prompt_tokens: Optional[int] = None
+
+    # Number of programs whose prompt renderings (snippets, formatted metrics) are cached
+    render_cache_size: int = 1024
+
     # Template stochasticity
     use_template_stochasticity: bool = True
     template_variations: Dict[str, List[str]] = field(default_factory=dict)
@@ -147,19 +158,62 @@ class DatabaseConfig:
     archive_size: int = 100
     num_islands: int = 5
 
+    # Population eviction: once the population exceeds population_size by the slack, the
+    # worst unprotected programs are evicted in one batch back down to population_size
+    population_slack: float = 0.05  # Fraction of population_size allowed over the limit
+    age_layers: int = 0  # Evict within generation layers to protect young programs (0 = off)
+    age_layer_gap: int = 10  # Generations per age layer (the oldest layer is unbounded)
+
     # Selection parameters
     elite_selection_ratio: float = 0.1
     exploration_ratio: float = 0.2
     exploitation_ratio: float = 0.7
-    diversity_metric: str = "edit_distance"  # Options: "edit_distance", "feature_based"
+    parent_selection: str = "uniform"  # Within an island: "uniform", "tournament", "rank",
+    # "fitness_proportionate" or "boltzmann"
+    tournament_size: int = 3  # Programs compared per tournament selection
+    selection_temperature: float = 0.1  # Boltzmann temperature (lower = greedier)
+
+    # Adaptive selection: bandits choose the sampling strategy, the island to evolve and
+    # the LLM model, credited by child improvement over the parent per second of iteration
+    adaptive_selection: bool = False  # Replaces the fixed ratios, island order and weights
+    bandit_policy: str = "ucb"  # Options: "ucb", "thompson"
+    bandit_exploration: float = 1.0  # UCB exploration coefficient
+    bandit_decay: float = 0.99  # Discount of past outcomes per update (1.0 = never forget)
+    diversity_metric: str = "minhash"  # Options: "minhash", "edit_distance", "feature_based"
+
+    # Multi-objective ranking: when objectives are set, programs are compared by Pareto
+    # dominance, and the archive, tournaments and eviction use NSGA-II front and crowding
+    pareto_objectives: List[str] = field(default_factory=list)  # Metric names (empty = off)
+    pareto_minimize: List[str] = field(default_factory=list)  # Objectives where lower is better
+
+    # MinHash sketch parameters for approximate diversity
+    sketch_size: int = 64  # Number of hash permutations per sketch
+    sketch_shingle_size: int = 3  # Number of consecutive tokens per shingle
+
+    # Code embeddings for "feature_based" diversity and "embedding_<k>" feature dimensions
+    embedding_model: str = "hashed"  # "hashed" or an import path "module:callable"
+    embedding_dim: int = 256  # Dimension of the built-in hashed embedding
+
+    # Near-duplicate detection
+    duplicate_threshold: float = 0.95  # Estimated similarity at which programs are duplicates
+    lsh_bands: int = 16  # Number of LSH bands (must divide sketch_size)
 
     # Feature map dimensions for MAP-Elites
     feature_dimensions: List[str] = field(default_factory=lambda: ["score", "complexity"])
     feature_bins: int = 10
+    # Binning per dimension, e.g. {"complexity": {"scale": "log", "min": 10, "max": 100000}}.
+    # Keys: "min", "max", "scale" ("linear" or "log"), "bins" (overrides feature_bins) and
+    # "adaptive" (quantile bins fitted to the population, ignoring min/max once fitted)
+    feature_binning: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    feature_rebin_drift: float = 0.1  # Refit adaptive bins once this fraction of the
+    # population fell outside the fitted range (they are also refit when it doubles)
 
     # Migration parameters for island-based evolution
     migration_interval: int = 50  # Migrate every N generations
     migration_rate: float = 0.1  # Fraction of population to migrate
+    migration_topology: str = "ring"  # "ring", "torus", "fully_connected" or "random_k"
+    migration_k: int = 2  # Target islands per migration of the random_k topology
+    parallel_islands: bool = False  # Run each island in its own worker process
 
     # Random seed for reproducible sampling
     random_seed: Optional[int] = None
@@ -167,8 +221,10 @@ class DatabaseConfig:
     # Artifact storage
     artifacts_base_path: Optional[str] = None  # Defaults to db_path/artifacts
     artifact_size_threshold: int = 32 * 1024  # 32KB threshold
-    cleanup_old_artifacts: bool = True
-    artifact_retention_days: int = 30
+    cleanup_old_artifacts: bool = True  # Garbage-collect the artifact store in the background
+    artifact_retention_days: int = 30  # Keep artifacts of removed programs this long
+    artifact_gc_interval: float = 3600.0  # Seconds between artifact garbage collections
+    artifact_cache_bytes: int = 64 * 1024 * 1024  # Memory for recently read artifacts
 
 
 @dataclass
@@ -189,7 +245,14 @@ class EvaluatorConfig:
 
     # Parallel evaluation
     parallel_evaluations: int = 4
-    distributed: bool = False
+    distributed: bool = False  # Send evaluations to openevolve-worker processes
+
+    # Distributed evaluation job queue
+    queue_path: Optional[str] = None  # Defaults to <output_dir>/jobs.db
+    poll_interval: float = 0.5  # Seconds between queue polls
+    heartbeat_interval: float = 5.0  # Seconds between worker heartbeats
+    lease_timeout: float = 30.0  # Requeue a job after this long without a heartbeat
+    max_job_attempts: int = 3  # Fail a job after this many lost workers
 
     # LLM-based feedback
     use_llm_feedback: bool = False
@@ -197,7 +260,7 @@ class EvaluatorConfig:
 
     # Artifact handling
     enable_artifacts: bool = True
-    max_artifact_storage: int = 100 * 1024 * 1024  # 100MB per program
+    max_artifact_storage: int = 100 * 1024 * 1024  # 100MB per program (larger are truncated)
 
 
 @dataclass
@@ -207,6 +270,9 @@ class Config:
     # General settings
     max_iterations: int = 10000
     checkpoint_interval: int = 100
+    async_checkpoints: bool = True  # Write checkpoints on a background thread
+    checkpoint_fsync: bool = True  # Force checkpoint files to stable storage
+    event_log: bool = True  # Append accepted programs to <output_dir>/events.jsonl
     log_level: str = "INFO"
     log_dir: Optional[str] = None
     random_seed: Optional[int] = None
@@ -220,7 +286,13 @@ class Config:
     # Evolution settings
     diff_based_evolution: bool = True
     allow_full_rewrites: bool = False
+    diff_fuzzy_threshold: float = 0.95  # Minimum similarity to fuzzy-match a SEARCH block
+    max_repair_attempts: int = 1  # Follow-ups asking the LLM to fix unusable SEARCH blocks
+    evolve_blocks_only: bool = False  # Prompt with and patch only the EVOLVE-BLOCK regions
     max_code_length: int = 10000
+    duplicate_handling: str = "skip"  # Options: "skip", "reuse_metrics", "evaluate"
+    num_candidates: int = 1  # Candidate children generated from each prompt
+    candidate_selection: str = "best"  # Options: "best", "all" (candidates added to database)
 
     @classmethod
     def from_yaml(cls, path: Union[str, Path]) -> "Config":
@@ -265,6 +337,9 @@ class Config:
             # General settings
             "max_iterations": self.max_iterations,
             "checkpoint_interval": self.checkpoint_interval,
+            "async_checkpoints": self.async_checkpoints,
+            "checkpoint_fsync": self.checkpoint_fsync,
+            "event_log": self.event_log,
             "log_level": self.log_level,
             "log_dir": self.log_dir,
             "random_seed": self.random_seed,
@@ -286,6 +361,9 @@ class Config:
                 "evaluator_system_message": self.prompt.evaluator_system_message,
                 "num_top_programs": self.prompt.num_top_programs,
                 "num_diverse_programs": self.prompt.num_diverse_programs,
+                "prompt_layout": self.prompt.prompt_layout,
+                "max_prompt_tokens": self.prompt.max_prompt_tokens,
+                "render_cache_size": self.prompt.render_cache_size,
                 "use_template_stochasticity": self.prompt.use_template_stochasticity,
                 "template_variations": self.prompt.template_variations,
                 # Note: meta-prompting features not implemented
@@ -298,15 +376,37 @@ class Config:
                 "population_size": self.database.population_size,
                 "archive_size": self.database.archive_size,
                 "num_islands": self.database.num_islands,
+                "population_slack": self.database.population_slack,
+                "age_layers": self.database.age_layers,
+                "age_layer_gap": self.database.age_layer_gap,
                 "elite_selection_ratio": self.database.elite_selection_ratio,
                 "exploration_ratio": self.database.exploration_ratio,
                 "exploitation_ratio": self.database.exploitation_ratio,
-                # Note: diversity_metric fixed to "edit_distance"
-                # "diversity_metric": self.database.diversity_metric,
+                "parent_selection": self.database.parent_selection,
+                "tournament_size": self.database.tournament_size,
+                "selection_temperature": self.database.selection_temperature,
+                "adaptive_selection": self.database.adaptive_selection,
+                "bandit_policy": self.database.bandit_policy,
+                "bandit_exploration": self.database.bandit_exploration,
+                "bandit_decay": self.database.bandit_decay,
+                "diversity_metric": self.database.diversity_metric,
+                "pareto_objectives": self.database.pareto_objectives,
+                "pareto_minimize": self.database.pareto_minimize,
+                "sketch_size": self.database.sketch_size,
+                "sketch_shingle_size": self.database.sketch_shingle_size,
+                "embedding_model": self.database.embedding_model,
+                "embedding_dim": self.database.embedding_dim,
+                "duplicate_threshold": self.database.duplicate_threshold,
+                "lsh_bands": self.database.lsh_bands,
                 "feature_dimensions": self.database.feature_dimensions,
                 "feature_bins": self.database.feature_bins,
+                "feature_binning": self.database.feature_binning,
+                "feature_rebin_drift": self.database.feature_rebin_drift,
                 "migration_interval": self.database.migration_interval,
                 "migration_rate": self.database.migration_rate,
+                "migration_topology": self.database.migration_topology,
+                "migration_k": self.database.migration_k,
+                "parallel_islands": self.database.parallel_islands,
                 "random_seed": self.database.random_seed,
             },
             "evaluator": {
@@ -318,15 +418,25 @@ class Config:
                 "cascade_evaluation": self.evaluator.cascade_evaluation,
                 "cascade_thresholds": self.evaluator.cascade_thresholds,
                 "parallel_evaluations": self.evaluator.parallel_evaluations,
-                # Note: distributed evaluation not implemented
-                # "distributed": self.evaluator.distributed,
+                "distributed": self.evaluator.distributed,
+                "queue_path": self.evaluator.queue_path,
+                "poll_interval": self.evaluator.poll_interval,
+                "heartbeat_interval": self.evaluator.heartbeat_interval,
+                "lease_timeout": self.evaluator.lease_timeout,
+                "max_job_attempts": self.evaluator.max_job_attempts,
                 "use_llm_feedback": self.evaluator.use_llm_feedback,
                 "llm_feedback_weight": self.evaluator.llm_feedback_weight,
             },
             # Evolution settings
             "diff_based_evolution": self.diff_based_evolution,
             "allow_full_rewrites": self.allow_full_rewrites,
+            "diff_fuzzy_threshold": self.diff_fuzzy_threshold,
+            "max_repair_attempts": self.max_repair_attempts,
+            "evolve_blocks_only": self.evolve_blocks_only,
             "max_code_length": self.max_code_length,
+            "duplicate_handling": self.duplicate_handling,
+            "num_candidates": self.num_candidates,
+            "candidate_selection": self.candidate_selection,
         }
 
     def to_yaml(self, path: Union[str, Path]) -> None:
@@ -4,6 +4,7 @@ Main controller for OpenEvolve
 
 import asyncio
 import logging
+import multiprocessing
 import os
 import re
 import time
@@ -11,23 +12,37 @@ import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from openevolve.checkpoint_writer import CheckpointWriter, fsync_dir, write_file
 from openevolve.config import Config, load_config
-from openevolve.database import Program, ProgramDatabase
+from openevolve.database import DatabaseSnapshot, Program, ProgramDatabase
 from openevolve.evaluator import Evaluator
+from openevolve.event_log import EVENT_LOG_FILE, EventLog
+from openevolve.island_worker import (
+    MESSAGE_ERROR,
+    MESSAGE_PROGRAM,
+    iter_worker_results,
+    run_island_worker,
+)
 from openevolve.llm.ensemble import LLMEnsemble
 from openevolve.prompt.sampler import PromptSampler
 from openevolve.utils.code_utils import (
-    apply_diff,
+    apply_diff_to_evolve_blocks,
+    apply_diff_with_report,
+    build_evolve_block_view,
     extract_code_language,
     extract_diffs,
     format_diff_summary,
+    normalize_code,
     parse_evolve_blocks,
     parse_full_rewrite,
 )
+from openevolve.utils.async_utils import gather_with_concurrency
+from openevolve.utils.bandit_utils import Bandit
 from openevolve.utils.format_utils import (
     format_metrics_safe,
     format_improvement_safe,
 )
+from openevolve.utils.metrics_utils import safe_numeric_average
 
 logger = logging.getLogger(__name__)
 
@@ -96,7 +111,15 @@ class OpenEvolve:
                 self.file_extension = f".{self.file_extension}"
 
         # Initialize components
-        self.llm_ensemble = LLMEnsemble(self.config.llm.models)
+        model_bandit = None
+        if self.config.database.adaptive_selection:
+            model_bandit = Bandit(
+                len(self.config.llm.models),
+                policy=self.config.database.bandit_policy,
+                exploration=self.config.database.bandit_exploration,
+                decay=self.config.database.bandit_decay,
+            )
+        self.llm_ensemble = LLMEnsemble(self.config.llm.models, bandit=model_bandit)
         self.llm_evaluator_ensemble = LLMEnsemble(self.config.llm.evaluator_models)
 
         self.prompt_sampler = PromptSampler(self.config.prompt)
@@ -108,6 +131,16 @@ class OpenEvolve:
             self.config.database.random_seed = self.config.random_seed
 
         self.database = ProgramDatabase(self.config.database)
+        self.checkpoint_writer = CheckpointWriter() if self.config.async_checkpoints else None
+        self.event_log = (
+            EventLog(os.path.join(self.output_dir, EVENT_LOG_FILE))
+            if self.config.event_log
+            else None
+        )
+
+        # Distributed workers share a job queue, kept with the run output by default
+        if self.config.evaluator.distributed and not self.config.evaluator.queue_path:
+            self.config.evaluator.queue_path = os.path.join(self.output_dir, "jobs.db")
 
         self.evaluator = Evaluator(
             self.config.evaluator,
@@ -195,6 +228,7 @@ class OpenEvolve:
             )
 
             self.database.add(initial_program)
+            self._log_program_event(initial_program)
         else:
             logger.info(
                 f"Skipping initial program addition (resuming from iteration {start_iteration} with {len(self.database.programs)} existing programs)"
@@ -207,6 +241,10 @@ class OpenEvolve:
             f"Starting evolution from iteration {start_iteration} for {max_iterations} iterations (total: {total_iterations})"
         )
 
+        if self.config.database.parallel_islands and self.config.database.num_islands > 1:
+            await self._run_island_workers(start_iteration, max_iterations, target_score)
+            return self._finish_run()
+
         # Island-based evolution variables
         programs_per_island = max(
             1, max_iterations // (self.config.database.num_islands * 10)
@@ -227,90 +265,36 @@ class OpenEvolve:
 
             current_island_counter += 1
 
-            # Sample parent and inspirations from current island
+            # Sample parent and inspirations from current island, and the model writing
+            # (and repairing) this iteration's children
             parent, inspirations = self.database.sample()
+            model_index = self.llm_ensemble.sample_model_index()
 
-            # Get artifacts for the parent program if available
-            parent_artifacts = self.database.get_artifacts(parent.id)
-
-            # Build prompt
-            prompt = self.prompt_sampler.build_prompt(
-                current_program=parent.code,
-                parent_program=parent.code,  # We don't have the parent's code, use the same
-                program_metrics=parent.metrics,
-                previous_programs=[p.to_dict() for p in self.database.get_top_programs(3)],
-                top_programs=[p.to_dict() for p in inspirations],
-                language=self.language,
-                evolution_round=i,
-                allow_full_rewrite=self.config.allow_full_rewrites,
-                program_artifacts=parent_artifacts if parent_artifacts else None,
-            )
-
-            # Generate code modification
             try:
-                llm_response = await self.llm_ensemble.generate_with_context(
-                    system_message=prompt["system"],
-                    messages=[{"role": "user", "content": prompt["user"]}],
-                )
-
-                # Parse the response
-                if self.config.diff_based_evolution:
-                    diff_blocks = extract_diffs(llm_response)
-
-                    if not diff_blocks:
-                        logger.warning(f"Iteration {i+1}: No valid diffs found in response")
-                        continue
-
-                    # Apply the diffs
-                    child_code = apply_diff(parent.code, llm_response)
-                    changes_summary = format_diff_summary(diff_blocks)
-                else:
-                    # Parse full rewrite
-                    new_code = parse_full_rewrite(llm_response, self.language)
-
-                    if not new_code:
-                        logger.warning(f"Iteration {i+1}: No valid code found in response")
-                        continue
-
-                    child_code = new_code
-                    changes_summary = "Full rewrite"
-
-                # Check code length
-                if len(child_code) > self.config.max_code_length:
-                    logger.warning(
-                        f"Iteration {i+1}: Generated code exceeds maximum length "
-                        f"({len(child_code)} > {self.config.max_code_length})"
+                children = await self._generate_children(parent, inspirations, i, model_index)
+                if not children:
+                    self._record_selection_outcome(
+                        parent, None, time.time() - iteration_start, model_index
                     )
                     continue
 
-                # Evaluate the child program
-                child_id = str(uuid.uuid4())
-                child_metrics = await self.evaluator.evaluate_program(child_code, child_id)
-
-                # Handle artifacts if they exist
-                artifacts = self.evaluator.get_pending_artifacts(child_id)
-
-                # Create a child program
-                child_program = Program(
-                    id=child_id,
-                    code=child_code,
-                    language=self.language,
-                    parent_id=parent.id,
-                    generation=parent.generation + 1,
-                    metrics=child_metrics,
-                    metadata={
-                        "changes": changes_summary,
-                        "parent_metrics": parent.metrics,
-                    },
+                for child_program, artifacts in children:
+                    # Add to database (will be added to current island)
+                    self.database.add(child_program, iteration=i + 1)
+                    self._log_program_event(child_program)
+
+                    # Store artifacts if they exist
+                    if artifacts:
+                        self.database.store_artifacts(
+                            child_program.id, artifacts, self.config.evaluator.max_artifact_storage
+                        )
+
+                # Progress is reported for the best child of the iteration
+                child_program = children[0][0]
+                self._record_selection_outcome(
+                    parent, child_program, time.time() - iteration_start, model_index
                 )
 
-                # Add to database (will be added to current island)
-                self.database.add(child_program, iteration=i + 1)
-
-                # Store artifacts if they exist
-                if artifacts:
-                    self.database.store_artifacts(child_id, artifacts)
-
                 # Increment generation for current island
                 self.database.increment_island_generation()
 
@@ -340,7 +324,9 @@ class OpenEvolve:
 
                 # Check if target score reached
                 if target_score is not None:
-                    avg_score = sum(child_metrics.values()) / max(1, len(child_metrics))
+                    avg_score = sum(child_program.metrics.values()) / max(
+                        1, len(child_program.metrics)
+                    )
                     if avg_score >= target_score:
                         logger.info(f"Target score {target_score} reached after {i+1} iterations")
                         break
@@ -349,6 +335,125 @@ class OpenEvolve:
                 logger.error(f"Error in iteration {i+1}: {str(e)}")
                 continue
 
+        return self._finish_run()
+
+    async def _run_island_workers(
+        self, start_iteration: int, max_iterations: int, target_score: Optional[float]
+    ) -> None:
+        """
+        Evolve each island in its own worker process
+
+        Workers exchange migrants directly over queues; every accepted child is sent back
+        here and added to the global database, which is used for checkpoints and results.
+
+        Args:
+            start_iteration: Iteration number to start from
+            max_iterations: Total number of iterations, split evenly across islands
+            target_score: Target score to reach (stops all workers when reached)
+        """
+        num_islands = self.config.database.num_islands
+        iterations_per_island = max(1, max_iterations // num_islands)
+        logger.info(
+            f"Starting {num_islands} island worker processes with "
+            f"{iterations_per_island} iterations each"
+        )
+
+        # Seed each island with its current population (or the best program if empty)
+        best_program = self.database.get_best_program()
+        seeds = []
+        for island in self.database.islands:
+            programs = [
+                self.database.programs[pid] for pid in island if pid in self.database.programs
+            ]
+            if not programs and best_program is not None:
+                programs = [best_program]
+            seeds.append([p.to_dict() for p in programs])
+
+        context = multiprocessing.get_context("spawn")
+        inboxes = [context.Queue() for _ in range(num_islands)]
+        results = context.Queue()
+        workers = []
+        for island_idx in range(num_islands):
+            worker = context.Process(
+                target=run_island_worker,
+                args=(
+                    island_idx,
+                    self.initial_program_path,
+                    self.evaluator.evaluation_file,
+                    self.config,
+                    os.path.join(self.output_dir, "islands", f"island_{island_idx}"),
+                    start_iteration,
+                    iterations_per_island,
+                    seeds[island_idx],
+                    inboxes,
+                    results,
+                ),
+            )
+            worker.start()
+            workers.append(worker)
+
+        loop = asyncio.get_event_loop()
+        iteration = start_iteration
+        messages = iter_worker_results(results, workers)
+        try:
+            while True:
+                message = await loop.run_in_executor(None, next, messages, None)
+                if message is None:
+                    break
+                kind, island_idx, payload, artifacts = message
+                if kind == MESSAGE_ERROR:
+                    logger.error(f"Island worker {island_idx} failed: {payload}")
+                    continue
+                if kind != MESSAGE_PROGRAM:
+                    continue
+
+                iteration += 1
+                child_program = Program.from_dict(payload)
+                self.database.add(child_program, iteration=iteration, target_island=island_idx)
+                self._log_program_event(child_program)
+                if artifacts:
+                    self.database.store_artifacts(
+                        child_program.id, artifacts, self.config.evaluator.max_artifact_storage
+                    )
+                self.database.increment_island_generation(island_idx)
+
+                if self.database.best_program_id == child_program.id:
+                    logger.info(
+                        f"🌟 New best solution found on island {island_idx}: {child_program.id}"
+                    )
+                    logger.info(f"Metrics: {format_metrics_safe(child_program.metrics)}")
+
+                if iteration % self.config.checkpoint_interval == 0:
+                    self._save_checkpoint(iteration)
+                    logger.info(f"Island status at checkpoint {iteration}:")
+                    self.database.log_island_status()
+
+                if target_score is not None:
+                    metrics = child_program.metrics
+                    avg_score = sum(metrics.values()) / max(1, len(metrics))
+                    if avg_score >= target_score:
+                        logger.info(f"Target score {target_score} reached on island {island_idx}")
+                        break
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+
+    def _finish_run(self) -> Optional[Program]:
+        """
+        Select, log and save the best program at the end of a run
+
+        Returns:
+            Best program found, or None if the database is empty
+        """
+        # Make sure the last checkpoint is on disk
+        if self.checkpoint_writer:
+            try:
+                self.checkpoint_writer.flush()
+            except RuntimeError as e:
+                logger.error(f"{str(e)}: {str(e.__cause__)}")
+
         # Get the best program using our tracking mechanism
         best_program = None
         if self.database.best_program_id:
@@ -396,6 +501,302 @@ class OpenEvolve:
             # Return None if no programs found instead of undefined initial_program
             return None
 
+    async def _generate_children(
+        self,
+        parent: Program,
+        inspirations: List[Program],
+        iteration: int,
+        model_index: Optional[int] = None,
+    ) -> List[Tuple[Program, Optional[Dict[str, Union[str, bytes]]]]]:
+        """
+        Generate and evaluate candidate children of a parent from one prompt
+
+        With num_candidates > 1 the same prompt is completed several times; the distinct
+        candidates are evaluated concurrently and either the best or all are kept.
+
+        Args:
+            parent: Parent program
+            inspirations: Inspiration programs for the prompt
+            iteration: Current iteration number (0-based)
+            model_index: Ensemble model generating the candidates and their repairs
+                (sampled if None)
+
+        Returns:
+            List of (child_program, artifacts) tuples, best first (empty if none usable)
+        """
+        if model_index is None:
+            model_index = self.llm_ensemble.sample_model_index()
+
+        # Get artifacts for the parent program if available, read only as far as rendered
+        parent_artifacts = None
+        if self.config.prompt.include_artifacts:
+            parent_artifacts = self.database.get_artifacts(
+                parent.id, max_length=self.prompt_sampler.artifact_read_length()
+            )
+
+        # Build prompt, optionally showing only the evolvable regions in full
+        current_program = parent.code
+        if self.config.evolve_blocks_only and self.config.diff_based_evolution:
+            current_program = build_evolve_block_view(parent.code, self.language)
+        prompt = self.prompt_sampler.build_prompt(
+            current_program=current_program,
+            parent_program=parent.code,  # We don't have the parent's code, use the same
+            program_metrics=parent.metrics,
+            previous_programs=[p.to_dict() for p in self.database.get_top_programs(3)],
+            top_programs=[p.to_dict() for p in inspirations],
+            language=self.language,
+            evolution_round=iteration,
+            allow_full_rewrite=self.config.allow_full_rewrites,
+            program_artifacts=parent_artifacts if parent_artifacts else None,
+        )
+
+        # Generate code modifications
+        messages = [{"role": "user", "content": prompt["user"]}]
+        if self.config.num_candidates > 1:
+            llm_responses = await self.llm_ensemble.generate_multiple_with_context(
+                system_message=prompt["system"],
+                messages=messages,
+                n=self.config.num_candidates,
+                model_index=model_index,
+            )
+        else:
+            llm_responses = [
+                await self.llm_ensemble.generate_with_context(
+                    system_message=prompt["system"],
+                    messages=messages,
+                    model_index=model_index,
+                )
+            ]
+
+        # Parse the responses, dropping candidates identical to an earlier one
+        parsed_responses = await asyncio.gather(
+            *(
+                self._parse_response(parent, prompt, llm_response, iteration, model_index)
+                for llm_response in llm_responses
+            )
+        )
+        candidates = []
+        seen_code = set()
+        for parsed in parsed_responses:
+            if parsed is None:
+                continue
+            normalized = normalize_code(parsed[0], self.language)
+            if normalized in seen_code:
+                continue
+            seen_code.add(normalized)
+            candidates.append(parsed)
+
+        if len(llm_responses) > 1:
+            logger.debug(
+                f"Iteration {iteration+1}: {len(candidates)} distinct candidates "
+                f"from {len(llm_responses)} completions"
+            )
+
+        results = await gather_with_concurrency(
+            self.config.evaluator.parallel_evaluations,
+            *(
+                self._evaluate_child(parent, child_code, changes_summary, iteration)
+                for child_code, changes_summary in candidates
+            ),
+        )
+        children = [result for result in results if result is not None]
+
+        children.sort(
+            key=lambda child: child[0].metrics.get(
+                "combined_score", safe_numeric_average(child[0].metrics)
+            ),
+            reverse=True,
+        )
+        if self.config.candidate_selection == "best":
+            children = children[:1]
+        return children
+
+    async def _parse_response(
+        self,
+        parent: Program,
+        prompt: Dict[str, str],
+        llm_response: str,
+        iteration: int,
+        model_index: Optional[int] = None,
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Turn an LLM response into child code
+
+        Args:
+            parent: Parent program the response modifies
+            prompt: Prompt that produced the response
+            llm_response: Response text
+            iteration: Current iteration number (0-based)
+            model_index: Ensemble model that wrote the response, also used for repairs
+
+        Returns:
+            Tuple of (child_code, changes_summary), or None if the response is unusable
+        """
+        if self.config.diff_based_evolution:
+            child = await self._apply_response_diffs(
+                parent, prompt, llm_response, iteration, model_index
+            )
+            if child is None:
+                return None
+            child_code, changes_summary = child
+        else:
+            # Parse full rewrite
+            new_code = parse_full_rewrite(llm_response, self.language)
+
+            if not new_code:
+                logger.warning(f"Iteration {iteration+1}: No valid code found in response")
+                return None
+
+            child_code = new_code
+            changes_summary = "Full rewrite"
+
+        # Check code length
+        if len(child_code) > self.config.max_code_length:
+            logger.warning(
+                f"Iteration {iteration+1}: Generated code exceeds maximum length "
+                f"({len(child_code)} > {self.config.max_code_length})"
+            )
+            return None
+
+        return child_code, changes_summary
+
+    async def _apply_response_diffs(
+        self,
+        parent: Program,
+        prompt: Dict[str, str],
+        llm_response: str,
+        iteration: int,
+        model_index: Optional[int] = None,
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Apply the SEARCH/REPLACE blocks of a response to the parent program
+
+        Blocks that cannot be applied (or a response without any blocks) are sent back to
+        the LLM in a short follow-up on the same conversation, asking only for corrected
+        blocks, up to max_repair_attempts times.
+
+        Args:
+            parent: Parent program the response modifies
+            prompt: Prompt that produced the response
+            llm_response: Response text
+            iteration: Current iteration number (0-based)
+            model_index: Ensemble model that wrote the response, also used for repairs
+
+        Returns:
+            Tuple of (child_code, changes_summary), or None if no block could be applied
+        """
+        apply_diff = (
+            apply_diff_to_evolve_blocks
+            if self.config.evolve_blocks_only
+            else apply_diff_with_report
+        )
+        child_code = parent.code
+        applied_blocks = []
+        messages = [{"role": "user", "content": prompt["user"]}]
+        response = llm_response
+
+        for attempt in range(self.config.max_repair_attempts + 1):
+            diff_blocks = extract_diffs(response)
+            child_code, failed_blocks = apply_diff(
+                child_code, response, self.config.diff_fuzzy_threshold
+            )
+            applied_blocks.extend(block for block in diff_blocks if block not in failed_blocks)
+
+            if not diff_blocks:
+                logger.warning(f"Iteration {iteration+1}: No valid diffs found in response")
+            elif failed_blocks:
+                logger.warning(
+                    f"Iteration {iteration+1}: {len(failed_blocks)} of {len(diff_blocks)} "
+                    f"SEARCH blocks did not match the parent program"
+                )
+            else:
+                break
+
+            if attempt == self.config.max_repair_attempts:
+                break
+
+            # Ask for corrected blocks only, reusing the conversation so far
+            logger.info(f"Iteration {iteration+1}: Requesting repair of unusable diff blocks")
+            messages.append({"role": "assistant", "content": response})
+            messages.append(
+                {
+                    "role": "user",
+                    "content": self.prompt_sampler.build_repair_prompt(
+                        child_code, failed_blocks, self.language
+                    ),
+                }
+            )
+            response = await self.llm_ensemble.generate_with_context(
+                system_message=prompt["system"],
+                messages=messages,
+                model_index=model_index,
+            )
+
+        if not applied_blocks:
+            return None
+        return child_code, format_diff_summary(applied_blocks)
+
+    async def _evaluate_child(
+        self, parent: Program, child_code: str, changes_summary: str, iteration: int
+    ) -> Optional[Tuple[Program, Optional[Dict[str, Union[str, bytes]]]]]:
+        """
+        Evaluate child code and wrap it in a Program
+
+        Args:
+            parent: Parent program
+            child_code: Code of the child
+            changes_summary: Summary of the changes relative to the parent
+            iteration: Current iteration number (0-based)
+
+        Returns:
+            Tuple of (child_program, artifacts), or None if the child is a skipped duplicate
+        """
+        # Check for exact or near-duplicates before spending an evaluation
+        child_id = str(uuid.uuid4())
+        duplicate = None
+        if self.config.duplicate_handling != "evaluate":
+            duplicate = self.database.find_duplicate(child_code, self.language)
+
+        if duplicate is not None and self.config.duplicate_handling == "skip":
+            logger.info(
+                f"Iteration {iteration+1}: Generated code duplicates program {duplicate.id}, "
+                f"skipping evaluation"
+            )
+            return None
+
+        if duplicate is not None:
+            # Reuse the metrics of the matched program instead of re-evaluating
+            logger.info(
+                f"Iteration {iteration+1}: Generated code duplicates program {duplicate.id}, "
+                f"reusing its metrics"
+            )
+            child_metrics = duplicate.metrics.copy()
+            artifacts = None
+        else:
+            # Evaluate the child program
+            child_metrics = await self.evaluator.evaluate_program(child_code, child_id)
+
+            # Handle artifacts if they exist
+            artifacts = self.evaluator.get_pending_artifacts(child_id)
+
+        # Create a child program
+        child_program = Program(
+            id=child_id,
+            code=child_code,
+            language=self.language,
+            parent_id=parent.id,
+            generation=parent.generation + 1,
+            metrics=child_metrics,
+            metadata={
+                "changes": changes_summary,
+                "parent_metrics": parent.metrics,
+            },
+        )
+        if duplicate is not None:
+            child_program.metadata["duplicate_of"] = duplicate.id
+
+        return child_program, artifacts
+
     def _log_iteration(
         self,
         iteration: int,
@@ -426,6 +827,9 @@ class OpenEvolve:
         """
         Save a checkpoint
 
+        The database is snapshotted in memory here; with async_checkpoints the snapshot
+        is written by the background checkpoint writer.
+
         Args:
             iteration: Current iteration number
         """
@@ -434,51 +838,151 @@ class OpenEvolve:
 
         # Create specific checkpoint directory
         checkpoint_path = os.path.join(checkpoint_dir, f"checkpoint_{iteration}")
-        os.makedirs(checkpoint_path, exist_ok=True)
 
-        # Save the database
-        self.database.save(checkpoint_path, iteration)
+        # Snapshot the database
+        snapshot = self.database.snapshot(iteration)
 
-        # Save the best program found so far
+        # Snapshot the best program found so far
         best_program = None
         if self.database.best_program_id:
             best_program = self.database.get(self.database.best_program_id)
         else:
             best_program = self.database.get_best_program()
 
+        best_program_code = None
+        best_program_info = None
         if best_program:
+            best_program_code = best_program.code
+            best_program_info = {
+                "id": best_program.id,
+                "generation": best_program.generation,
+                "iteration": best_program.iteration_found,
+                "current_iteration": iteration,
+                "metrics": dict(best_program.metrics),
+                "language": best_program.language,
+                "timestamp": best_program.timestamp,
+                "saved_at": time.time(),
+            }
+
+        def write() -> None:
+            self._write_checkpoint(
+                checkpoint_path, iteration, snapshot, best_program_code, best_program_info
+            )
+
+        if self.checkpoint_writer:
+            self.checkpoint_writer.submit(write)
+        else:
+            write()
+        if self.event_log:
+            self.event_log.append("checkpoint", iteration=iteration, path=checkpoint_path)
+        self._log_llm_usage()
+
+    def _record_selection_outcome(
+        self,
+        parent: Program,
+        child: Optional[Program],
+        cost: float,
+        model_index: Optional[int] = None,
+    ) -> None:
+        """
+        Credit the adaptive selection bandits with the outcome of an iteration
+
+        Args:
+            parent: Sampled parent program
+            child: Best child of the iteration, or None if none was usable
+            cost: Seconds the iteration took (LLM generation and evaluation)
+            model_index: Ensemble model that generated the iteration's children
+        """
+        if not self.config.database.adaptive_selection:
+            return
+        improvement = self.database.record_outcome(parent, child, cost)
+        self.llm_ensemble.record_outcome(improvement, cost, model_index)
+
+    def _log_program_event(self, program: Program) -> None:
+        """Append a program accepted into the database to the event log"""
+        if self.event_log:
+            self.event_log.append(
+                "program",
+                iteration=program.iteration_found,
+                island=program.metadata.get("island"),
+                program=program.to_dict(),
+            )
+
+    def _write_checkpoint(
+        self,
+        checkpoint_path: str,
+        iteration: int,
+        snapshot: DatabaseSnapshot,
+        best_program_code: Optional[str],
+        best_program_info: Optional[Dict[str, Any]],
+    ) -> None:
+        """
+        Write a checkpoint from snapshotted state
+
+        The checkpoint is written to a temporary directory that is renamed into place
+        when complete, so readers never see a partially written checkpoint.
+
+        Args:
+            checkpoint_path: Final checkpoint directory
+            iteration: Iteration of the checkpoint
+            snapshot: Database snapshot
+            best_program_code: Code of the best program, if any
+            best_program_info: Details and metrics of the best program, if any
+        """
+        import json
+        import shutil
+
+        fsync = self.config.checkpoint_fsync
+        temp_path = f"{checkpoint_path}.tmp"
+        shutil.rmtree(temp_path, ignore_errors=True)
+        os.makedirs(temp_path)
+
+        # Save the database
+        snapshot.write(temp_path, fsync)
+
+        if best_program_info is not None:
             # Save the best program at this checkpoint
-            best_program_path = os.path.join(checkpoint_path, f"best_program{self.file_extension}")
-            with open(best_program_path, "w") as f:
-                f.write(best_program.code)
+            write_file(
+                os.path.join(temp_path, f"best_program{self.file_extension}"),
+                best_program_code,
+                fsync,
+            )
 
             # Save metrics
-            best_program_info_path = os.path.join(checkpoint_path, "best_program_info.json")
-            with open(best_program_info_path, "w") as f:
-                import json
-
-                json.dump(
-                    {
-                        "id": best_program.id,
-                        "generation": best_program.generation,
-                        "iteration": best_program.iteration_found,
-                        "current_iteration": iteration,
-                        "metrics": best_program.metrics,
-                        "language": best_program.language,
-                        "timestamp": best_program.timestamp,
-                        "saved_at": time.time(),
-                    },
-                    f,
-                    indent=2,
-                )
+            write_file(
+                os.path.join(temp_path, "best_program_info.json"),
+                json.dumps(best_program_info, indent=2),
+                fsync,
+            )
 
             logger.info(
                 f"Saved best program at checkpoint {iteration} with metrics: "
-                f"{format_metrics_safe(best_program.metrics)}"
+                f"{format_metrics_safe(best_program_info['metrics'])}"
             )
 
+        # Move the finished checkpoint into place
+        if os.path.exists(checkpoint_path):
+            shutil.rmtree(checkpoint_path)
+        os.rename(temp_path, checkpoint_path)
+        if fsync:
+            fsync_dir(os.path.dirname(checkpoint_path))
+
         logger.info(f"Saved checkpoint at iteration {iteration} to {checkpoint_path}")
 
+    def _log_llm_usage(self) -> None:
+        """Log token usage and prompt-cache hit rate of the evolution models"""
+        usage = self.llm_ensemble.get_usage_stats()
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        if not prompt_tokens:
+            return
+
+        cached_tokens = usage.get("cached_tokens", 0)
+        logger.info(
+            f"LLM usage: {usage.get('requests', 0)} requests, {prompt_tokens} prompt tokens "
+            f"({cached_tokens / prompt_tokens:.1%} served from cache), "
+            f"{usage.get('completion_tokens', 0)} completion tokens"
+        )
+
     def _save_best_program(self, program: Optional[Program] = None) -> None:
         """
         Save the best program
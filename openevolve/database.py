@@ -3,23 +3,59 @@ Program database for OpenEvolve
 """
 
 import base64
+import bisect
+import gc
+import hashlib
+import heapq
+import itertools
 import json
 import logging
+import math
 import os
 import random
+import threading
 import time
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 
+from openevolve.artifact_store import ArtifactCache, ArtifactStore, read_text_prefix
+from openevolve.checkpoint_index import CheckpointIndex, write_checkpoint_index
+from openevolve.checkpoint_writer import fsync_dir, write_file
 from openevolve.config import DatabaseConfig
-from openevolve.utils.code_utils import calculate_edit_distance
+from openevolve.utils.bandit_utils import Bandit
+from openevolve.utils.code_utils import calculate_edit_distance, normalize_code
+from openevolve.utils.collection_utils import IndexedSet, RankedSet, WeightedIndexedSet
+from openevolve.utils.format_utils import truncate_artifact
+from openevolve.utils.embedding_utils import VectorIndex, load_embedder, random_projection
 from openevolve.utils.metrics_utils import safe_numeric_average
+from openevolve.utils.pareto_utils import ParetoArchive, dominates
+from openevolve.utils.sketch_utils import (
+    MinHashLSH,
+    compute_minhash,
+    estimate_edit_distance,
+    pairwise_similarity,
+)
+from openevolve.utils.topology_utils import MIGRATION_TOPOLOGIES, get_migration_targets
 
 logger = logging.getLogger(__name__)
 
+# Parent sampling strategies (arms of the strategy bandit, in order)
+SAMPLING_STRATEGIES = ("exploration", "exploitation", "random")
+
+# Ways of selecting a parent within an island
+PARENT_SELECTIONS = ("uniform", "tournament", "rank", "fitness_proportionate", "boltzmann")
+
+# Boltzmann weights are exp((fitness - reference) / temperature) with a per-island reference
+# fitness, which is reset to the island's best once that moves this many temperatures away
+BOLTZMANN_REWEIGHT_MARGIN = 30.0
+
+# Binning spec keys and scales of MAP-Elites feature dimensions
+FEATURE_BINNING_KEYS = ("min", "max", "scale", "bins", "adaptive")
+FEATURE_SCALES = ("linear", "log")
+
 
 @dataclass
 class Program:
@@ -42,6 +78,8 @@ class Program:
     # Derived features
     complexity: float = 0.0
     diversity: float = 0.0
+    feature_values: Dict[str, Optional[float]] = field(default_factory=dict)  # Raw MAP-Elites
+    feature_coords: Optional[List[int]] = None  # MAP-Elites cell of the feature values
 
     # Metadata
     metadata: Dict[str, Any] = field(default_factory=dict)
@@ -60,6 +98,40 @@ class Program:
         return cls(**data)
 
 
+@dataclass
+class DatabaseSnapshot:
+    """Point-in-time copy of a program database that can be written to disk"""
+
+    programs: List[Program]
+    metadata: Dict[str, Any]
+    sketches: Dict[str, np.ndarray] = field(default_factory=dict)
+    code_hashes: Dict[str, str] = field(default_factory=dict)
+
+    def write(self, path: str, fsync: bool = False) -> None:
+        """
+        Write the snapshot as a checkpoint index (see openevolve.checkpoint_index)
+
+        Args:
+            path: Directory to write to
+            fsync: Whether to force the files to stable storage
+        """
+        os.makedirs(path, exist_ok=True)
+
+        islands = {
+            program_id: island_idx
+            for island_idx, island in enumerate(self.metadata.get("islands", []))
+            for program_id in island
+        }
+        write_checkpoint_index(path, self.programs, islands, self.sketches, self.code_hashes, fsync)
+
+        # Metadata goes last, so a directory with metadata has all of its programs
+        write_file(os.path.join(path, "metadata.json"), json.dumps(self.metadata), fsync)
+        if fsync:
+            fsync_dir(path)
+
+        logger.info(f"Saved database with {len(self.programs)} programs to {path}")
+
+
 class ProgramDatabase:
     """
     Database for storing and sampling programs during evolution
@@ -72,15 +144,92 @@ class ProgramDatabase:
     def __init__(self, config: DatabaseConfig):
         self.config = config
 
-        # In-memory program storage
+        # In-memory program storage, with the IDs also in an indexable set for O(1) sampling
         self.programs: Dict[str, Program] = {}
+        self.program_ids = IndexedSet()
+
+        # Copy of the IDs for the artifact garbage collection thread, updated under a lock
+        self.live_program_ids: Set[str] = set()
+        self._live_program_ids_lock = threading.Lock()
+
+        # Min-heaps of (fitness, insertion order, ID) per age layer for batch eviction, with
+        # the live entry of each program (entries of removed or re-added programs are stale)
+        self.eviction_heaps: Dict[int, List[Tuple[float, int, str]]] = {}
+        self.eviction_entries: Dict[str, Tuple[float, int, str]] = {}
+        self.eviction_counter = itertools.count()
+
+        # Non-dominated fronts over the Pareto objectives, when multi-objective ranking is on
+        self.pareto_objectives: List[str] = list(getattr(config, "pareto_objectives", []))
+        unknown = set(getattr(config, "pareto_minimize", [])) - set(self.pareto_objectives)
+        if unknown:
+            raise ValueError(f"pareto_minimize names metrics not in pareto_objectives: {unknown}")
+        self.pareto: Optional[ParetoArchive] = ParetoArchive() if self.pareto_objectives else None
 
         # Feature grid for MAP-Elites
         self.feature_map: Dict[str, str] = {}
         self.feature_bins = config.feature_bins
 
+        # Binning specs per feature dimension, with the quantile edges (and the range of
+        # values they were fitted to) of adaptive dimensions
+        self.feature_binning: Dict[str, Dict[str, Any]] = dict(
+            getattr(config, "feature_binning", {}) or {}
+        )
+        for dim, spec in self.feature_binning.items():
+            unknown = set(spec) - set(FEATURE_BINNING_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown feature_binning keys for {dim}: {unknown}")
+            if spec.get("scale", "linear") not in FEATURE_SCALES:
+                raise ValueError(
+                    f"Unknown feature scale for {dim}: {spec['scale']} (expected one of "
+                    f"{FEATURE_SCALES})"
+                )
+            if spec.get("scale") == "log" and spec.get("min", 0) <= 0:
+                raise ValueError(f"Log-scaled feature {dim} needs a positive min")
+        self.adaptive_dimensions: List[str] = [
+            dim
+            for dim in config.feature_dimensions
+            if self.feature_binning.get(dim, {}).get("adaptive", False)
+        ]
+        self.feature_edges: Dict[str, List[float]] = {}
+        self.feature_fitted_ranges: Dict[str, Tuple[float, float]] = {}
+        self.feature_fit_size: int = 0  # Population size when the bins were last fitted
+        self.feature_drift: int = 0  # Programs outside the fitted ranges since then
+
+        # MinHash sketches of normalized program code for fast approximate diversity
+        self.sketches: Dict[str, np.ndarray] = {}
+
+        # Near-duplicate index: exact hashes of normalized code plus LSH over the sketches
+        self.code_hashes: Dict[str, Set[str]] = {}
+        self.program_hashes: Dict[str, str] = {}
+        self.lsh = MinHashLSH(config.sketch_size, config.lsh_bands)
+
+        # Sketches and code hashes loaded from a checkpoint, not yet in the indexes above
+        self.stored_sketches: Dict[str, Tuple[np.ndarray, str]] = {}
+
+        # Code embeddings for feature-based diversity and embedding feature dimensions
+        # (the index and projection are created on the first embedding, once its size is known)
+        self.embedder = None
+        self.embedding_index: Optional[VectorIndex] = None
+        self.embedding_projection: Optional[np.ndarray] = None
+        embedding_dims = [d for d in config.feature_dimensions if d.startswith("embedding_")]
+        self.embedding_components = (
+            max(int(d.split("_", 1)[1]) for d in embedding_dims) + 1 if embedding_dims else 0
+        )
+        if config.diversity_metric == "feature_based" or embedding_dims:
+            self.embedder = load_embedder(config.embedding_model, config.embedding_dim)
+
         # Island populations
-        self.islands: List[Set[str]] = [set() for _ in range(config.num_islands)]
+        self.islands: List[IndexedSet] = [IndexedSet() for _ in range(config.num_islands)]
+
+        # Per-island structures for weighted and rank-based parent selection
+        if config.parent_selection not in PARENT_SELECTIONS:
+            raise ValueError(
+                f"Unknown parent_selection: {config.parent_selection} "
+                f"(expected one of {PARENT_SELECTIONS})"
+            )
+        self.island_selectors: List[Union[WeightedIndexedSet, RankedSet]] = (
+            self._make_island_selectors()
+        )
 
         # Island-based evolution tracking
         self.current_island: int = 0  # Track which island we're currently evolving
@@ -89,10 +238,24 @@ class ProgramDatabase:
         # Migration parameters
         self.migration_interval: int = getattr(config, "migration_interval", 50)
         self.migration_rate: float = getattr(config, "migration_rate", 0.1)
+        if config.migration_topology not in MIGRATION_TOPOLOGIES:
+            raise ValueError(
+                f"Unknown migration_topology: {config.migration_topology} "
+                f"(expected one of {MIGRATION_TOPOLOGIES})"
+            )
         self.last_migration_generation: int = 0
 
-        # Archive of elite programs
-        self.archive: Set[str] = set()
+        # Bandits choosing the sampling strategy and island, when adaptive selection is on
+        self.strategy_bandit: Optional[Bandit] = None
+        self.island_bandit: Optional[Bandit] = None
+        if getattr(config, "adaptive_selection", False):
+            self.strategy_bandit = self._make_bandit(len(SAMPLING_STRATEGIES))
+            self.island_bandit = self._make_bandit(config.num_islands)
+        self.last_strategy: Optional[int] = None  # Strategy of the last sampled parent
+
+        # Archive of elite programs, also indexed by the island of each program
+        self.archive = IndexedSet()
+        self.island_archives: List[IndexedSet] = [IndexedSet() for _ in range(config.num_islands)]
 
         # Track the absolute best program separately
         self.best_program_id: Optional[str] = None
@@ -100,6 +263,10 @@ class ProgramDatabase:
         # Track the last iteration number (for resuming)
         self.last_iteration: int = 0
 
+        # Content-addressed artifact stores by directory, created on first use
+        self.artifact_stores: Dict[str, ArtifactStore] = {}
+        self.artifact_cache = ArtifactCache(getattr(config, "artifact_cache_bytes", 64 * 1024**2))
+
         # Load database from disk if path is provided
         if config.db_path and os.path.exists(config.db_path):
             self.load(config.db_path)
@@ -135,12 +302,25 @@ class ProgramDatabase:
             self.last_iteration = max(self.last_iteration, iteration)
 
         self.programs[program.id] = program
-
-        # Enforce population size limit
-        self._enforce_population_limit()
-
-        # Calculate feature coordinates for MAP-Elites
+        self.program_ids.add(program.id)
+        with self._live_program_ids_lock:
+            self.live_program_ids.add(program.id)
+
+        # Sketch the program once so diversity and duplicate queries never touch the code again
+        self._unindex_program(program.id)
+        self._index_program(program)
+        if self.embedder is not None:
+            self._get_embedding(program)
+        self._push_eviction_entry(program)
+        if self.pareto is not None:
+            self.pareto.add(program.id, self._objective_vector(program))
+
+        # Calculate feature coordinates for MAP-Elites, re-binning the whole population if
+        # the adaptive bins no longer fit it
         feature_coords = self._calculate_feature_coords(program)
+        if self._should_refit_feature_bins():
+            self._refit_feature_bins()
+            feature_coords = program.feature_coords
 
         # Add to feature map (replacing existing if better)
         feature_key = self._feature_coords_to_key(feature_coords)
@@ -152,10 +332,14 @@ class ProgramDatabase:
         # Add to specific island (not random!)
         island_idx = target_island if target_island is not None else self.current_island
         island_idx = island_idx % len(self.islands)  # Ensure valid island
-        self.islands[island_idx].add(program.id)
+        self._add_to_island(island_idx, program.id)
 
         # Track which island this program belongs to
         program.metadata["island"] = island_idx
+        if program.id in self.archive:
+            # A re-added program may have changed islands
+            self._archive_discard(program.id)
+            self._archive_add(program.id)
 
         # Update archive
         self._update_archive(program)
@@ -163,8 +347,12 @@ class ProgramDatabase:
         # Update the absolute best program tracking
         self._update_best_program(program)
 
+        # Enforce population size limit (the new program is placed first, so it can be evicted
+        # cleanly or protected as an elite)
+        self._enforce_population_limit()
+
         # Save to disk if configured
-        if self.config.db_path:
+        if self.config.db_path and program.id in self.programs:
             self._save_program(program)
 
         logger.debug(f"Added program {program.id} to island {island_idx}")
@@ -309,29 +497,57 @@ class ProgramDatabase:
             logger.warning("No database path specified, skipping save")
             return
 
-        # Create directory if it doesn't exist
-        os.makedirs(save_path, exist_ok=True)
+        self.snapshot(iteration).write(save_path)
 
-        # Save each program
-        for program in self.programs.values():
-            self._save_program(program, save_path)
+    def snapshot(self, iteration: int = 0) -> "DatabaseSnapshot":
+        """
+        Take a point-in-time copy of the database for saving
+
+        Programs are copied shallowly (code strings are shared), so this is cheap even
+        for large populations and the copy can be written on another thread.
 
-        # Save metadata
+        Args:
+            iteration: Current iteration number
+
+        Returns:
+            Snapshot of the programs and database metadata
+        """
+        programs = [
+            replace(program, metrics=dict(program.metrics), metadata=dict(program.metadata))
+            for program in self.programs.values()
+        ]
         metadata = {
-            "feature_map": self.feature_map,
+            "sketch_size": self.config.sketch_size,
+            "sketch_shingle_size": self.config.sketch_shingle_size,
+            "feature_map": dict(self.feature_map),
+            "feature_edges": dict(self.feature_edges),
+            "feature_fitted_ranges": dict(self.feature_fitted_ranges),
             "islands": [list(island) for island in self.islands],
             "archive": list(self.archive),
             "best_program_id": self.best_program_id,
             "last_iteration": iteration or self.last_iteration,
             "current_island": self.current_island,
-            "island_generations": self.island_generations,
+            "island_generations": list(self.island_generations),
             "last_migration_generation": self.last_migration_generation,
         }
-
-        with open(os.path.join(save_path, "metadata.json"), "w") as f:
-            json.dump(metadata, f)
-
-        logger.info(f"Saved database with {len(self.programs)} programs to {save_path}")
+        if self.strategy_bandit is not None:
+            metadata["strategy_bandit"] = self.strategy_bandit.to_dict()
+            metadata["island_bandit"] = self.island_bandit.to_dict()
+        return DatabaseSnapshot(
+            programs=programs,
+            metadata=metadata,
+            sketches={
+                **{program_id: sketch for program_id, (sketch, _) in self.stored_sketches.items()},
+                **self.sketches,
+            },
+            code_hashes={
+                **{
+                    program_id: code_hash
+                    for program_id, (_, code_hash) in self.stored_sketches.items()
+                },
+                **self.program_hashes,
+            },
+        )
 
     def load(self, path: str) -> None:
         """
@@ -345,14 +561,25 @@ class ProgramDatabase:
             return
 
         # Load metadata
+        metadata = {}
         metadata_path = os.path.join(path, "metadata.json")
         if os.path.exists(metadata_path):
             with open(metadata_path, "r") as f:
                 metadata = json.load(f)
 
             self.feature_map = metadata.get("feature_map", {})
-            self.islands = [set(island) for island in metadata.get("islands", [])]
-            self.archive = set(metadata.get("archive", []))
+            self.feature_edges = {
+                dim: edges
+                for dim, edges in metadata.get("feature_edges", {}).items()
+                if dim in self.adaptive_dimensions and len(edges) == self._num_feature_bins(dim) - 1
+            }
+            self.feature_fitted_ranges = {
+                dim: tuple(value_range)
+                for dim, value_range in metadata.get("feature_fitted_ranges", {}).items()
+                if dim in self.feature_edges
+            }
+            self.islands = [IndexedSet(island) for island in metadata.get("islands", [])]
+            self.archive = IndexedSet(metadata.get("archive", []))
             self.best_program_id = metadata.get("best_program_id")
             self.last_iteration = metadata.get("last_iteration", 0)
             self.current_island = metadata.get("current_island", 0)
@@ -363,13 +590,45 @@ class ProgramDatabase:
             if len(self.island_generations) != len(self.islands):
                 self.island_generations = [0] * len(self.islands)
 
+            if self.strategy_bandit is not None:
+                self.strategy_bandit.load_dict(metadata.get("strategy_bandit"))
+                self.island_bandit.load_dict(metadata.get("island_bandit"))
+
             logger.info(f"Loaded database metadata with last_iteration={self.last_iteration}")
 
-        # Load programs
+        # Load programs from the checkpoint index, reusing the stored sketches if they were
+        # computed with the current settings
+        if CheckpointIndex.exists(path):
+            reuse_sketches = (
+                metadata.get("sketch_size") == self.config.sketch_size
+                and metadata.get("sketch_shingle_size") == self.config.sketch_shingle_size
+            )
+            # Bulk-creating objects triggers many pointless garbage collection passes
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                with CheckpointIndex(path) as index:
+                    for program_data in index.records():
+                        program = Program.from_dict(program_data)
+                        self.programs[program.id] = program
+
+                    # Sketches are added to the near-duplicate indexes when first needed
+                    if reuse_sketches and index.sketches is not None:
+                        sketches = np.array(index.sketches)
+                        for row, (program_id, code_hash) in enumerate(
+                            zip(index.ids(), index.code_hashes())
+                        ):
+                            if code_hash:
+                                self.stored_sketches[program_id] = (sketches[row], code_hash)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+
+        # Load programs saved one file each (older checkpoints, or added since the last save)
         programs_dir = os.path.join(path, "programs")
         if os.path.exists(programs_dir):
             for program_file in os.listdir(programs_dir):
-                if program_file.endswith(".json"):
+                if program_file.endswith(".json") and program_file[:-5] not in self.programs:
                     program_path = os.path.join(programs_dir, program_file)
                     try:
                         with open(program_path, "r") as f:
@@ -380,6 +639,26 @@ class ProgramDatabase:
                     except Exception as e:
                         logger.warning(f"Error loading program {program_file}: {str(e)}")
 
+        # Rebuild the sampling and eviction indexes
+        self.program_ids = IndexedSet(self.programs)
+        with self._live_program_ids_lock:
+            self.live_program_ids = set(self.programs)
+        self._rebuild_eviction_heaps()
+        self.feature_fit_size = len(self.programs) if self.feature_edges else 0
+        if self.pareto is not None:
+            self.pareto = ParetoArchive()
+            for program in self.programs.values():
+                self.pareto.add(program.id, self._objective_vector(program))
+        self.island_selectors = self._make_island_selectors()
+        for island_idx, island in enumerate(self.islands if self.island_selectors else []):
+            for program_id in island:
+                if program_id in self.programs:
+                    self._add_to_selector(island_idx, program_id)
+        self.island_archives = [IndexedSet() for _ in self.islands]
+        for program_id in list(self.archive):
+            if program_id in self.programs:
+                self._archive_add(program_id)
+
         logger.info(f"Loaded database with {len(self.programs)} programs from {path}")
 
     def _save_program(self, program: Program, base_path: Optional[str] = None) -> None:
@@ -403,58 +682,178 @@ class ProgramDatabase:
         with open(program_path, "w") as f:
             json.dump(program.to_dict(), f)
 
-    def _calculate_feature_coords(self, program: Program) -> List[int]:
+    def _calculate_feature_values(self, program: Program) -> Dict[str, Optional[float]]:
         """
-        Calculate feature coordinates for the MAP-Elites grid
+        Calculate the raw feature values of a program for the MAP-Elites grid
 
         Args:
             program: Program to calculate features for
 
         Returns:
-            List of feature coordinates
+            Value of each feature dimension (None if the program lacks the feature)
         """
-        coords = []
+        values: Dict[str, Optional[float]] = {}
 
         for dim in self.config.feature_dimensions:
             if dim == "complexity":
                 # Use code length as complexity measure
-                complexity = len(program.code)
-                bin_idx = min(int(complexity / 1000 * self.feature_bins), self.feature_bins - 1)
-                coords.append(bin_idx)
+                values[dim] = float(len(program.code))
             elif dim == "diversity":
-                # Use average edit distance to other programs
+                # Use average (approximate) edit distance to other programs
                 if len(self.programs) < 5:
-                    bin_idx = 0
+                    values[dim] = 0.0
                 else:
-                    sample_programs = random.sample(
-                        list(self.programs.values()), min(5, len(self.programs))
-                    )
-                    avg_distance = sum(
-                        calculate_edit_distance(program.code, other.code)
-                        for other in sample_programs
-                    ) / len(sample_programs)
-                    bin_idx = min(
-                        int(avg_distance / 1000 * self.feature_bins), self.feature_bins - 1
-                    )
-                coords.append(bin_idx)
+                    positions = random.sample(range(len(self.program_ids)), 5)
+                    values[dim] = sum(
+                        self._program_distance(program, self.programs[self.program_ids[i]])
+                        for i in positions
+                    ) / len(positions)
+            elif dim.startswith("embedding_"):
+                # Use a fixed random projection of the code embedding
+                component = int(dim.split("_", 1)[1])
+                values[dim] = float(
+                    self._get_embedding(program) @ self.embedding_projection[:, component]
+                )
             elif dim == "score":
                 # Use average of metrics
-                if not program.metrics:
-                    bin_idx = 0
-                else:
-                    avg_score = safe_numeric_average(program.metrics)
-                    bin_idx = min(int(avg_score * self.feature_bins), self.feature_bins - 1)
-                coords.append(bin_idx)
+                values[dim] = safe_numeric_average(program.metrics) if program.metrics else 0.0
             elif dim in program.metrics:
                 # Use specific metric
-                score = program.metrics[dim]
-                bin_idx = min(int(score * self.feature_bins), self.feature_bins - 1)
-                coords.append(bin_idx)
+                values[dim] = float(program.metrics[dim])
             else:
-                # Default to middle bin if feature not found
-                coords.append(self.feature_bins // 2)
+                values[dim] = None
+
+        return values
+
+    def _feature_range(self, dim: str) -> Tuple[float, float]:
+        """Fixed (min, max) range of a feature dimension, from its binning spec or defaults"""
+        if dim in ("complexity", "diversity"):
+            low, high = 0.0, 1000.0
+        elif dim.startswith("embedding_") and self.embedding_projection is not None:
+            # Projections of unit vectors onto a random unit direction have a standard
+            # deviation of about 1/sqrt(dim); spread +-3 standard deviations over the bins
+            high = 3.0 / math.sqrt(len(self.embedding_projection))
+            low = -high
+        else:
+            low, high = 0.0, 1.0
+        spec = self.feature_binning.get(dim, {})
+        return float(spec.get("min", low)), float(spec.get("max", high))
+
+    def _num_feature_bins(self, dim: str) -> int:
+        """Number of bins of a feature dimension"""
+        return int(self.feature_binning.get(dim, {}).get("bins", self.feature_bins))
+
+    def _bin_feature(self, dim: str, value: Optional[float]) -> int:
+        """
+        Bin a raw feature value
+
+        Args:
+            dim: Feature dimension
+            value: Raw feature value
+
+        Returns:
+            Bin index (the middle bin if the value is missing)
+        """
+        bins = self._num_feature_bins(dim)
+        if value is None or not math.isfinite(value):
+            return bins // 2
+
+        edges = self.feature_edges.get(dim)
+        if edges is not None:
+            return bisect.bisect_right(edges, value)
+
+        low, high = self._feature_range(dim)
+        if self.feature_binning.get(dim, {}).get("scale") == "log":
+            if value <= 0:
+                return 0
+            low, high, value = math.log(low), math.log(high), math.log(value)
+        if high <= low:
+            return 0
+        return max(0, min(int((value - low) / (high - low) * bins), bins - 1))
+
+    def _calculate_feature_coords(self, program: Program) -> List[int]:
+        """
+        Calculate feature coordinates for the MAP-Elites grid
+
+        The raw feature values and the coordinates are cached on the program, and values
+        outside the fitted range of an adaptive dimension count towards refitting its bins.
+
+        Args:
+            program: Program to calculate features for
+
+        Returns:
+            List of feature coordinates
+        """
+        program.feature_values = self._calculate_feature_values(program)
+        program.feature_coords = [
+            self._bin_feature(dim, value) for dim, value in program.feature_values.items()
+        ]
+
+        for dim, (low, high) in self.feature_fitted_ranges.items():
+            value = program.feature_values.get(dim)
+            if value is not None and not low <= value <= high:
+                self.feature_drift += 1
+                break
+
+        return program.feature_coords
+
+    def _get_feature_coords(self, program: Program) -> List[int]:
+        """Feature coordinates of a program, calculated only if not cached"""
+        if program.feature_coords is None or list(program.feature_values) != (
+            self.config.feature_dimensions
+        ):
+            return self._calculate_feature_coords(program)
+        return program.feature_coords
+
+    def _should_refit_feature_bins(self) -> bool:
+        """Whether the adaptive bins are unfitted, outgrown or drifted"""
+        if not self.adaptive_dimensions:
+            return False
+        population = len(self.programs)
+        if not self.feature_fit_size:
+            return population >= max(self._num_feature_bins(d) for d in self.adaptive_dimensions)
+        return (
+            population >= 2 * self.feature_fit_size
+            or self.feature_drift > self.config.feature_rebin_drift * self.feature_fit_size
+        )
+
+    def _refit_feature_bins(self) -> None:
+        """
+        Fit quantile bins of the adaptive dimensions to the population, then re-bin every
+        program from its cached feature values and rebuild the feature map in one pass
+        """
+        for dim in self.adaptive_dimensions:
+            values = [
+                program.feature_values[dim]
+                for program in self.programs.values()
+                if program.feature_values.get(dim) is not None
+            ]
+            bins = self._num_feature_bins(dim)
+            if len(values) < bins:
+                continue
+            quantiles = np.linspace(0.0, 1.0, bins + 1)[1:-1]
+            self.feature_edges[dim] = [float(edge) for edge in np.quantile(values, quantiles)]
+            self.feature_fitted_ranges[dim] = (float(min(values)), float(max(values)))
+        self.feature_fit_size = len(self.programs)
+        self.feature_drift = 0
+
+        feature_map: Dict[str, str] = {}
+        for program in self.programs.values():
+            if list(program.feature_values) == self.config.feature_dimensions:
+                program.feature_coords = [
+                    self._bin_feature(dim, value) for dim, value in program.feature_values.items()
+                ]
+            feature_key = self._feature_coords_to_key(self._get_feature_coords(program))
+            if feature_key not in feature_map or self._is_better(
+                program, self.programs[feature_map[feature_key]]
+            ):
+                feature_map[feature_key] = program.id
+        self.feature_map = feature_map
 
-        return coords
+        logger.info(
+            f"Refit adaptive feature bins for {self.adaptive_dimensions}: "
+            f"{len(self.feature_map)} cells occupied by {len(self.programs)} programs"
+        )
 
     def _feature_coords_to_key(self, coords: List[int]) -> str:
         """
@@ -489,6 +888,15 @@ class ProgramDatabase:
         if not program1.metrics and program2.metrics:
             return False
 
+        # With Pareto objectives, a dominating program is better; otherwise fall through
+        if self.pareto is not None:
+            values1 = self._objective_vector(program1)
+            values2 = self._objective_vector(program2)
+            if dominates(values1, values2):
+                return True
+            if dominates(values2, values1):
+                return False
+
         # Check for combined_score first (this is the preferred metric)
         if "combined_score" in program1.metrics and "combined_score" in program2.metrics:
             return program1.metrics["combined_score"] > program2.metrics["combined_score"]
@@ -508,7 +916,15 @@ class ProgramDatabase:
         """
         # If archive not full, add program
         if len(self.archive) < self.config.archive_size:
-            self.archive.add(program.id)
+            self._archive_add(program.id)
+            return
+
+        # With Pareto objectives, replace the most crowded program of the worst front
+        if self.pareto is not None:
+            worst_id = max(self.archive, key=self.pareto.sort_key)
+            if self.pareto.sort_key(program.id) < self.pareto.sort_key(worst_id):
+                self._archive_discard(worst_id)
+                self._archive_add(program.id)
             return
 
         # Otherwise, find worst program in archive
@@ -517,8 +933,21 @@ class ProgramDatabase:
 
         # Replace if new program is better
         if self._is_better(program, worst_program):
-            self.archive.remove(worst_program.id)
-            self.archive.add(program.id)
+            self._archive_discard(worst_program.id)
+            self._archive_add(program.id)
+
+    def _archive_add(self, program_id: str) -> None:
+        """Add a program to the archive and to the archive of its island"""
+        self.archive.add(program_id)
+        island = self.programs[program_id].metadata.get("island")
+        if isinstance(island, int) and 0 <= island < len(self.island_archives):
+            self.island_archives[island].add(program_id)
+
+    def _archive_discard(self, program_id: str) -> None:
+        """Remove a program from the archive and the island archives"""
+        self.archive.discard(program_id)
+        for island_archive in self.island_archives:
+            island_archive.discard(program_id)
 
     def _update_best_program(self, program: Program) -> None:
         """
@@ -559,6 +988,15 @@ class ProgramDatabase:
         Returns:
             Parent program from current island
         """
+        if self.strategy_bandit is not None:
+            self.last_strategy = self.strategy_bandit.select()
+            strategy = SAMPLING_STRATEGIES[self.last_strategy]
+            if strategy == "exploration":
+                return self._sample_exploration_parent()
+            elif strategy == "exploitation":
+                return self._sample_exploitation_parent()
+            return self._sample_random_parent()
+
         # Use exploration_ratio and exploitation_ratio to decide sampling strategy
         rand_val = random.random()
 
@@ -583,8 +1021,11 @@ class ProgramDatabase:
             if self.best_program_id and self.best_program_id in self.programs:
                 # Clone best program to current island
                 best_program = self.programs[self.best_program_id]
-                self.islands[self.current_island].add(self.best_program_id)
+                self._add_to_island(self.current_island, self.best_program_id)
                 best_program.metadata["island"] = self.current_island
+                if self.best_program_id in self.archive:
+                    self._archive_discard(self.best_program_id)
+                    self._archive_add(self.best_program_id)
                 logger.debug(f"Initialized empty island {self.current_island} with best program")
                 return best_program
             else:
@@ -592,9 +1033,95 @@ class ProgramDatabase:
                 return next(iter(self.programs.values()))
 
         # Sample from current island
-        parent_id = random.choice(list(current_island_programs))
+        parent_id = self._select_from_island(self.current_island)
         return self.programs[parent_id]
 
+    def _make_island_selectors(self) -> List[Union[WeightedIndexedSet, RankedSet]]:
+        """Create the empty per-island structures the parent selection needs"""
+        # Reference fitness of the Boltzmann weights per island (None until one is finite)
+        self.boltzmann_references: List[Optional[float]] = [None] * len(self.islands)
+        if self.config.parent_selection in ("fitness_proportionate", "boltzmann"):
+            return [WeightedIndexedSet() for _ in self.islands]
+        if self.config.parent_selection == "rank":
+            return [RankedSet() for _ in self.islands]
+        return []
+
+    def _add_to_island(self, island_idx: int, program_id: str) -> None:
+        """Add a program to an island and its selection structure"""
+        self.islands[island_idx].add(program_id)
+        if self.island_selectors:
+            self._add_to_selector(island_idx, program_id)
+
+    def _add_to_selector(self, island_idx: int, program_id: str) -> None:
+        """Add a program to the selection structure of an island"""
+        fitness = self._get_fitness(self.programs[program_id])
+        selector = self.island_selectors[island_idx]
+        if isinstance(selector, RankedSet):
+            selector.add(program_id, fitness)
+        elif self.config.parent_selection == "boltzmann":
+            reference = self.boltzmann_references[island_idx]
+            temperature = max(self.config.selection_temperature, 1e-12)
+            if math.isfinite(fitness) and (
+                reference is None or (fitness - reference) / temperature > BOLTZMANN_REWEIGHT_MARGIN
+            ):
+                selector.add(program_id, 0.0)
+                self._reweight_boltzmann(island_idx)
+            else:
+                selector.add(program_id, self._boltzmann_weight(fitness, reference))
+        else:
+            selector.add(program_id, max(fitness, 0.0))
+
+    def _boltzmann_weight(self, fitness: float, reference: Optional[float]) -> float:
+        """Boltzmann weight of a fitness relative to a reference fitness"""
+        if reference is None or not math.isfinite(fitness):
+            return 0.0
+        temperature = max(self.config.selection_temperature, 1e-12)
+        return math.exp((fitness - reference) / temperature)
+
+    def _reweight_boltzmann(self, island_idx: int) -> None:
+        """Reset an island's Boltzmann reference to its best fitness and reweight its programs"""
+        selector = self.island_selectors[island_idx]
+        fitnesses = {pid: self._get_fitness(self.programs[pid]) for pid in selector}
+        finite = [fitness for fitness in fitnesses.values() if math.isfinite(fitness)]
+        reference = max(finite) if finite else None
+        self.boltzmann_references[island_idx] = reference
+        for program_id, fitness in fitnesses.items():
+            selector.set_weight(program_id, self._boltzmann_weight(fitness, reference))
+
+    def _remove_from_islands(self, program_id: str) -> None:
+        """Remove a program from all islands and their selection structures"""
+        for island in self.islands:
+            island.discard(program_id)
+        for selector in self.island_selectors:
+            selector.discard(program_id)
+
+    def _select_from_island(self, island_idx: int) -> str:
+        """
+        Select a parent ID from a non-empty island with the configured parent_selection
+
+        Returns:
+            ID of the selected program
+        """
+        selection = self.config.parent_selection
+        if selection == "boltzmann" and self.boltzmann_references[island_idx] is not None:
+            # The best programs were removed and the rest sank far below the reference
+            if self.island_selectors[island_idx].total_weight < math.exp(
+                -BOLTZMANN_REWEIGHT_MARGIN
+            ):
+                self._reweight_boltzmann(island_idx)
+        if selection in ("fitness_proportionate", "boltzmann"):
+            return self.island_selectors[island_idx].weighted_choice()
+        if selection == "rank":
+            return self.island_selectors[island_idx].linear_rank_choice()
+
+        island = self.islands[island_idx]
+        if selection == "tournament":
+            contestants = [island.choice() for _ in range(self.config.tournament_size)]
+            if self.pareto is not None:
+                return min(contestants, key=self.pareto.sort_key)
+            return max(contestants, key=lambda pid: self._get_fitness(self.programs[pid]))
+        return island.choice()
+
     def _sample_exploitation_parent(self) -> Program:
         """
         Sample a parent for exploitation (from archive/elite programs)
@@ -604,19 +1131,14 @@ class ProgramDatabase:
             return self._sample_exploration_parent()
 
         # Prefer programs from current island in archive
-        archive_programs_in_island = [
-            pid
-            for pid in self.archive
-            if pid in self.programs
-            and self.programs[pid].metadata.get("island") == self.current_island
-        ]
+        archive_programs_in_island = self.island_archives[self.current_island]
 
         if archive_programs_in_island:
-            parent_id = random.choice(archive_programs_in_island)
+            parent_id = archive_programs_in_island.choice()
             return self.programs[parent_id]
         else:
             # Fall back to any archive program if current island has none
-            parent_id = random.choice(list(self.archive))
+            parent_id = self.archive.choice()
             return self.programs[parent_id]
 
     def _sample_random_parent(self) -> Program:
@@ -627,7 +1149,7 @@ class ProgramDatabase:
             raise ValueError("No programs available for sampling")
 
         # Sample randomly from all programs
-        program_id = random.choice(list(self.programs.keys()))
+        program_id = self.program_ids.choice()
         return self.programs[program_id]
 
     def _sample_inspirations(self, parent: Program, n: int = 5) -> List[Program]:
@@ -662,15 +1184,15 @@ class ProgramDatabase:
             remaining_slots = n - len(inspirations)
 
             # Sample from different feature cells for diversity
-            feature_coords = self._calculate_feature_coords(parent)
+            feature_coords = self._get_feature_coords(parent)
 
             # Get programs from nearby feature cells
             nearby_programs = []
             for _ in range(remaining_slots):
                 # Perturb coordinates
                 perturbed_coords = [
-                    max(0, min(self.feature_bins - 1, c + random.randint(-1, 1)))
-                    for c in feature_coords
+                    max(0, min(self._num_feature_bins(dim) - 1, c + random.randint(-1, 1)))
+                    for dim, c in zip(self.config.feature_dimensions, feature_coords)
                 ]
 
                 # Try to get program from this cell
@@ -680,6 +1202,18 @@ class ProgramDatabase:
                     if program_id != parent.id and program_id not in [p.id for p in inspirations]:
                         nearby_programs.append(self.programs[program_id])
 
+            # With embeddings, fill up with the programs farthest from the parent
+            if (
+                self.config.diversity_metric == "feature_based"
+                and len(inspirations) + len(nearby_programs) < n
+            ):
+                excluded_ids = {p.id for p in inspirations}.union(p.id for p in nearby_programs)
+                for program in self.find_farthest_programs(parent, n=n + len(excluded_ids)):
+                    if len(inspirations) + len(nearby_programs) >= n:
+                        break
+                    if program.id not in excluded_ids:
+                        nearby_programs.append(program)
+
             # If we need more, add random programs
             if len(inspirations) + len(nearby_programs) < n:
                 remaining = n - len(inspirations) - len(nearby_programs)
@@ -700,85 +1234,167 @@ class ProgramDatabase:
 
         return inspirations[:n]
 
+    def _age_layer(self, program: Program) -> int:
+        """Age layer of a program by generation (always 0 without age-layered eviction)"""
+        layers = getattr(self.config, "age_layers", 0)
+        if layers <= 1:
+            return 0
+        gap = max(getattr(self.config, "age_layer_gap", 10), 1)
+        return min(program.generation // gap, layers - 1)
+
+    def _push_eviction_entry(self, program: Program) -> None:
+        """Add a program to the fitness heap of its age layer"""
+        entry = (self._get_fitness(program), next(self.eviction_counter), program.id)
+        self.eviction_entries[program.id] = entry
+        heapq.heappush(self.eviction_heaps.setdefault(self._age_layer(program), []), entry)
+
+    def _rebuild_eviction_heaps(self) -> None:
+        """Rebuild the fitness heaps from the population, dropping stale entries"""
+        self.eviction_heaps = {}
+        self.eviction_entries = {}
+        for program in self.programs.values():
+            self._push_eviction_entry(program)
+
+    def _protected_program_ids(self) -> Set[str]:
+        """
+        IDs of programs that batch eviction never removes: the best program, the
+        MAP-Elites cell elites, the archive and the best program of each island
+        """
+        protected = set(self.feature_map.values())
+        protected.update(self.archive)
+        if self.best_program_id is not None:
+            protected.add(self.best_program_id)
+        for island in self.islands:
+            champions = [pid for pid in island if pid in self.programs]
+            if champions:
+                protected.add(max(champions, key=lambda pid: self._get_fitness(self.programs[pid])))
+        return protected
+
+    def _age_layer_quotas(self, counts: Dict[int, int], capacity: int) -> Dict[int, int]:
+        """
+        Split a population capacity evenly between age layers
+
+        Layers smaller than their share keep all their programs, and the unused
+        capacity is shared among the remaining layers.
+        """
+        quotas = {}
+        remaining = sorted(counts, key=lambda layer: (counts[layer], layer))
+        while remaining and counts[remaining[0]] <= capacity // len(remaining):
+            layer = remaining.pop(0)
+            quotas[layer] = counts[layer]
+            capacity -= counts[layer]
+        for i, layer in enumerate(sorted(remaining)):
+            quotas[layer] = capacity // len(remaining) + (1 if i < capacity % len(remaining) else 0)
+        return quotas
+
     def _enforce_population_limit(self) -> None:
         """
-        Enforce the population size limit by removing worst programs if needed
+        Evict the worst programs in one batch once the population passes its high watermark
+
+        The population may grow to population_size plus population_slack before a batch
+        brings it back down to population_size, so the cost of eviction is amortized over
+        the programs added in between. Programs are taken worst first from per-age-layer
+        fitness heaps, skipping the protected elites, so each eviction costs O(log n).
         """
-        if len(self.programs) <= self.config.population_size:
+        limit = self.config.population_size
+        high_watermark = limit + int(limit * getattr(self.config, "population_slack", 0.0))
+        if len(self.programs) <= high_watermark:
             return
 
-        # Calculate how many programs to remove
-        num_to_remove = len(self.programs) - self.config.population_size
-
         logger.info(
-            f"Population size ({len(self.programs)}) exceeds limit ({self.config.population_size}), removing {num_to_remove} programs"
+            f"Population size ({len(self.programs)}) exceeds limit ({limit}), "
+            f"evicting {len(self.programs) - limit} programs"
         )
 
-        # Get programs sorted by fitness (worst first)
-        all_programs = list(self.programs.values())
-
-        # Sort by average metric (worst first)
-        sorted_programs = sorted(
-            all_programs,
-            key=lambda p: safe_numeric_average(p.metrics),
-        )
+        # Stale entries accumulate from removals and re-added programs
+        if sum(len(heap) for heap in self.eviction_heaps.values()) > 2 * len(self.programs):
+            self._rebuild_eviction_heaps()
 
-        # Remove worst programs, but never remove the best program
-        programs_to_remove = []
-        for program in sorted_programs:
-            if len(programs_to_remove) >= num_to_remove:
-                break
-            # Don't remove the best program
-            if program.id != self.best_program_id:
-                programs_to_remove.append(program)
-
-        # If we still need to remove more and only have the best program protected,
-        # remove from the remaining programs anyway (but keep the absolute best)
-        if len(programs_to_remove) < num_to_remove:
-            remaining_programs = [
-                p
-                for p in sorted_programs
-                if p not in programs_to_remove and p.id != self.best_program_id
-            ]
-            additional_removals = remaining_programs[: num_to_remove - len(programs_to_remove)]
-            programs_to_remove.extend(additional_removals)
+        protected = self._protected_program_ids()
+        counts: Dict[int, int] = {}
+        for program in self.programs.values():
+            layer = self._age_layer(program)
+            counts[layer] = counts.get(layer, 0) + 1
+        quotas = self._age_layer_quotas(counts, limit)
+
+        excess = {layer: counts[layer] - quotas[layer] for layer in counts}
+
+        # With Pareto objectives, evict from the worst front, most crowded first
+        if self.pareto is not None:
+            for program_id in self.pareto.worst_first():
+                layer = self._age_layer(self.programs[program_id])
+                if excess[layer] > 0 and program_id not in protected:
+                    self._remove_program(program_id, elite=False)
+                    excess[layer] -= 1
+
+        for layer, heap in self.eviction_heaps.items() if self.pareto is None else ():
+            kept = []
+            while excess.get(layer, 0) > 0 and heap:
+                entry = heapq.heappop(heap)
+                program_id = entry[2]
+                if self.eviction_entries.get(program_id) is not entry:
+                    continue
+                if program_id in protected:
+                    kept.append(entry)
+                    continue
+                self._remove_program(program_id, elite=False)
+                excess[layer] -= 1
+            for entry in kept:
+                heapq.heappush(heap, entry)
+
+        # Too many protected programs to get under the limit: evict the worst of them too,
+        # but never the best program
+        if len(self.programs) > high_watermark:
+            if self.pareto is not None:
+                candidates = self.pareto.worst_first()
+            else:
+                candidates = [p.id for p in sorted(self.programs.values(), key=self._get_fitness)]
+            candidates = [pid for pid in candidates if pid != self.best_program_id]
+            for program_id in candidates[: len(self.programs) - limit]:
+                self._remove_program(program_id)
 
-        # Remove the selected programs
-        for program in programs_to_remove:
-            program_id = program.id
+        logger.info(f"Population size after cleanup: {len(self.programs)}")
 
-            # Remove from main programs dict
-            if program_id in self.programs:
-                del self.programs[program_id]
+    def _remove_program(self, program_id: str, elite: bool = True) -> None:
+        """
+        Remove a program from the population and every index
 
-            # Remove from feature map
-            keys_to_remove = []
-            for key, pid in self.feature_map.items():
-                if pid == program_id:
-                    keys_to_remove.append(key)
+        Args:
+            program_id: ID of the program to remove
+            elite: Whether the program may be a MAP-Elites cell elite (otherwise the
+                feature map is not scanned)
+        """
+        self.programs.pop(program_id, None)
+        self.program_ids.discard(program_id)
+        with self._live_program_ids_lock:
+            self.live_program_ids.discard(program_id)
+        self.eviction_entries.pop(program_id, None)
+        if self.pareto is not None:
+            self.pareto.discard(program_id)
+
+        if elite:
+            keys_to_remove = [key for key, pid in self.feature_map.items() if pid == program_id]
             for key in keys_to_remove:
                 del self.feature_map[key]
 
-            # Remove from islands
-            for island in self.islands:
-                island.discard(program_id)
-
-            # Remove from archive
-            self.archive.discard(program_id)
+        self._remove_from_islands(program_id)
+        self._archive_discard(program_id)
+        self._unindex_program(program_id)
+        self.artifact_cache.discard(program_id)
 
-            logger.debug(f"Removed program {program_id} due to population limit")
+        logger.debug(f"Removed program {program_id} due to population limit")
 
-        logger.info(f"Population size after cleanup: {len(self.programs)}")
-
-    # Island management methods
     def set_current_island(self, island_idx: int) -> None:
         """Set which island is currently being evolved"""
         self.current_island = island_idx % len(self.islands)
         logger.debug(f"Switched to evolving island {self.current_island}")
 
     def next_island(self) -> int:
-        """Move to the next island in round-robin fashion"""
-        self.current_island = (self.current_island + 1) % len(self.islands)
+        """Move to the next island in round-robin fashion (or as chosen by the island bandit)"""
+        if self.island_bandit is not None:
+            self.current_island = self.island_bandit.select()
+        else:
+            self.current_island = (self.current_island + 1) % len(self.islands)
         logger.debug(f"Advanced to island {self.current_island}")
         return self.current_island
 
@@ -788,6 +1404,81 @@ class ProgramDatabase:
         self.island_generations[idx] += 1
         logger.debug(f"Island {idx} generation incremented to {self.island_generations[idx]}")
 
+    def _make_bandit(self, num_arms: int) -> Bandit:
+        """Create a bandit with the configured policy"""
+        return Bandit(
+            num_arms,
+            policy=self.config.bandit_policy,
+            exploration=self.config.bandit_exploration,
+            decay=self.config.bandit_decay,
+        )
+
+    def get_improvement(self, parent: Program, child: Program) -> float:
+        """
+        Fitness gained by a child over its parent
+
+        Uses combined_score when both programs have it, like _is_better, and the average
+        of the numeric metrics otherwise.
+
+        Args:
+            parent: Parent program
+            child: Child program
+
+        Returns:
+            Child fitness minus parent fitness
+        """
+        if "combined_score" in child.metrics and "combined_score" in parent.metrics:
+            return child.metrics["combined_score"] - parent.metrics["combined_score"]
+        return safe_numeric_average(child.metrics) - safe_numeric_average(parent.metrics)
+
+    def _objective_vector(self, program: Program) -> List[float]:
+        """
+        Values of the Pareto objectives of a program, negated where minimized so that
+        higher is always better (missing or non-finite metrics count as worst)
+        """
+        minimize = getattr(self.config, "pareto_minimize", [])
+        values = []
+        for name in self.pareto_objectives:
+            value = program.metrics.get(name)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                value = float("nan")
+            value = -float(value) if name in minimize else float(value)
+            values.append(value if math.isfinite(value) else float("-inf"))
+        return values
+
+    def _get_fitness(self, program: Program) -> float:
+        """Fitness of a program for parent selection (combined_score, else metric average)"""
+        value = program.metrics.get("combined_score")
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            value = safe_numeric_average(program.metrics)
+        value = float(value)
+        # Programs with undefined fitness are never preferred
+        return value if math.isfinite(value) else float("-inf")
+
+    def record_outcome(self, parent: Program, child: Optional[Program], cost: float = 1.0) -> float:
+        """
+        Credit the selection bandits with the improvement of a child over its parent
+
+        The sampling strategy of the last sampled parent and the child's island are
+        credited. Does nothing unless adaptive selection is enabled.
+
+        Args:
+            parent: Parent program the child was generated from
+            child: Child program after evaluation, or None if no usable child was produced
+            cost: Cost of producing the child (e.g. seconds the iteration took)
+
+        Returns:
+            Improvement of the child over the parent (0 without a child)
+        """
+        improvement = self.get_improvement(parent, child) if child is not None else 0.0
+        if self.strategy_bandit is not None and self.last_strategy is not None:
+            self.strategy_bandit.update(self.last_strategy, improvement, cost)
+        if self.island_bandit is not None:
+            island = child.metadata.get("island") if child is not None else None
+            island = self.current_island if island is None else island
+            self.island_bandit.update(island % len(self.islands), improvement, cost)
+        return improvement
+
     def should_migrate(self) -> bool:
         """Check if migration should occur based on generation counters"""
         max_generation = max(self.island_generations)
@@ -797,60 +1488,69 @@ class ProgramDatabase:
         """
         Perform migration between islands
 
-        This should be called periodically to share good solutions between islands
+        This should be called periodically to share good solutions between islands.
+        Each island's migrants are chosen first and then added to the target islands of
+        the configured topology. Migrants are shared, not copied: a program can be a member
+        of several islands, and programs already on a target island are skipped.
         """
         if len(self.islands) < 2:
             return
 
-        logger.info("Performing migration between islands")
+        logger.info(f"Performing migration between islands ({self.config.migration_topology})")
 
+        # Choose all migrants before moving any, so they do not travel on in the same round
+        transfers = []
         for i, island in enumerate(self.islands):
             if len(island) == 0:
                 continue
-
-            # Select top programs from this island for migration
-            island_programs = [self.programs[pid] for pid in island if pid in self.programs]
-            if not island_programs:
+            migrants = self.get_migrants(i)
+            if not migrants:
                 continue
-
-            # Sort by fitness (using combined_score or average metrics)
-            island_programs.sort(
-                key=lambda p: p.metrics.get("combined_score", safe_numeric_average(p.metrics)),
-                reverse=True,
+            targets = get_migration_targets(
+                i, len(self.islands), self.config.migration_topology, self.config.migration_k
             )
-
-            # Select top programs for migration
-            num_to_migrate = max(1, int(len(island_programs) * self.migration_rate))
-            migrants = island_programs[:num_to_migrate]
-
-            # Migrate to adjacent islands (ring topology)
-            target_islands = [(i + 1) % len(self.islands), (i - 1) % len(self.islands)]
-
-            for migrant in migrants:
-                for target_island in target_islands:
-                    # Create a copy for migration (to avoid removing from source)
-                    migrant_copy = Program(
-                        id=f"{migrant.id}_migrant_{target_island}",
-                        code=migrant.code,
-                        language=migrant.language,
-                        parent_id=migrant.id,
-                        generation=migrant.generation,
-                        metrics=migrant.metrics.copy(),
-                        metadata={**migrant.metadata, "island": target_island, "migrant": True},
-                    )
-
-                    # Add to target island
-                    self.islands[target_island].add(migrant_copy.id)
-                    self.programs[migrant_copy.id] = migrant_copy
-
-                    logger.debug(
-                        f"Migrated program {migrant.id} from island {i} to island {target_island}"
-                    )
+            transfers.append((i, migrants, targets))
+
+        for source, migrants, targets in transfers:
+            for target_island in targets:
+                added = 0
+                for migrant in migrants:
+                    if migrant.id not in self.islands[target_island]:
+                        self._add_to_island(target_island, migrant.id)
+                        added += 1
+                logger.debug(
+                    f"Migrated {added} programs from island {source} to island {target_island}"
+                )
 
         # Update last migration generation
         self.last_migration_generation = max(self.island_generations)
         logger.info(f"Migration completed at generation {self.last_migration_generation}")
 
+    def get_migrants(self, island_idx: int) -> List[Program]:
+        """
+        Select the programs an island sends to its neighbors during migration
+
+        Args:
+            island_idx: Index of the source island
+
+        Returns:
+            Top programs of the island by fitness (migration_rate fraction, at least one)
+        """
+        island_programs = [
+            self.programs[pid] for pid in self.islands[island_idx] if pid in self.programs
+        ]
+        if not island_programs:
+            return []
+
+        # Sort by fitness (using combined_score or average metrics)
+        island_programs.sort(
+            key=lambda p: p.metrics.get("combined_score", safe_numeric_average(p.metrics)),
+            reverse=True,
+        )
+
+        num_to_migrate = max(1, int(len(island_programs) * self.migration_rate))
+        return island_programs[:num_to_migrate]
+
     def get_island_stats(self) -> List[dict]:
         """Get statistics for each island"""
         stats = []
@@ -889,21 +1589,245 @@ class ProgramDatabase:
         if len(programs) < 2:
             return 0.0
 
-        total_distance = 0
-        comparisons = 0
-
         # Sample up to 10 programs for efficiency
         sample_size = min(10, len(programs))
         sample_programs = (
             random.sample(programs, sample_size) if len(programs) > sample_size else programs
         )
 
-        for i, prog1 in enumerate(sample_programs):
-            for prog2 in sample_programs[i + 1 :]:
-                total_distance += calculate_edit_distance(prog1.code, prog2.code)
-                comparisons += 1
+        if self.config.diversity_metric == "feature_based":
+            embeddings = np.stack([self._get_embedding(p) for p in sample_programs])
+            similarity = embeddings @ embeddings.T
+            lengths = np.array([len(p.code) for p in sample_programs])
+            distances = (1.0 - similarity) * np.maximum(lengths[:, None], lengths[None, :])
+            upper = np.triu_indices(len(sample_programs), k=1)
+            return float(distances[upper].mean())
+
+        if self.config.diversity_metric == "edit_distance":
+            total_distance = 0
+            comparisons = 0
+            for i, prog1 in enumerate(sample_programs):
+                for prog2 in sample_programs[i + 1 :]:
+                    total_distance += calculate_edit_distance(prog1.code, prog2.code)
+                    comparisons += 1
+            return total_distance / max(1, comparisons)
+
+        # Estimate all pairwise distances at once from the sketches
+        similarity = pairwise_similarity([self._get_sketch(p) for p in sample_programs])
+        lengths = np.array([len(p.code) for p in sample_programs])
+        distances = (1.0 - similarity) * np.maximum(lengths[:, None], lengths[None, :])
+        upper = np.triu_indices(len(sample_programs), k=1)
+        return float(distances[upper].mean())
+
+    def _get_sketch(self, program: Program) -> np.ndarray:
+        """
+        Get the MinHash sketch of a program, indexing the program if needed
+
+        Args:
+            program: Program to sketch
+
+        Returns:
+            MinHash sketch of the normalized program code
+        """
+        sketch = self.sketches.get(program.id)
+        if sketch is None:
+            sketch = self._index_program(program)
+        return sketch
+
+    def _index_program(self, program: Program) -> np.ndarray:
+        """
+        Sketch a program and add it to the near-duplicate indexes
+
+        Args:
+            program: Program to index
+
+        Returns:
+            MinHash sketch of the normalized program code
+        """
+        stored = self.stored_sketches.pop(program.id, None)
+        if stored is not None:
+            sketch, code_hash = stored
+        else:
+            normalized = normalize_code(program.code, program.language)
+            code_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+            sketch = compute_minhash(
+                normalized, self.config.sketch_size, self.config.sketch_shingle_size
+            )
+
+        self._add_to_indexes(program.id, sketch, code_hash)
+        return sketch
+
+    def _add_to_indexes(self, program_id: str, sketch: np.ndarray, code_hash: str) -> None:
+        """Record the sketch and code hash of a program in the near-duplicate indexes"""
+        self.sketches[program_id] = sketch
+        self.program_hashes[program_id] = code_hash
+        self.code_hashes.setdefault(code_hash, set()).add(program_id)
+        self.lsh.add(program_id, sketch)
+
+    def _unindex_program(self, program_id: str) -> None:
+        """
+        Remove a program from the sketch and near-duplicate indexes
+
+        Args:
+            program_id: ID of the program to remove
+        """
+        self.sketches.pop(program_id, None)
+        self.stored_sketches.pop(program_id, None)
+        self.lsh.remove(program_id)
+        if self.embedding_index is not None:
+            self.embedding_index.remove(program_id)
+
+        code_hash = self.program_hashes.pop(program_id, None)
+        if code_hash is not None:
+            ids = self.code_hashes.get(code_hash)
+            if ids is not None:
+                ids.discard(program_id)
+                if not ids:
+                    del self.code_hashes[code_hash]
+
+    def find_duplicate(self, code: str, language: str = "python") -> Optional[Program]:
+        """
+        Find an existing program that is an exact or near-duplicate of some code
+
+        Code is normalized first (comments and formatting are ignored), so trivial
+        reformattings of an existing program are reported as duplicates.
+
+        Args:
+            code: Candidate program code
+            language: Programming language of the code
+
+        Returns:
+            The matching program, or None if the code is sufficiently novel
+        """
+        # Index programs that were loaded or migrated without going through add()
+        if len(self.sketches) < len(self.programs):
+            for program in list(self.programs.values()):
+                if program.id not in self.sketches:
+                    self._index_program(program)
+
+        normalized = normalize_code(code, language)
+        code_hash = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        for program_id in self.code_hashes.get(code_hash, ()):
+            if program_id in self.programs:
+                return self.programs[program_id]
+
+        sketch = compute_minhash(
+            normalized, self.config.sketch_size, self.config.sketch_shingle_size
+        )
+        for program_id, similarity in self.lsh.query(sketch, self.config.duplicate_threshold):
+            if program_id in self.programs:
+                logger.debug(f"Found near-duplicate {program_id} (similarity {similarity:.2f})")
+                return self.programs[program_id]
+
+        return None
+
+    def _program_distance(self, program1: Program, program2: Program) -> float:
+        """
+        Calculate the distance between two programs using the configured diversity metric
+
+        Args:
+            program1: First program
+            program2: Second program
+
+        Returns:
+            Exact or approximate edit distance
+        """
+        if self.config.diversity_metric == "edit_distance":
+            return calculate_edit_distance(program1.code, program2.code)
+
+        if self.config.diversity_metric == "feature_based":
+            # Cosine distance scaled to the edit-distance range used for binning
+            similarity = float(self._get_embedding(program1) @ self._get_embedding(program2))
+            return (1.0 - similarity) * max(len(program1.code), len(program2.code))
+
+        return estimate_edit_distance(
+            self._get_sketch(program1),
+            self._get_sketch(program2),
+            len(program1.code),
+            len(program2.code),
+        )
+
+    def _get_embedding(self, program: Program) -> np.ndarray:
+        """
+        Get the code embedding of a program, computing and indexing it if needed
+
+        Args:
+            program: Program to embed
+
+        Returns:
+            Unit-norm embedding vector
+        """
+        if self.embedding_index is not None:
+            embedding = self.embedding_index.get(program.id)
+            if embedding is not None:
+                return embedding
+
+        embedding = np.asarray(self.embedder(program.code), dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+
+        if self.embedding_index is None:
+            self.embedding_index = VectorIndex(len(embedding))
+            if self.embedding_components:
+                self.embedding_projection = random_projection(
+                    len(embedding), self.embedding_components
+                )
+
+        # Only index programs that are part of the population
+        if program.id in self.programs:
+            self.embedding_index.add(program.id, embedding)
+        return embedding
 
-        return total_distance / max(1, comparisons)
+    def _ensure_embeddings_indexed(self) -> None:
+        """Embed programs that were loaded or migrated without going through add()"""
+        if self.embedding_index is None or len(self.embedding_index) < len(self.programs):
+            for program in list(self.programs.values()):
+                self._get_embedding(program)
+
+    def find_nearest_programs(self, program: Program, n: int = 5) -> List[Program]:
+        """
+        Find the programs most similar to a given program
+
+        Args:
+            program: Program to find neighbors for
+            n: Number of neighbors to return
+
+        Returns:
+            List of up to n programs, most similar first (excluding the program itself)
+        """
+        return self._find_neighbors(program, n, farthest=False)
+
+    def find_farthest_programs(self, program: Program, n: int = 5) -> List[Program]:
+        """
+        Find the programs least similar to a given program
+
+        Args:
+            program: Program to find distant programs for
+            n: Number of programs to return
+
+        Returns:
+            List of up to n programs, least similar first
+        """
+        return self._find_neighbors(program, n, farthest=True)
+
+    def _find_neighbors(self, program: Program, n: int, farthest: bool) -> List[Program]:
+        """Rank programs by similarity using embeddings or sketches"""
+        if self.embedder is not None and self.config.diversity_metric == "feature_based":
+            self._ensure_embeddings_indexed()
+            results = self.embedding_index.search(
+                self._get_embedding(program), k=n + 1, farthest=farthest, exclude=program.id
+            )
+            return [self.programs[pid] for pid, _ in results[:n] if pid in self.programs]
+
+        candidates = [p for pid, p in self.programs.items() if pid != program.id]
+        if not candidates:
+            return []
+
+        sketch = self._get_sketch(program)
+        similarities = (np.stack([self._get_sketch(p) for p in candidates]) == sketch).mean(axis=1)
+        order = np.argsort(similarities if farthest else -similarities, kind="stable")[:n]
+        return [candidates[i] for i in order]
 
     def log_island_status(self) -> None:
         """Log current status of all islands"""
@@ -919,13 +1843,20 @@ class ProgramDatabase:
 
     # Artifact storage and retrieval methods
 
-    def store_artifacts(self, program_id: str, artifacts: Dict[str, Union[str, bytes]]) -> None:
+    def store_artifacts(
+        self,
+        program_id: str,
+        artifacts: Dict[str, Union[str, bytes]],
+        max_bytes: Optional[int] = None,
+    ) -> None:
         """
         Store artifacts for a program
 
         Args:
             program_id: ID of the program
             artifacts: Dictionary of artifact name to content
+            max_bytes: Maximum total size of the program's artifacts; the largest ones
+                are truncated (text) or dropped (binary) to fit
         """
         if not artifacts:
             return
@@ -941,6 +1872,10 @@ class ProgramDatabase:
             logger.debug("Artifacts disabled, skipping storage")
             return
 
+        self.artifact_cache.discard(program_id)
+        if max_bytes is not None:
+            artifacts = self._limit_artifacts(program_id, artifacts, max_bytes)
+
         # Split artifacts by size
         small_artifacts = {}
         large_artifacts = {}
@@ -958,20 +1893,31 @@ class ProgramDatabase:
             program.artifacts_json = json.dumps(small_artifacts, default=self._artifact_serializer)
             logger.debug(f"Stored {len(small_artifacts)} small artifacts for program {program_id}")
 
-        # Store large artifacts to disk
+        # Store large artifacts in the content-addressed store, deduplicated across programs
         if large_artifacts:
-            artifact_dir = self._create_artifact_dir(program_id)
-            program.artifact_dir = artifact_dir
-            for key, value in large_artifacts.items():
-                self._write_artifact_file(artifact_dir, key, value)
+            store = self._get_artifact_store()
+            try:
+                store.put(program_id, large_artifacts)
+            except OSError as e:
+                logger.warning(f"Failed to store artifacts of program {program_id}: {e}")
+                return
+            program.artifact_dir = store.path
             logger.debug(f"Stored {len(large_artifacts)} large artifacts for program {program_id}")
 
-    def get_artifacts(self, program_id: str) -> Dict[str, Union[str, bytes]]:
+    def get_artifacts(
+        self, program_id: str, max_length: Optional[int] = None
+    ) -> Dict[str, Union[str, bytes]]:
         """
         Retrieve all artifacts for a program
 
+        Artifacts are cached (see artifact_cache_bytes), so repeatedly sampled parents
+        are not read from disk again.
+
         Args:
             program_id: ID of the program
+            max_length: If set, return the artifacts ready for display: as text truncated
+                to this many characters. Larger artifacts are then only read from disk as
+                far as needed.
 
         Returns:
             Dictionary of artifact name to content
@@ -980,6 +1926,10 @@ class ProgramDatabase:
         if not program:
             return {}
 
+        cached = self.artifact_cache.get(program_id, max_length)
+        if cached is not None:
+            return dict(cached)
+
         artifacts = {}
 
         # Load small artifacts from JSON
@@ -990,12 +1940,88 @@ class ProgramDatabase:
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to decode artifacts JSON for program {program_id}: {e}")
 
-        # Load large artifacts from disk
+        # Load large artifacts from the artifact store, or from the per-program directory
+        # of loose files written by older versions
         if program.artifact_dir and os.path.exists(program.artifact_dir):
-            disk_artifacts = self._load_artifact_dir(program.artifact_dir)
-            artifacts.update(disk_artifacts)
+            if ArtifactStore.is_store(program.artifact_dir):
+                store = self._get_artifact_store(program.artifact_dir)
+                artifacts.update(store.get(program_id, max_length))
+            else:
+                disk_artifacts = self._load_artifact_dir(program.artifact_dir, max_length)
+                artifacts.update(disk_artifacts)
+
+        if max_length is not None:
+            artifacts = {
+                key: truncate_artifact(
+                    (
+                        value.decode("utf-8", errors="replace")
+                        if isinstance(value, bytes)
+                        else str(value)
+                    ),
+                    max_length,
+                )
+                for key, value in artifacts.items()
+            }
+
+        self.artifact_cache.put(program_id, artifacts, max_length)
+        return dict(artifacts)
+
+    def _limit_artifacts(
+        self, program_id: str, artifacts: Dict[str, Union[str, bytes]], max_bytes: int
+    ) -> Dict[str, Union[str, bytes]]:
+        """Fit artifacts into a size budget, keeping the smallest ones whole"""
+        sizes = {key: self._get_artifact_size(value) for key, value in artifacts.items()}
+        if sum(sizes.values()) <= max_bytes:
+            return artifacts
+
+        marker = "\n... (truncated)"
+        limited = {}
+        budget = max_bytes
+        for key in sorted(artifacts, key=lambda k: sizes[k]):
+            value = artifacts[key]
+            if sizes[key] <= budget:
+                limited[key] = value
+                budget -= sizes[key]
+            elif isinstance(value, str) and budget > len(marker):
+                prefix = value.encode("utf-8")[: budget - len(marker)]
+                limited[key] = prefix.decode("utf-8", errors="ignore") + marker
+                budget = 0
+            else:
+                logger.warning(
+                    f"Dropping artifact {key} of program {program_id}: "
+                    f"over the {max_bytes} byte artifact storage limit"
+                )
 
-        return artifacts
+        # Keep the original artifact order
+        return {key: limited[key] for key in artifacts if key in limited}
+
+    def _get_artifact_store(self, path: Optional[str] = None) -> ArtifactStore:
+        """
+        Get (and create on first use) the artifact store at a path
+
+        Args:
+            path: Store directory (defaults to artifacts_base_path or db_path/artifacts)
+
+        Returns:
+            Artifact store, with background garbage collection running if configured
+        """
+        path = path or self._artifact_base_path()
+        store = self.artifact_stores.get(path)
+        if store is None:
+            store = ArtifactStore(path)
+            self.artifact_stores[path] = store
+            if getattr(self.config, "cleanup_old_artifacts", False):
+                store.start_gc(
+                    self._snapshot_live_program_ids,
+                    self.config.artifact_retention_days,
+                    self.config.artifact_gc_interval,
+                )
+        return store
+
+    def _snapshot_live_program_ids(self) -> Set[str]:
+        """IDs of the programs in the database, safe to call from other threads"""
+        with self._live_program_ids_lock:
+            return set(self.live_program_ids)
 
     def _get_artifact_size(self, value: Union[str, bytes]) -> int:
         """Get size of an artifact value in bytes"""
@@ -1018,8 +2044,8 @@ class ProgramDatabase:
             return base64.b64decode(dct["__bytes__"])
         return dct
 
-    def _create_artifact_dir(self, program_id: str) -> str:
-        """Create artifact directory for a program"""
+    def _artifact_base_path(self) -> str:
+        """Directory of the artifact store"""
         base_path = getattr(self.config, "artifacts_base_path", None)
         if not base_path:
             base_path = (
@@ -1027,36 +2053,12 @@ class ProgramDatabase:
                 if self.config.db_path
                 else "./artifacts"
             )
+        return base_path
 
-        artifact_dir = os.path.join(base_path, program_id)
-        os.makedirs(artifact_dir, exist_ok=True)
-        return artifact_dir
-
-    def _write_artifact_file(self, artifact_dir: str, key: str, value: Union[str, bytes]) -> None:
-        """Write an artifact to a file"""
-        # Sanitize filename
-        safe_key = "".join(c for c in key if c.isalnum() or c in "._-")
-        if not safe_key:
-            safe_key = "artifact"
-
-        file_path = os.path.join(artifact_dir, safe_key)
-
-        try:
-            if isinstance(value, str):
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(value)
-            elif isinstance(value, bytes):
-                with open(file_path, "wb") as f:
-                    f.write(value)
-            else:
-                # Convert to string and write
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(str(value))
-        except Exception as e:
-            logger.warning(f"Failed to write artifact {key} to {file_path}: {e}")
-
-    def _load_artifact_dir(self, artifact_dir: str) -> Dict[str, Union[str, bytes]]:
-        """Load artifacts from a directory"""
+    def _load_artifact_dir(
+        self, artifact_dir: str, max_length: Optional[int] = None
+    ) -> Dict[str, Union[str, bytes]]:
+        """Load artifacts from a directory (only their first max_length + 1 characters)"""
         artifacts = {}
 
         try:
@@ -1064,6 +2066,11 @@ class ProgramDatabase:
                 file_path = os.path.join(artifact_dir, filename)
                 if os.path.isfile(file_path):
                     try:
+                        if max_length is not None:
+                            with open(file_path, "rb") as f:
+                                content = read_text_prefix(f, max_length + 1)
+                            artifacts[filename] = content.decode("utf-8", errors="replace")
+                            continue
                         # Try to read as text first
                         with open(file_path, "r", encoding="utf-8") as f:
                             content = f.read()
@@ -19,6 +19,7 @@ import traceback
 
 from openevolve.config import EvaluatorConfig
 from openevolve.evaluation_result import EvaluationResult
+from openevolve.job_queue import JobQueue
 from openevolve.llm.ensemble import LLMEnsemble
 from openevolve.utils.async_utils import TaskPool, run_in_executor
 from openevolve.prompt.sampler import PromptSampler
@@ -56,6 +57,18 @@ class Evaluator:
         # Pending artifacts storage for programs
         self._pending_artifacts: Dict[str, Dict[str, Union[str, bytes]]] = {}
 
+        # Job queue shared with openevolve-worker processes for distributed evaluation
+        self.job_queue: Optional[JobQueue] = None
+        if config.distributed:
+            if not config.queue_path:
+                raise ValueError("Distributed evaluation requires evaluator.queue_path")
+            self.job_queue = JobQueue(
+                config.queue_path,
+                lease_timeout=config.lease_timeout,
+                max_attempts=config.max_job_attempts,
+            )
+            logger.info(f"Distributing evaluations through job queue {config.queue_path}")
+
         logger.info(f"Initialized evaluator with {evaluation_file}")
 
     def _load_evaluation_function(self) -> None:
@@ -98,6 +111,9 @@ class Evaluator:
         Returns:
             Dictionary of metric name to score
         """
+        if self.job_queue is not None:
+            return await self._distributed_evaluate(program_code, program_id)
+
         start_time = time.time()
         program_id_str = f" {program_id}" if program_id else ""
 
@@ -174,6 +190,69 @@ class Evaluator:
         )
         return {"error": 0.0}
 
+    async def _distributed_evaluate(self, program_code: str, program_id: str) -> Dict[str, float]:
+        """
+        Evaluate a program on a distributed worker through the job queue
+
+        Workers run the evaluation (including cascade stages and retries); lost workers
+        are detected here by their missing heartbeats and their jobs requeued. A job that
+        no worker completes in time is cancelled and scored like a failed evaluation.
+
+        Args:
+            program_code: Code to evaluate
+            program_id: ID of the program (used as the job ID)
+
+        Returns:
+            Dictionary of metric name to score
+        """
+        start_time = time.time()
+        program_id = program_id or str(uuid.uuid4())
+        artifacts_enabled = os.environ.get("ENABLE_ARTIFACTS", "true").lower() == "true"
+
+        # Each attempt may run for the evaluation timeout plus the lease before it expires
+        deadline = start_time + self.config.max_job_attempts * (
+            self.config.timeout + self.config.lease_timeout
+        )
+
+        job_id = self.job_queue.submit(program_id, program_code)
+        while True:
+            result = self.job_queue.pop_result(job_id)
+            if result is not None:
+                break
+            if time.time() > deadline:
+                self.job_queue.cancel(job_id)
+                logger.error(
+                    f"No worker completed the evaluation of program {program_id} within "
+                    f"{deadline - start_time:.0f}s; cancelled job {job_id}"
+                )
+                if artifacts_enabled:
+                    self._pending_artifacts[program_id] = {
+                        "stderr": "Distributed evaluation timed out",
+                        "failure_stage": "distributed",
+                    }
+                return {"error": 0.0}
+            self.job_queue.requeue_expired()
+            await asyncio.sleep(self.config.poll_interval)
+
+        metrics, artifacts = result
+        eval_result = EvaluationResult(metrics=metrics, artifacts=artifacts or {})
+
+        # LLM feedback runs on the controller, which owns the LLM ensemble
+        if self.config.use_llm_feedback and self.llm_ensemble:
+            feedback_metrics = await self._llm_evaluate(program_code)
+            for name, value in feedback_metrics.items():
+                eval_result.metrics[f"llm_{name}"] = value * self.config.llm_feedback_weight
+
+        if artifacts_enabled and eval_result.has_artifacts():
+            self._pending_artifacts[program_id] = eval_result.artifacts
+
+        elapsed = time.time() - start_time
+        logger.info(
+            f"Evaluated program {program_id} remotely in {elapsed:.2f}s: "
+            f"{format_metrics_safe(eval_result.metrics)}"
+        )
+        return eval_result.metrics
+
     def _process_evaluation_result(self, result: Any) -> EvaluationResult:
         """
         Process evaluation result to handle both dict and EvaluationResult returns
@@ -0,0 +1,92 @@
+"""
+Append-only event log of a running evolution
+
+The controller appends one JSON line per accepted program (and per checkpoint), so
+tools like the visualizer can follow a run live by tailing the file, without waiting
+for checkpoints.
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_FILE = "events.jsonl"
+
+
+class EventLog:
+    """
+    Appends events as JSON lines to a file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, event_type: str, **fields: Any) -> None:
+        """
+        Append an event
+
+        Args:
+            event_type: Type of the event (e.g. "program" or "checkpoint")
+            **fields: JSON-serializable event fields
+        """
+        event = {"type": event_type, "time": time.time(), **fields}
+        try:
+            self._file.write(json.dumps(event, default=str) + "\n")
+            self._file.flush()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write to event log {self.path}: {str(e)}")
+
+    def close(self) -> None:
+        """Close the log file"""
+        self._file.close()
+
+
+class EventLogReader:
+    """
+    Incrementally reads the events appended to an event log since the last read
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        """
+        Read the complete events appended since the previous call
+
+        A partially written last line is left for the next call. If the file was
+        truncated or replaced (e.g. a new run in the same directory), reading starts over.
+
+        Returns:
+            List of events, oldest first
+        """
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            self.offset = 0
+        if size == self.offset:
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+
+        end = data.rfind(b"\n") + 1
+        self.offset += end
+
+        events = []
+        for line in data[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping malformed line in event log {self.path}")
+        return events
@@ -0,0 +1,264 @@
+"""
+Multi-process island workers for OpenEvolve
+
+Each island evolves in its own process with its own single-island sub-database,
+LLM clients and evaluator. Islands exchange migrants over message queues, and
+every accepted child is reported back to the controller, which keeps the global
+database and writes checkpoints.
+"""
+
+import asyncio
+import copy
+import logging
+import os
+import queue
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from openevolve.config import Config
+from openevolve.database import Program
+from openevolve.utils.topology_utils import get_migration_targets
+
+logger = logging.getLogger(__name__)
+
+# Message kinds sent from island workers to the controller
+MESSAGE_PROGRAM = "program"
+MESSAGE_DONE = "done"
+MESSAGE_ERROR = "error"
+
+# Seconds between liveness checks of the workers while waiting for their results
+WORKER_POLL_INTERVAL = 5.0
+
+
+def run_island_worker(
+    island_idx: int,
+    initial_program_path: str,
+    evaluation_file: str,
+    config: Config,
+    output_dir: str,
+    start_iteration: int,
+    iterations: int,
+    seed_programs: List[Dict[str, Any]],
+    inboxes: List[Any],
+    results: Any,
+) -> None:
+    """
+    Process entry point for one island worker
+
+    Args:
+        island_idx: Index of the island this worker evolves
+        initial_program_path: Path to the initial program file
+        evaluation_file: Path to the evaluation file
+        config: Global configuration (adapted to a single island here)
+        output_dir: Output directory of the worker (logs only)
+        start_iteration: Iteration number to start counting from
+        iterations: Number of iterations to run
+        seed_programs: Serialized programs the island starts with
+        inboxes: Migration queues of all islands, indexed by island
+        results: Queue for reporting accepted programs to the controller
+    """
+    try:
+        asyncio.run(
+            IslandWorker(
+                island_idx,
+                initial_program_path,
+                evaluation_file,
+                config,
+                output_dir,
+                inboxes,
+                results,
+            ).run(start_iteration, iterations, seed_programs)
+        )
+    except Exception as e:
+        logger.exception(f"Island worker {island_idx} failed")
+        results.put((MESSAGE_ERROR, island_idx, str(e), None))
+    finally:
+        results.put((MESSAGE_DONE, island_idx, None, None))
+
+
+def iter_worker_results(
+    results: Any, workers: List[Any], poll_interval: float = WORKER_POLL_INTERVAL
+) -> Iterator[Tuple[str, int, Any, Any]]:
+    """
+    Yield the program and error messages of island workers until every worker finished
+
+    A worker has finished when it reports MESSAGE_DONE, or when it exits without
+    reporting (e.g. killed by the OOM killer or a crash in native evaluator code), so a
+    dead worker cannot leave the controller waiting forever.
+
+    Args:
+        results: Queue the workers report to
+        workers: Worker processes, indexed by island
+        poll_interval: Seconds to wait for a message before checking worker liveness
+
+    Yields:
+        (kind, island index, payload, artifacts) messages other than MESSAGE_DONE
+    """
+    finished = set()
+    while len(finished) < len(workers):
+        try:
+            message = results.get(timeout=poll_interval)
+        except queue.Empty:
+            for island_idx, worker in enumerate(workers):
+                if island_idx not in finished and not worker.is_alive():
+                    finished.add(island_idx)
+                    logger.error(
+                        f"Island worker {island_idx} exited with code {worker.exitcode} "
+                        f"without reporting ({len(workers) - len(finished)} still running)"
+                    )
+            continue
+
+        kind, island_idx = message[0], message[1]
+        if kind == MESSAGE_DONE:
+            finished.add(island_idx)
+            logger.info(
+                f"Island worker {island_idx} finished "
+                f"({len(workers) - len(finished)} still running)"
+            )
+            continue
+        yield message
+
+
+class IslandWorker:
+    """
+    Evolution loop of a single island running in its own process
+    """
+
+    def __init__(
+        self,
+        island_idx: int,
+        initial_program_path: str,
+        evaluation_file: str,
+        config: Config,
+        output_dir: str,
+        inboxes: List[Any],
+        results: Any,
+    ):
+        # Imported here to avoid a circular import with the controller
+        from openevolve.controller import OpenEvolve
+
+        self.island_idx = island_idx
+        self.num_islands = config.database.num_islands
+        self.inbox = inboxes[island_idx]
+        self.inboxes = inboxes
+        self.topology = config.database.migration_topology
+        self.migration_k = config.database.migration_k
+        self.results = results
+
+        # Each worker owns a single-island, in-memory sub-database
+        worker_config = copy.deepcopy(config)
+        worker_config.database.num_islands = 1
+        worker_config.database.db_path = None
+        worker_config.database.parallel_islands = False
+        # Artifacts go back to the controller, whose store is the only one collected;
+        # a worker only sees its island and would delete the other islands' artifacts
+        worker_config.database.cleanup_old_artifacts = False
+        # Accepted programs are logged by the controller
+        worker_config.event_log = False
+        if config.random_seed is not None:
+            worker_config.random_seed = config.random_seed + island_idx
+            worker_config.database.random_seed = worker_config.random_seed
+
+        self.controller = OpenEvolve(
+            initial_program_path=initial_program_path,
+            evaluation_file=evaluation_file,
+            config=worker_config,
+            output_dir=output_dir,
+        )
+        self.database = self.controller.database
+
+    def receive_migrants(self) -> int:
+        """
+        Add all migrants waiting in the inbox to the island
+
+        Returns:
+            Number of migrants added
+        """
+        received = 0
+        while True:
+            try:
+                batch = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+
+            for program_dict in batch:
+                # Programs shared by several neighbors only need to be added once
+                if program_dict["id"] in self.database.programs:
+                    continue
+
+                migrant = Program.from_dict(program_dict)
+                migrant.metadata = {**migrant.metadata, "migrant": True}
+                self.database.add(migrant, target_island=0)
+                received += 1
+
+        if received:
+            logger.info(f"Island {self.island_idx} received {received} migrants")
+        return received
+
+    def send_migrants(self) -> None:
+        """Send the island's top programs to its targets in the migration topology"""
+        migrants = [p.to_dict() for p in self.database.get_migrants(0)]
+        targets = get_migration_targets(
+            self.island_idx, self.num_islands, self.topology, self.migration_k
+        )
+        for target in targets:
+            # One message per target carries the whole batch
+            self.inboxes[target].put(migrants)
+            logger.debug(f"Island {self.island_idx} sent {len(migrants)} migrants to {target}")
+
+        self.database.last_migration_generation = max(self.database.island_generations)
+
+    async def run(
+        self, start_iteration: int, iterations: int, seed_programs: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Run the island's evolution loop
+
+        Args:
+            start_iteration: Iteration number to start counting from
+            iterations: Number of iterations to run
+            seed_programs: Serialized programs the island starts with
+        """
+        for program_dict in seed_programs:
+            self.database.add(Program.from_dict(program_dict), target_island=0)
+
+        logger.info(
+            f"Island worker {self.island_idx} (pid {os.getpid()}) starting with "
+            f"{len(self.database.programs)} programs for {iterations} iterations"
+        )
+
+        for i in range(start_iteration, start_iteration + iterations):
+            iteration_start = time.time()
+            self.receive_migrants()
+
+            parent, inspirations = self.database.sample()
+            model_index = self.controller.llm_ensemble.sample_model_index()
+            try:
+                children = await self.controller._generate_children(
+                    parent, inspirations, i, model_index
+                )
+            except Exception as e:
+                logger.error(f"Island {self.island_idx}: error in iteration {i+1}: {str(e)}")
+                continue
+            if not children:
+                self.controller._record_selection_outcome(
+                    parent, None, time.time() - iteration_start, model_index
+                )
+                continue
+
+            for child_program, artifacts in children:
+                self.database.add(child_program, iteration=i + 1, target_island=0)
+
+                # Report the accepted child; the controller owns the global database
+                self.results.put(
+                    (MESSAGE_PROGRAM, self.island_idx, child_program.to_dict(), artifacts)
+                )
+            # The worker's own selection bandits learn from its iterations
+            self.controller._record_selection_outcome(
+                parent, children[0][0], time.time() - iteration_start, model_index
+            )
+            self.database.increment_island_generation()
+            self.controller._log_iteration(i, parent, children[0][0], time.time() - iteration_start)
+
+            if self.num_islands > 1 and self.database.should_migrate():
+                self.send_migrants()
@@ -0,0 +1,304 @@
+"""
+SQLite-backed job queue for distributed evaluation
+
+The controller submits evaluation jobs and polls for their results; any number of
+`openevolve-worker` processes (on this or other machines sharing the queue file)
+claim jobs, send heartbeats while evaluating and post metrics and artifacts back.
+"""
+
+import base64
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Job states
+STATUS_PENDING = "pending"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    program_id TEXT NOT NULL,
+    code TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker_id TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    submitted_at REAL NOT NULL,
+    heartbeat_at REAL,
+    metrics TEXT,
+    artifacts TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at);
+"""
+
+
+@dataclass
+class Job:
+    """An evaluation job claimed by a worker"""
+
+    job_id: str
+    program_id: str
+    code: str
+    attempts: int
+
+
+def _encode_artifacts(artifacts: Optional[Dict[str, Union[str, bytes]]]) -> Optional[str]:
+    """Serialize artifacts to JSON, base64-encoding binary values"""
+    if artifacts is None:
+        return None
+    encoded = {}
+    for key, value in artifacts.items():
+        if isinstance(value, bytes):
+            encoded[key] = {"__bytes__": base64.b64encode(value).decode("ascii")}
+        else:
+            encoded[key] = value
+    return json.dumps(encoded)
+
+
+def _decode_artifacts(data: Optional[str]) -> Optional[Dict[str, Union[str, bytes]]]:
+    """Deserialize artifacts written by _encode_artifacts"""
+    if data is None:
+        return None
+    decoded = {}
+    for key, value in json.loads(data).items():
+        if isinstance(value, dict) and "__bytes__" in value:
+            decoded[key] = base64.b64decode(value["__bytes__"])
+        else:
+            decoded[key] = value
+    return decoded
+
+
+class JobQueue:
+    """
+    Evaluation job queue stored in a SQLite database file
+
+    Jobs are keyed by program ID, so resubmitting a program is a no-op. A job whose
+    worker stops sending heartbeats is requeued after the lease timeout, and only the
+    first result posted for a job is kept.
+    """
+
+    def __init__(self, path: str, lease_timeout: float = 30.0, max_attempts: int = 3):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def submit(self, program_id: str, code: str) -> str:
+        """
+        Submit a program for evaluation
+
+        Args:
+            program_id: ID of the program
+            code: Code to evaluate
+
+        Returns:
+            Job ID
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO jobs (job_id, program_id, code, status, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (program_id, program_id, code, STATUS_PENDING, time.time()),
+            )
+        return program_id
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """
+        Claim the oldest pending job
+
+        Args:
+            worker_id: ID of the claiming worker
+
+        Returns:
+            Claimed job, or None if no job is pending
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id, program_id, code, attempts FROM jobs "
+                    "WHERE status = ? ORDER BY submitted_at LIMIT 1",
+                    (STATUS_PENDING,),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, worker_id = ?, attempts = attempts + 1, "
+                    "heartbeat_at = ? WHERE job_id = ?",
+                    (STATUS_RUNNING, worker_id, time.time(), row[0]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        return Job(job_id=row[0], program_id=row[1], code=row[2], attempts=row[3] + 1)
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """
+        Extend the lease of a running job
+
+        Args:
+            job_id: ID of the job
+            worker_id: ID of the worker holding the job
+
+        Returns:
+            False if the job is no longer held by the worker (requeued or finished)
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE job_id = ? AND worker_id = ? "
+                "AND status = ?",
+                (time.time(), job_id, worker_id, STATUS_RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(
+        self,
+        job_id: str,
+        worker_id: str,
+        metrics: Dict[str, float],
+        artifacts: Optional[Dict[str, Union[str, bytes]]] = None,
+    ) -> bool:
+        """
+        Post the result of a job
+
+        Args:
+            job_id: ID of the job
+            worker_id: ID of the worker that evaluated the job
+            metrics: Evaluation metrics
+            artifacts: Optional evaluation artifacts
+
+        Returns:
+            True if the result was recorded, False if another result was posted first
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = ?, metrics = ?, artifacts = ? "
+                "WHERE job_id = ? AND status != ?",
+                (
+                    STATUS_DONE,
+                    worker_id,
+                    json.dumps(metrics),
+                    _encode_artifacts(artifacts),
+                    job_id,
+                    STATUS_DONE,
+                ),
+            )
+        return cursor.rowcount == 1
+
+    def pop_result(
+        self, job_id: str
+    ) -> Optional[Tuple[Dict[str, float], Optional[Dict[str, Union[str, bytes]]]]]:
+        """
+        Fetch and remove the result of a finished job
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Tuple of (metrics, artifacts), or None if the job has not finished
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT metrics, artifacts FROM jobs WHERE job_id = ? AND status = ?",
+                (job_id, STATUS_DONE),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+
+        return json.loads(row[0]), _decode_artifacts(row[1])
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Remove a job in any state; a worker still evaluating it loses its lease
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            True if the job was in the queue
+        """
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return cursor.rowcount == 1
+
+    def requeue_expired(self) -> int:
+        """
+        Requeue running jobs whose worker stopped sending heartbeats
+
+        Jobs that already used up max_attempts are failed with error metrics instead.
+
+        Returns:
+            Number of expired jobs
+        """
+        cutoff = time.time() - self.lease_timeout
+        failure_artifacts = _encode_artifacts(
+            {"stderr": "Evaluation worker lost", "failure_stage": "distributed"}
+        )
+        with self._lock:
+            failed = self._conn.execute(
+                "UPDATE jobs SET status = ?, metrics = ?, artifacts = ? "
+                "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+                (
+                    STATUS_DONE,
+                    json.dumps({"error": 0.0}),
+                    failure_artifacts,
+                    STATUS_RUNNING,
+                    cutoff,
+                    self.max_attempts,
+                ),
+            ).rowcount
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = ?, worker_id = NULL "
+                "WHERE status = ? AND heartbeat_at < ?",
+                (STATUS_PENDING, STATUS_RUNNING, cutoff),
+            ).rowcount
+
+        if failed or requeued:
+            logger.warning(
+                f"Expired evaluation jobs: {requeued} requeued, {failed} failed after "
+                f"{self.max_attempts} attempts"
+            )
+        return failed + requeued
+
+    def count(self, status: Optional[str] = None) -> int:
+        """
+        Count jobs in the queue
+
+        Args:
+            status: Only count jobs in this state (all jobs if None)
+
+        Returns:
+            Number of jobs
+        """
+        with self._lock:
+            if status is None:
+                row = self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+                ).fetchone()
+        return row[0]
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
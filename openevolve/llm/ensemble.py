@@ -10,6 +10,7 @@ from typing import Dict, List, Optional, Tuple
 from openevolve.llm.base import LLMInterface
 from openevolve.llm.openai import OpenAILLM
 from openevolve.config import LLMModelConfig
+from openevolve.utils.bandit_utils import Bandit
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +18,13 @@ logger = logging.getLogger(__name__)
 class LLMEnsemble:
     """Ensemble of LLMs"""
 
-    def __init__(self, models_cfg: List[LLMModelConfig]):
+    def __init__(self, models_cfg: List[LLMModelConfig], bandit: Optional[Bandit] = None):
         self.models_cfg = models_cfg
 
+        # Optional bandit choosing the model instead of the fixed weights
+        self.bandit = bandit
+        self.last_model_index: Optional[int] = None
+
         # Initialize models from the configuration
         self.models = [OpenAILLM(model_cfg) for model_cfg in models_cfg]
 
@@ -42,16 +47,72 @@ class LLMEnsemble:
         return await model.generate(prompt, **kwargs)
 
     async def generate_with_context(
-        self, system_message: str, messages: List[Dict[str, str]], **kwargs
+        self,
+        system_message: str,
+        messages: List[Dict[str, str]],
+        model_index: Optional[int] = None,
+        **kwargs,
     ) -> str:
-        """Generate text using a system message and conversational context"""
-        model = self._sample_model()
+        """
+        Generate text using a system message and conversational context
+
+        Args:
+            system_message: System message
+            messages: Conversation so far
+            model_index: Model to use (sampled if None), e.g. to keep a conversation on
+                the model that started it
+        """
+        model = self._sample_model() if model_index is None else self.models[model_index]
         return await model.generate_with_context(system_message, messages, **kwargs)
 
+    async def generate_multiple_with_context(
+        self,
+        system_message: str,
+        messages: List[Dict[str, str]],
+        n: int,
+        model_index: Optional[int] = None,
+        **kwargs,
+    ) -> List[str]:
+        """Generate n completions for the same context from one model (sampled if None)"""
+        model = self._sample_model() if model_index is None else self.models[model_index]
+        return await model.generate_multiple_with_context(system_message, messages, n, **kwargs)
+
+    def get_usage_stats(self) -> Dict[str, int]:
+        """Get the token usage summed over all models of the ensemble"""
+        totals: Dict[str, int] = {}
+        for model in self.models:
+            for key, value in getattr(model, "usage", {}).items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def sample_model_index(self) -> int:
+        """Sample the index of a model based on weights (or the bandit, if set)"""
+        if self.bandit is not None:
+            index = self.bandit.select()
+        else:
+            index = random.choices(range(len(self.models)), weights=self.weights, k=1)[0]
+        self.last_model_index = index
+        return index
+
     def _sample_model(self) -> LLMInterface:
-        """Sample a model from the ensemble based on weights"""
-        index = random.choices(range(len(self.models)), weights=self.weights, k=1)[0]
-        return self.models[index]
+        """Sample a model from the ensemble based on weights (or the bandit, if set)"""
+        return self.models[self.sample_model_index()]
+
+    def record_outcome(
+        self, reward: float, cost: float = 1.0, model_index: Optional[int] = None
+    ) -> None:
+        """
+        Credit a model with the outcome of its generation
+
+        Args:
+            reward: Reward of the generation (e.g. child improvement over the parent)
+            cost: Cost of the generation (e.g. seconds the iteration took)
+            model_index: Model that produced the generation (the last sampled one if None)
+        """
+        if model_index is None:
+            model_index = self.last_model_index
+        if self.bandit is not None and model_index is not None:
+            self.bandit.update(model_index, reward, cost)
 
     async def generate_multiple(self, prompt: str, n: int, **kwargs) -> List[str]:
         """Generate multiple texts in parallel"""
@@ -4,6 +4,7 @@ OpenAI API interface for LLMs
 
 import asyncio
 import logging
+import re
 import time
 from typing import Any, Dict, List, Optional, Union
 
@@ -39,6 +40,12 @@ class OpenAILLM(LLMInterface):
             base_url=self.api_base,
         )
 
+        # Whether the API honors the `n` parameter (None until first tried)
+        self.supports_n: Optional[bool] = None
+
+        # Token usage reported by the API, including prompt tokens served from cache
+        self.usage = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
         logger.info(f"Initialized OpenAI LLM with model: {self.model}")
 
     async def generate(self, prompt: str, **kwargs) -> str:
@@ -53,6 +60,52 @@ class OpenAILLM(LLMInterface):
         self, system_message: str, messages: List[Dict[str, str]], **kwargs
     ) -> str:
         """Generate text using a system message and conversational context"""
+        responses = await self._generate(system_message, messages, 1, **kwargs)
+        return responses[0]
+
+    async def generate_multiple_with_context(
+        self, system_message: str, messages: List[Dict[str, str]], n: int, **kwargs
+    ) -> List[str]:
+        """
+        Generate n completions for the same context
+
+        Uses the API's `n` parameter so the prompt is sent (and prefilled) once. Providers
+        that reject or ignore `n` are remembered and served by parallel calls instead.
+        """
+        responses: List[str] = []
+        if n > 1 and self.supports_n is not False:
+            try:
+                responses = await self._generate(system_message, messages, n, **kwargs)
+            except Exception as e:
+                # Transient errors (timeouts, rate limits, resets) say nothing about `n`
+                if self.supports_n or not self._rejects_n(e):
+                    raise
+                logger.info(f"Model {self.model} does not support n={n} ({str(e)})")
+                self.supports_n = False
+            else:
+                self.supports_n = len(responses) >= n
+
+        if len(responses) < n:
+            responses.extend(
+                await super().generate_multiple_with_context(
+                    system_message, messages, n - len(responses), **kwargs
+                )
+            )
+        return responses[:n]
+
+    @staticmethod
+    def _rejects_n(error: Exception) -> bool:
+        """Whether an API error is the provider rejecting the `n` parameter"""
+        if getattr(error, "status_code", None) not in (400, 422):
+            return False
+        if getattr(error, "param", None) == "n":
+            return True
+        return re.search(r"(?<![\w.-])['\"`]?n['\"`]?(?![\w.-])", str(error)) is not None
+
+    async def _generate(
+        self, system_message: str, messages: List[Dict[str, str]], n: int, **kwargs
+    ) -> List[str]:
+        """Request n choices for a context, with timeout and retries"""
         # Prepare messages with system message
         formatted_messages = [{"role": "system", "content": system_message}]
         formatted_messages.extend(messages)
@@ -73,6 +126,8 @@ class OpenAILLM(LLMInterface):
                 "top_p": kwargs.get("top_p", self.top_p),
                 "max_tokens": kwargs.get("max_tokens", self.max_tokens),
             }
+        if n > 1:
+            params["n"] = n
 
         # Attempt the API call with retries
         retries = kwargs.get("retries", self.retries)
@@ -91,7 +146,7 @@ class OpenAILLM(LLMInterface):
                     logger.error(f"All {retries + 1} attempts failed with timeout")
                     raise
             except Exception as e:
-                if attempt < retries:
+                if attempt < retries and not (n > 1 and self._rejects_n(e)):
                     logger.warning(
                         f"Error on attempt {attempt + 1}/{retries + 1}: {str(e)}. Retrying..."
                     )
@@ -100,8 +155,8 @@ class OpenAILLM(LLMInterface):
                     logger.error(f"All {retries + 1} attempts failed with error: {str(e)}")
                     raise
 
-    async def _call_api(self, params: Dict[str, Any]) -> str:
-        """Make the actual API call"""
+    async def _call_api(self, params: Dict[str, Any]) -> List[str]:
+        """Make the actual API call and return the content of every choice"""
         # Use asyncio to run the blocking API call in a thread pool
         loop = asyncio.get_event_loop()
         response = await loop.run_in_executor(
@@ -111,4 +166,23 @@ class OpenAILLM(LLMInterface):
         logger = logging.getLogger(__name__)
         logger.debug(f"API parameters: {params}")
         logger.debug(f"API response: {response.choices[0].message.content}")
-        return response.choices[0].message.content
+        self._record_usage(response)
+        return [choice.message.content for choice in response.choices]
+
+    def _record_usage(self, response: Any) -> None:
+        """Accumulate token usage, including prompt-cache hits, from an API response"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+
+        # OpenAI reports cache hits in prompt_tokens_details; DeepSeek-style APIs report
+        # prompt_cache_hit_tokens instead
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None) if details is not None else None
+        if cached_tokens is None:
+            cached_tokens = getattr(usage, "prompt_cache_hit_tokens", None)
+
+        self.usage["requests"] += 1
+        self.usage["prompt_tokens"] += getattr(usage, "prompt_tokens", None) or 0
+        self.usage["cached_tokens"] += cached_tokens or 0
+        self.usage["completion_tokens"] += getattr(usage, "completion_tokens", None) or 0
@@ -4,15 +4,25 @@ Prompt sampling for OpenEvolve
 
 import logging
 import random
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from openevolve.config import PromptConfig
 from openevolve.prompt.templates import TemplateManager
-from openevolve.utils.format_utils import format_metrics_safe
+from openevolve.utils.code_utils import find_closest_region
+from openevolve.utils.format_utils import format_metrics_safe, truncate_artifact
 from openevolve.utils.metrics_utils import safe_numeric_average
+from openevolve.utils.token_utils import count_tokens, truncate_to_tokens
 
 logger = logging.getLogger(__name__)
 
+# Smallest useful remainder of a truncated artifact
+_MIN_TRUNCATED_TOKENS = 32
+
+# Characters past the artifact limit the security filter needs to recognise a secret
+# crossing the limit (longer than the longest fixed-length secret pattern)
+_SECURITY_FILTER_LOOKAHEAD = 64
+
 
 class PromptSampler:
     """Generates prompts for code evolution"""
@@ -28,6 +38,9 @@ class PromptSampler:
         self.system_template_override = None
         self.user_template_override = None
 
+        # Formatted parts of programs shown in prompts, keyed by program ID (LRU order)
+        self._program_renderings: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+
         logger.info("Initialized prompt sampler")
 
     def set_templates(
@@ -87,6 +100,8 @@ class PromptSampler:
         else:
             # Default behavior
             user_template_key = "full_rewrite_user" if allow_full_rewrite else "diff_user"
+            if self.config.prompt_layout == "cache_friendly":
+                user_template_key += "_cache_friendly"
 
         # Get the template
         user_template = self.template_manager.get_template(user_template_key)
@@ -108,36 +123,193 @@ class PromptSampler:
             current_program, parent_program, program_metrics, previous_programs
         )
 
-        # Format evolution history
-        evolution_history = self._format_evolution_history(
-            previous_programs, top_programs, language
-        )
-
-        # Format artifacts section if enabled and available
-        artifacts_section = ""
+        # Render the evolution history and artifacts as entries that can be budgeted
+        previous_entries = self._render_previous_attempts(previous_programs)
+        top_entries, diverse_entries = self._render_top_programs(top_programs, language)
+        artifacts = {}
         if self.config.include_artifacts and program_artifacts:
-            artifacts_section = self._render_artifacts(program_artifacts)
+            artifacts = self._decode_artifacts(program_artifacts)
 
         # Apply stochastic template variations if enabled
         if self.config.use_template_stochasticity:
             user_template = self._apply_template_variations(user_template)
 
-        # Format the final user message
-        user_message = user_template.format(
+        fields = dict(
             metrics=metrics_str,
             improvement_areas=improvement_areas,
-            evolution_history=evolution_history,
             current_program=current_program,
             language=language,
-            artifacts=artifacts_section,
             **kwargs,
         )
 
+        if self.config.max_prompt_tokens:
+            top_scores = [
+                safe_numeric_average(program.get("metrics", {}))
+                for program in top_programs[: len(top_entries)]
+            ]
+            previous_entries, top_entries, diverse_entries, artifact_sections = self._fit_to_budget(
+                system_message,
+                user_template,
+                fields,
+                previous_entries,
+                top_entries,
+                top_scores,
+                diverse_entries,
+                artifacts,
+            )
+        else:
+            artifact_sections = [
+                self._format_artifact(key, content) for key, content in artifacts.items()
+            ]
+
+        # Format the final user message
+        user_message = self._assemble_user_message(
+            user_template, fields, previous_entries, top_entries, diverse_entries, artifact_sections
+        )
+
         return {
             "system": system_message,
             "user": user_message,
         }
 
+    def build_repair_prompt(
+        self,
+        current_program: str,
+        failed_blocks: List[Tuple[str, str]],
+        language: str = "python",
+    ) -> str:
+        """
+        Build a follow-up message asking the LLM to correct unusable SEARCH/REPLACE blocks
+
+        Args:
+            current_program: Program code with the successful blocks already applied
+            failed_blocks: (search_text, replace_text) blocks that could not be applied;
+                empty if the response contained no blocks at all
+            language: Programming language
+
+        Returns:
+            Follow-up user message
+        """
+        if not failed_blocks:
+            return self.template_manager.get_template("diff_missing")
+
+        failed_block_template = self.template_manager.get_compiled_template("failed_block")
+        sections = []
+        for i, (search_text, _) in enumerate(failed_blocks):
+            region = find_closest_region(current_program, search_text)
+            sections.append(
+                failed_block_template.render(
+                    block_number=i + 1,
+                    language=language,
+                    search=search_text,
+                    region=region if region is not None else "(no similar code found)",
+                )
+            )
+
+        return self.template_manager.get_compiled_template("diff_repair").render(
+            num_failed=len(failed_blocks),
+            failed_blocks="\n".join(sections),
+        )
+
+    def _assemble_user_message(
+        self,
+        user_template: str,
+        fields: Dict[str, Any],
+        previous_entries: List[str],
+        top_entries: List[str],
+        diverse_entries: List[str],
+        artifact_sections: List[str],
+    ) -> str:
+        """Format the user template with the given section entries"""
+        previous_attempts = "\n\n".join(previous_entries).strip()
+        top_programs_str = "".join(entry + "\n\n" for entry in top_entries)
+        if diverse_entries:
+            top_programs_str += "\n\n## Diverse Programs\n\n"
+            top_programs_str += "".join(entry + "\n\n" for entry in diverse_entries)
+        top_programs_str = top_programs_str.strip()
+
+        evolution_history = self.template_manager.get_compiled_template("evolution_history").render(
+            previous_attempts=previous_attempts,
+            top_programs=top_programs_str,
+        )
+
+        return self.template_manager.compile(user_template).render(
+            evolution_history=evolution_history,
+            previous_attempts=previous_attempts,
+            top_programs=top_programs_str,
+            artifacts=self._join_artifact_sections(artifact_sections),
+            **fields,
+        )
+
+    def _fit_to_budget(
+        self,
+        system_message: str,
+        user_template: str,
+        fields: Dict[str, Any],
+        previous_entries: List[str],
+        top_entries: List[str],
+        top_scores: List[float],
+        diverse_entries: List[str],
+        artifacts: Dict[str, str],
+    ) -> Tuple[List[str], List[str], List[str], List[str]]:
+        """
+        Greedily pack optional prompt sections into the prompt token budget
+
+        The system message, template and current program are always included. The
+        remaining budget goes to artifacts first (the last one truncated to fit), then top
+        programs by score, previous attempts and finally diverse programs.
+
+        Returns:
+            Tuple of (previous_entries, top_entries, diverse_entries, artifact_sections)
+            that fit the budget, each in its original order
+        """
+        budget = self.config.max_prompt_tokens
+        required = count_tokens(system_message) + count_tokens(
+            self._assemble_user_message(user_template, fields, [], [], [], [])
+        )
+        remaining = budget - required
+        if remaining < 0:
+            logger.warning(
+                f"Prompt without optional sections needs {required} tokens, "
+                f"exceeding the budget of {budget}"
+            )
+
+        # Artifacts, truncating the first one that does not fit entirely
+        artifact_sections = []
+        if artifacts:
+            remaining -= count_tokens(self._join_artifact_sections(["x"]))
+        for key, content in artifacts.items():
+            section = self._format_artifact(key, content)
+            cost = count_tokens(section) + 1
+            if cost > remaining:
+                overhead = count_tokens(self._format_artifact(key, "")) + 1
+                if remaining - overhead < _MIN_TRUNCATED_TOKENS:
+                    break
+                section = self._format_artifact(
+                    key, truncate_to_tokens(content, remaining - overhead)
+                )
+                cost = count_tokens(section) + 1
+            artifact_sections.append(section)
+            remaining -= cost
+
+        # Whole entries of the history sections, in order of value
+        def pack(entries: List[str], order: List[int]) -> List[str]:
+            nonlocal remaining
+            kept = set()
+            for index in order:
+                cost = count_tokens(entries[index]) + 1
+                if cost <= remaining:
+                    kept.add(index)
+                    remaining -= cost
+            return [entry for index, entry in enumerate(entries) if index in kept]
+
+        by_score = sorted(range(len(top_entries)), key=lambda i: top_scores[i], reverse=True)
+        top_entries = pack(top_entries, by_score)
+        previous_entries = pack(previous_entries, list(range(len(previous_entries))))
+        diverse_entries = pack(diverse_entries, list(range(len(diverse_entries))))
+
+        return previous_entries, top_entries, diverse_entries, artifact_sections
+
     def _format_metrics(self, metrics: Dict[str, float]) -> str:
         """Format metrics for the prompt using safe formatting"""
         # Use safe formatting to handle mixed numeric and string values
@@ -219,123 +391,51 @@ class PromptSampler:
 
         return "\n".join([f"- {area}" for area in improvement_areas])
 
-    def _format_evolution_history(
-        self,
-        previous_programs: List[Dict[str, Any]],
-        top_programs: List[Dict[str, Any]],
-        language: str,
-    ) -> str:
-        """Format the evolution history for the prompt"""
-        # Get templates
-        history_template = self.template_manager.get_template("evolution_history")
-        previous_attempt_template = self.template_manager.get_template("previous_attempt")
-        top_program_template = self.template_manager.get_template("top_program")
+    def _render_previous_attempts(self, previous_programs: List[Dict[str, Any]]) -> List[str]:
+        """Render the entries of the previous attempts section (most recent first)"""
+        previous_attempt_template = self.template_manager.get_compiled_template("previous_attempt")
 
         # Format previous attempts (most recent first)
-        previous_attempts_str = ""
+        entries = []
         selected_previous = previous_programs[-min(3, len(previous_programs)) :]
 
         for i, program in enumerate(reversed(selected_previous)):
-            attempt_number = len(previous_programs) - i
-            changes = program.get("changes", "Unknown changes")
-
-            # Format performance metrics using safe formatting
-            performance_parts = []
-            for name, value in program.get("metrics", {}).items():
-                if isinstance(value, (int, float)):
-                    try:
-                        performance_parts.append(f"{name}: {value:.4f}")
-                    except (ValueError, TypeError):
-                        performance_parts.append(f"{name}: {value}")
-                else:
-                    performance_parts.append(f"{name}: {value}")
-            performance_str = ", ".join(performance_parts)
-
-            # Determine outcome based on comparison with parent
-            parent_metrics = program.get("parent_metrics", {})
-            outcome = "Mixed results"
-
-            # Safely compare only numeric metrics
-            program_metrics = program.get("metrics", {})
-
-            # Check if all numeric metrics improved
-            numeric_comparisons_improved = []
-            numeric_comparisons_regressed = []
-
-            for m in program_metrics:
-                prog_value = program_metrics.get(m, 0)
-                parent_value = parent_metrics.get(m, 0)
-
-                # Only compare if both values are numeric
-                if isinstance(prog_value, (int, float)) and isinstance(parent_value, (int, float)):
-                    if prog_value > parent_value:
-                        numeric_comparisons_improved.append(True)
-                    else:
-                        numeric_comparisons_improved.append(False)
-
-                    if prog_value < parent_value:
-                        numeric_comparisons_regressed.append(True)
-                    else:
-                        numeric_comparisons_regressed.append(False)
-
-            # Determine outcome based on numeric comparisons
-            if numeric_comparisons_improved and all(numeric_comparisons_improved):
-                outcome = "Improvement in all metrics"
-            elif numeric_comparisons_regressed and all(numeric_comparisons_regressed):
-                outcome = "Regression in all metrics"
-
-            previous_attempts_str += (
-                previous_attempt_template.format(
-                    attempt_number=attempt_number,
-                    changes=changes,
-                    performance=performance_str,
-                    outcome=outcome,
+            rendering = self._get_program_rendering(program)
+            entries.append(
+                previous_attempt_template.render(
+                    attempt_number=len(previous_programs) - i,
+                    changes=program.get("changes", "Unknown changes"),
+                    performance=rendering["performance"],
+                    outcome=rendering["outcome"],
                 )
-                + "\n\n"
             )
 
+        return entries
+
+    def _render_top_programs(
+        self, top_programs: List[Dict[str, Any]], language: str
+    ) -> Tuple[List[str], List[str]]:
+        """Render the entries of the top programs and diverse programs sections"""
+        top_program_template = self.template_manager.get_compiled_template("top_program")
+
         # Format top programs
-        top_programs_str = ""
+        top_entries = []
         selected_top = top_programs[: min(self.config.num_top_programs, len(top_programs))]
 
         for i, program in enumerate(selected_top):
-            # Extract a snippet (first 10 lines) for display
-            program_code = program.get("code", "")
-            program_snippet = "\n".join(program_code.split("\n")[:10])
-            if len(program_code.split("\n")) > 10:
-                program_snippet += "\n# ... (truncated for brevity)"
-
-            # Calculate a composite score using safe numeric average
-            score = safe_numeric_average(program.get("metrics", {}))
-
-            # Extract key features (this could be more sophisticated)
-            key_features = program.get("key_features", [])
-            if not key_features:
-                key_features = []
-                for name, value in program.get("metrics", {}).items():
-                    if isinstance(value, (int, float)):
-                        try:
-                            key_features.append(f"Performs well on {name} ({value:.4f})")
-                        except (ValueError, TypeError):
-                            key_features.append(f"Performs well on {name} ({value})")
-                    else:
-                        key_features.append(f"Performs well on {name} ({value})")
-
-            key_features_str = ", ".join(key_features)
-
-            top_programs_str += (
-                top_program_template.format(
+            rendering = self._get_program_rendering(program)
+            top_entries.append(
+                top_program_template.render(
                     program_number=i + 1,
-                    score=f"{score:.4f}",
+                    score=rendering["score"],
                     language=language,
-                    program_snippet=program_snippet,
-                    key_features=key_features_str,
+                    program_snippet=rendering["snippet"],
+                    key_features=rendering["key_features"],
                 )
-                + "\n\n"
             )
 
         # Format diverse programs using num_diverse_programs config
-        diverse_programs_str = ""
+        diverse_entries = []
         if (
             self.config.num_diverse_programs > 0
             and len(top_programs) > self.config.num_top_programs
@@ -349,49 +449,124 @@ class PromptSampler:
                 # Use random sampling to get diverse programs
                 diverse_programs = random.sample(remaining_programs, num_diverse)
 
-                diverse_programs_str += "\n\n## Diverse Programs\n\n"
-
                 for i, program in enumerate(diverse_programs):
-                    # Extract a snippet (first 5 lines for diversity)
-                    program_code = program.get("code", "")
-                    program_snippet = "\n".join(program_code.split("\n")[:5])
-                    if len(program_code.split("\n")) > 5:
-                        program_snippet += "\n# ... (truncated)"
-
-                    # Calculate a composite score using safe numeric average
-                    score = safe_numeric_average(program.get("metrics", {}))
-
-                    # Extract key features
-                    key_features = program.get("key_features", [])
-                    if not key_features:
-                        key_features = [
-                            f"Alternative approach to {name}"
-                            for name in list(program.get("metrics", {}).keys())[
-                                :2
-                            ]  # Just first 2 metrics
-                        ]
-
-                    key_features_str = ", ".join(key_features)
-
-                    diverse_programs_str += (
-                        top_program_template.format(
+                    rendering = self._get_program_rendering(program)
+                    diverse_entries.append(
+                        top_program_template.render(
                             program_number=f"D{i + 1}",
-                            score=f"{score:.4f}",
+                            score=rendering["score"],
                             language=language,
-                            program_snippet=program_snippet,
-                            key_features=key_features_str,
+                            program_snippet=rendering["diverse_snippet"],
+                            key_features=rendering["diverse_key_features"],
                         )
-                        + "\n\n"
                     )
 
-        # Combine top and diverse programs
-        combined_programs_str = top_programs_str + diverse_programs_str
+        return top_entries, diverse_entries
 
-        # Combine into full history
-        return history_template.format(
-            previous_attempts=previous_attempts_str.strip(),
-            top_programs=combined_programs_str.strip(),
-        )
+    def _get_program_rendering(self, program: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Get the formatted parts of a program used in prompts, memoized by program ID
+
+        Programs do not change once added to the database, so their snippets, scores and
+        formatted metrics only need to be computed once however often they are shown.
+
+        Args:
+            program: Program dictionary
+
+        Returns:
+            Dictionary of rendered parts (snippets, score, key features, performance, outcome)
+        """
+        program_id = program.get("id")
+        if program_id is not None:
+            rendering = self._program_renderings.get(program_id)
+            if rendering is not None:
+                self._program_renderings.move_to_end(program_id)
+                return rendering
+
+        rendering = self._render_program(program)
+
+        if program_id is not None:
+            self._program_renderings[program_id] = rendering
+            if len(self._program_renderings) > self.config.render_cache_size:
+                self._program_renderings.popitem(last=False)
+        return rendering
+
+    def _render_program(self, program: Dict[str, Any]) -> Dict[str, str]:
+        """Compute the formatted parts of a program used in prompts"""
+        program_code = program.get("code", "")
+        program_metrics = program.get("metrics", {})
+        lines = program_code.split("\n")
+
+        # Extract snippets (first 10 lines for top programs, 5 for diverse ones)
+        snippet = "\n".join(lines[:10])
+        if len(lines) > 10:
+            snippet += "\n# ... (truncated for brevity)"
+        diverse_snippet = "\n".join(lines[:5])
+        if len(lines) > 5:
+            diverse_snippet += "\n# ... (truncated)"
+
+        # Calculate a composite score using safe numeric average
+        score = safe_numeric_average(program_metrics)
+
+        # Extract key features (this could be more sophisticated)
+        key_features = program.get("key_features", [])
+        diverse_key_features = key_features
+        if not key_features:
+            key_features = []
+            for name, value in program_metrics.items():
+                if isinstance(value, (int, float)):
+                    try:
+                        key_features.append(f"Performs well on {name} ({value:.4f})")
+                    except (ValueError, TypeError):
+                        key_features.append(f"Performs well on {name} ({value})")
+                else:
+                    key_features.append(f"Performs well on {name} ({value})")
+
+            # Just the first 2 metrics for diverse programs
+            diverse_key_features = [
+                f"Alternative approach to {name}" for name in list(program_metrics.keys())[:2]
+            ]
+
+        # Format performance metrics using safe formatting
+        performance_parts = []
+        for name, value in program_metrics.items():
+            if isinstance(value, (int, float)):
+                try:
+                    performance_parts.append(f"{name}: {value:.4f}")
+                except (ValueError, TypeError):
+                    performance_parts.append(f"{name}: {value}")
+            else:
+                performance_parts.append(f"{name}: {value}")
+
+        # Determine outcome based on comparison with parent, using only numeric metrics
+        parent_metrics = program.get("parent_metrics", {})
+        numeric_comparisons_improved = []
+        numeric_comparisons_regressed = []
+
+        for m in program_metrics:
+            prog_value = program_metrics.get(m, 0)
+            parent_value = parent_metrics.get(m, 0)
+
+            # Only compare if both values are numeric
+            if isinstance(prog_value, (int, float)) and isinstance(parent_value, (int, float)):
+                numeric_comparisons_improved.append(prog_value > parent_value)
+                numeric_comparisons_regressed.append(prog_value < parent_value)
+
+        outcome = "Mixed results"
+        if numeric_comparisons_improved and all(numeric_comparisons_improved):
+            outcome = "Improvement in all metrics"
+        elif numeric_comparisons_regressed and all(numeric_comparisons_regressed):
+            outcome = "Regression in all metrics"
+
+        return {
+            "snippet": snippet,
+            "diverse_snippet": diverse_snippet,
+            "score": f"{score:.4f}",
+            "key_features": ", ".join(key_features),
+            "diverse_key_features": ", ".join(diverse_key_features),
+            "performance": ", ".join(performance_parts),
+            "outcome": outcome,
+        }
 
     def _apply_template_variations(self, template: str) -> str:
         """Apply stochastic variations to the template"""
@@ -405,6 +580,15 @@ class PromptSampler:
 
         return result
 
+    def artifact_read_length(self) -> int:
+        """
+        Number of artifact characters to load for rendering
+
+        This is more than max_artifact_bytes, so that secrets crossing the limit are
+        still filtered out before the artifact is truncated.
+        """
+        return self.config.max_artifact_bytes + _SECURITY_FILTER_LOOKAHEAD
+
     def _render_artifacts(self, artifacts: Dict[str, Union[str, bytes]]) -> str:
         """
         Render artifacts for prompt inclusion
@@ -418,17 +602,32 @@ class PromptSampler:
         if not artifacts:
             return ""
 
-        sections = []
+        sections = [
+            self._format_artifact(key, content)
+            for key, content in self._decode_artifacts(artifacts).items()
+        ]
+        return self._join_artifact_sections(sections)
+
+    def _decode_artifacts(self, artifacts: Dict[str, Union[str, bytes]]) -> Dict[str, str]:
+        """Decode, filter and size-limit artifact values for prompt inclusion"""
+        decoded = {}
 
         # Process all artifacts using .items()
         for key, value in artifacts.items():
-            content = self._safe_decode_artifact(value)
-            # Truncate if too long
-            if len(content) > self.config.max_artifact_bytes:
-                content = content[: self.config.max_artifact_bytes] + "\n... (truncated)"
+            if isinstance(value, bytes):
+                value = value.decode("utf-8", errors="replace")
+            # Filter before truncating, so a secret crossing the limit is still recognised
+            content = self._safe_decode_artifact(str(value))
+            decoded[key] = truncate_artifact(content, self.config.max_artifact_bytes)
+
+        return decoded
 
-            sections.append(f"### {key}\n```\n{content}\n```")
+    def _format_artifact(self, key: str, content: str) -> str:
+        """Format a single artifact as a prompt section"""
+        return f"### {key}\n```\n{content}\n```"
 
+    def _join_artifact_sections(self, sections: List[str]) -> str:
+        """Combine artifact sections under the execution output heading"""
         if sections:
             return "## Last Execution Output\n\n" + "\n\n".join(sections)
         else:
@@ -4,7 +4,8 @@ Prompt templates for OpenEvolve
 
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from string import Formatter
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # Base system message template for evolution
 BASE_SYSTEM_TEMPLATE = """You are an expert software developer tasked with iteratively improving a codebase.
@@ -88,6 +89,94 @@ as the original program, but with improved internal implementation.
 ```
 """
 
+# Cache-friendly variants order sections from most stable to most volatile, so that
+# consecutive prompts share a long prefix that providers can serve from their prompt cache
+DIFF_USER_CACHE_FRIENDLY_TEMPLATE = """# Task
+Suggest improvements to the current program (shown below the evolution history) that will
+lead to better performance on the specified metrics.
+
+You MUST use the exact SEARCH/REPLACE diff format shown below to indicate changes:
+
+<<<<<<< SEARCH
+# Original code to find and replace (must match exactly)
+=======
+# New replacement code
+>>>>>>> REPLACE
+
+Example of valid diff format:
+<<<<<<< SEARCH
+for i in range(m):
+    for j in range(p):
+        for k in range(n):
+            C[i, j] += A[i, k] * B[k, j]
+=======
+# Reorder loops for better memory access pattern
+for i in range(m):
+    for k in range(n):
+        for j in range(p):
+            C[i, j] += A[i, k] * B[k, j]
+>>>>>>> REPLACE
+
+You can suggest multiple changes. Each SEARCH section must exactly match code in the current program.
+Be thoughtful about your changes and explain your reasoning thoroughly.
+
+IMPORTANT: Do not rewrite the entire program - focus on targeted improvements.
+
+# Program Evolution History
+## Previous Attempts
+
+{previous_attempts}
+
+## Top Performing Programs
+
+{top_programs}
+
+# Current Program
+```{language}
+{current_program}
+```
+
+# Current Program Information
+- Current performance metrics: {metrics}
+- Areas identified for improvement: {improvement_areas}
+
+{artifacts}
+"""
+
+FULL_REWRITE_USER_CACHE_FRIENDLY_TEMPLATE = """# Task
+Rewrite the current program (shown below the evolution history) to improve its performance
+on the specified metrics. Provide the complete new program code.
+
+IMPORTANT: Make sure your rewritten program maintains the same inputs and outputs
+as the original program, but with improved internal implementation.
+
+Answer with the rewritten program in a single code block:
+
+```
+# Your rewritten program here
+```
+
+# Program Evolution History
+## Previous Attempts
+
+{previous_attempts}
+
+## Top Performing Programs
+
+{top_programs}
+
+# Current Program
+```{language}
+{current_program}
+```
+
+# Current Program Information
+- Current performance metrics: {metrics}
+- Areas identified for improvement: {improvement_areas}
+
+{artifacts}
+"""
+
 # Template for formatting evolution history
 EVOLUTION_HISTORY_TEMPLATE = """## Previous Attempts
 
@@ -113,6 +202,39 @@ TOP_PROGRAM_TEMPLATE = """### Program {program_number} (Score: {score})
 Key features: {key_features}
 """
 
+# Template for asking the LLM to fix SEARCH/REPLACE blocks that could not be applied
+DIFF_REPAIR_TEMPLATE = """{num_failed} of your SEARCH/REPLACE blocks could not be applied because their \
+SEARCH section does not match the current program. Any other blocks have already been applied.
+
+{failed_blocks}
+
+Reply with corrected SEARCH/REPLACE blocks for these changes only. Copy each SEARCH \
+section exactly from the current code shown above, including whitespace and indentation.
+"""
+
+# Template for one block that could not be applied
+FAILED_BLOCK_TEMPLATE = """## Block {block_number}
+SEARCH section that was not found:
+```{language}
+{search}
+```
+Closest matching code in the current program:
+```{language}
+{region}
+```
+"""
+
+# Template for asking the LLM to restate a response without SEARCH/REPLACE blocks
+DIFF_MISSING_TEMPLATE = """Your response did not contain any SEARCH/REPLACE blocks, so no changes \
+could be applied. Reply with your changes using only this exact format:
+
+<<<<<<< SEARCH
+# Original code to find and replace (must match exactly)
+=======
+# New replacement code
+>>>>>>> REPLACE
+"""
+
 # Template for evaluating a program via an LLM
 EVALUATION_TEMPLATE = """Evaluate the following code on a scale of 0.0 to 1.0 for the following metrics:
 1. Readability: How easy is the code to read and understand?
@@ -141,18 +263,61 @@ DEFAULT_TEMPLATES = {
     "evaluator_system_message": BASE_EVALUATOR_SYSTEM_TEMPLATE,
     "diff_user": DIFF_USER_TEMPLATE,
     "full_rewrite_user": FULL_REWRITE_USER_TEMPLATE,
+    "diff_user_cache_friendly": DIFF_USER_CACHE_FRIENDLY_TEMPLATE,
+    "full_rewrite_user_cache_friendly": FULL_REWRITE_USER_CACHE_FRIENDLY_TEMPLATE,
     "evolution_history": EVOLUTION_HISTORY_TEMPLATE,
     "previous_attempt": PREVIOUS_ATTEMPT_TEMPLATE,
     "top_program": TOP_PROGRAM_TEMPLATE,
+    "diff_repair": DIFF_REPAIR_TEMPLATE,
+    "failed_block": FAILED_BLOCK_TEMPLATE,
+    "diff_missing": DIFF_MISSING_TEMPLATE,
     "evaluation": EVALUATION_TEMPLATE,
 }
 
 
+class CompiledTemplate:
+    """
+    A template parsed once into literal text and field names
+
+    Rendering joins the pre-split segments instead of re-parsing the template string on
+    every call. Templates using format specs, conversions or attribute/index access fall
+    back to str.format.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self.segments: List[Tuple[str, Optional[str]]] = []
+        self.simple = True
+
+        for literal, field_name, format_spec, conversion in Formatter().parse(template):
+            if field_name is not None and (
+                format_spec or conversion or not field_name.isidentifier()
+            ):
+                self.simple = False
+            self.segments.append((literal, field_name))
+
+    def render(self, **values: Any) -> str:
+        """Render the template, like template.format(**values)"""
+        if not self.simple:
+            return self.template.format(**values)
+
+        parts = []
+        for literal, field_name in self.segments:
+            parts.append(literal)
+            if field_name is not None:
+                parts.append(format(values[field_name]))
+        return "".join(parts)
+
+
 class TemplateManager:
     """Manages templates for prompt generation"""
 
+    # Maximum number of compiled ad-hoc templates (e.g. stochastic variations) to keep
+    MAX_COMPILED_TEMPLATES = 256
+
     def __init__(self, template_dir: Optional[str] = None):
         self.templates = DEFAULT_TEMPLATES.copy()
+        self._compiled: Dict[str, CompiledTemplate] = {}
 
         # Load templates from directory if provided
         if template_dir and os.path.isdir(template_dir):
@@ -174,3 +339,17 @@ class TemplateManager:
     def add_template(self, template_name: str, template: str) -> None:
         """Add or update a template"""
         self.templates[template_name] = template
+
+    def compile(self, template: str) -> CompiledTemplate:
+        """Get the compiled form of a template string, parsing it only once"""
+        compiled = self._compiled.get(template)
+        if compiled is None:
+            if len(self._compiled) >= self.MAX_COMPILED_TEMPLATES:
+                self._compiled.clear()
+            compiled = CompiledTemplate(template)
+            self._compiled[template] = compiled
+        return compiled
+
+    def get_compiled_template(self, template_name: str) -> CompiledTemplate:
+        """Get a compiled template by name"""
+        return self.compile(self.get_template(template_name))
@@ -8,38 +8,88 @@ from openevolve.utils.async_utils import (
     retry_async,
     run_in_executor,
 )
+from openevolve.utils.bandit_utils import Bandit
 from openevolve.utils.code_utils import (
     apply_diff,
+    apply_diff_to_evolve_blocks,
+    apply_diff_with_report,
+    build_evolve_block_view,
     calculate_edit_distance,
     extract_code_language,
     extract_diffs,
+    find_closest_region,
     format_diff_summary,
+    normalize_code,
     parse_evolve_blocks,
     parse_full_rewrite,
 )
+from openevolve.utils.collection_utils import IndexedSet
+from openevolve.utils.embedding_utils import (
+    HashedTokenEmbedder,
+    VectorIndex,
+    load_embedder,
+)
 from openevolve.utils.format_utils import (
     format_metrics_safe,
     format_improvement_safe,
+    truncate_artifact,
 )
 from openevolve.utils.metrics_utils import (
     safe_numeric_average,
     safe_numeric_sum,
 )
+from openevolve.utils.pareto_utils import (
+    ParetoArchive,
+    dominates,
+)
+from openevolve.utils.sketch_utils import (
+    compute_minhash,
+    estimate_edit_distance,
+    minhash_similarity,
+)
+from openevolve.utils.topology_utils import (
+    get_migration_targets,
+    get_ring_neighbors,
+)
+from openevolve.utils.token_utils import (
+    count_tokens,
+    truncate_to_tokens,
+)
 
 __all__ = [
     "TaskPool",
     "gather_with_concurrency",
     "retry_async",
     "run_in_executor",
+    "Bandit",
     "apply_diff",
+    "apply_diff_to_evolve_blocks",
+    "apply_diff_with_report",
+    "build_evolve_block_view",
     "calculate_edit_distance",
     "extract_code_language",
     "extract_diffs",
+    "find_closest_region",
     "format_diff_summary",
+    "normalize_code",
     "parse_evolve_blocks",
     "parse_full_rewrite",
+    "IndexedSet",
+    "HashedTokenEmbedder",
+    "VectorIndex",
+    "load_embedder",
     "format_metrics_safe",
     "format_improvement_safe",
+    "truncate_artifact",
     "safe_numeric_average",
     "safe_numeric_sum",
+    "ParetoArchive",
+    "dominates",
+    "compute_minhash",
+    "estimate_edit_distance",
+    "minhash_similarity",
+    "count_tokens",
+    "truncate_to_tokens",
+    "get_migration_targets",
+    "get_ring_neighbors",
 ]
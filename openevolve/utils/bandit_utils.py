@@ -0,0 +1,121 @@
+"""
+Multi-armed bandits for adaptive selection between sampling options
+"""
+
+import math
+import random
+from typing import List, Optional
+
+BANDIT_POLICIES = ("ucb", "thompson")
+
+
+class Bandit:
+    """
+    Multi-armed bandit rewarding arms by improvement per unit of cost
+
+    Each pull of an arm is credited with a non-negative reward (e.g. the fitness gained
+    by a child over its parent) and a cost (e.g. the seconds the iteration took), so arms
+    are ranked by reward per cost. Statistics are discounted by `decay` on every update,
+    so the bandit follows arms whose payoff changes over the run.
+
+    Policies:
+        ucb: UCB1 on the reward rate, normalized by the best arm's rate
+        thompson: Thompson sampling of the probability that a pull improves (Beta
+            posterior), divided by the arm's mean cost
+    """
+
+    def __init__(
+        self,
+        num_arms: int,
+        policy: str = "ucb",
+        exploration: float = 1.0,
+        decay: float = 1.0,
+    ):
+        if num_arms < 1:
+            raise ValueError("A bandit needs at least one arm")
+        if policy not in BANDIT_POLICIES:
+            raise ValueError(f"Unknown bandit policy: {policy} (expected one of {BANDIT_POLICIES})")
+        self.num_arms = num_arms
+        self.policy = policy
+        self.exploration = exploration
+        self.decay = decay
+
+        self.pulls: List[float] = [0.0] * num_arms
+        self.rewards: List[float] = [0.0] * num_arms
+        self.costs: List[float] = [0.0] * num_arms
+        self.successes: List[float] = [0.0] * num_arms
+
+    def select(self) -> int:
+        """
+        Choose an arm to pull
+
+        Returns:
+            Index of the arm
+        """
+        untried = [arm for arm in range(self.num_arms) if self.pulls[arm] == 0]
+        if untried:
+            return random.choice(untried)
+
+        if self.policy == "thompson":
+            scores = [
+                random.betavariate(
+                    1.0 + self.successes[arm], 1.0 + self.pulls[arm] - self.successes[arm]
+                )
+                / (self.costs[arm] / self.pulls[arm])
+                for arm in range(self.num_arms)
+            ]
+        else:
+            rates = [self._rate(arm) for arm in range(self.num_arms)]
+            best_rate = max(rates) or 1.0
+            total = sum(self.pulls)
+            scores = [
+                rates[arm] / best_rate
+                + self.exploration * math.sqrt(2.0 * math.log(max(total, 1.0)) / self.pulls[arm])
+                for arm in range(self.num_arms)
+            ]
+
+        best = max(scores)
+        return random.choice([arm for arm, score in enumerate(scores) if score == best])
+
+    def _rate(self, arm: int) -> float:
+        """Reward per unit of cost of an arm"""
+        return self.rewards[arm] / self.costs[arm] if self.costs[arm] > 0 else 0.0
+
+    def update(self, arm: int, reward: float, cost: float = 1.0) -> None:
+        """
+        Credit a pull of an arm
+
+        Args:
+            arm: Index of the pulled arm
+            reward: Reward of the pull (negative values count as 0)
+            cost: Cost of the pull (e.g. seconds or tokens)
+        """
+        if self.decay < 1.0:
+            for stats in (self.pulls, self.rewards, self.costs, self.successes):
+                for i in range(self.num_arms):
+                    stats[i] *= self.decay
+
+        reward = max(reward, 0.0)
+        self.pulls[arm] += 1.0
+        self.rewards[arm] += reward
+        self.costs[arm] += max(cost, 1e-12)
+        if reward > 0:
+            self.successes[arm] += 1.0
+
+    def to_dict(self) -> dict:
+        """Serialize the arm statistics"""
+        return {
+            "pulls": list(self.pulls),
+            "rewards": list(self.rewards),
+            "costs": list(self.costs),
+            "successes": list(self.successes),
+        }
+
+    def load_dict(self, state: Optional[dict]) -> None:
+        """Restore arm statistics saved with to_dict (ignored if the arms differ)"""
+        if not state or len(state.get("pulls", [])) != self.num_arms:
+            return
+        self.pulls = [float(value) for value in state["pulls"]]
+        self.rewards = [float(value) for value in state["rewards"]]
+        self.costs = [float(value) for value in state["costs"]]
+        self.successes = [float(value) for value in state["successes"]]
@@ -2,10 +2,34 @@
 Utilities for code parsing, diffing, and manipulation
 """
 
+import ast
+import bisect
 import re
 from typing import Dict, List, Optional, Tuple, Union
+from rapidfuzz import fuzz
 from rapidfuzz.distance import Levenshtein
 
+# Comment syntax per language family, used when normalizing code for comparison
+_LINE_COMMENT_PATTERNS = {
+    "python": r"#.*$",
+    "cpp": r"//.*$",
+    "java": r"//.*$",
+    "javascript": r"//.*$",
+    "rust": r"//.*$",
+    "sql": r"--.*$",
+}
+
+# Comment prefix per language family, derived from the line comment patterns
+_LINE_COMMENT_PREFIXES = {
+    language: pattern[: -len(".*$")] for language, pattern in _LINE_COMMENT_PATTERNS.items()
+}
+
+# Lines outside EVOLVE-BLOCK regions kept in the signature-only view of a program
+_SIGNATURE_PATTERN = re.compile(r"^\s*(?:@|def |async def |class |import |from \S+ import )")
+
+# Number of best-voted positions scored when fuzzy-matching a SEARCH block
+_MAX_FUZZY_CANDIDATES = 8
+
 
 def parse_evolve_blocks(code: str) -> List[Tuple[int, int, str]]:
     """
@@ -38,37 +62,351 @@ def parse_evolve_blocks(code: str) -> List[Tuple[int, int, str]]:
     return blocks
 
 
-def apply_diff(original_code: str, diff_text: str) -> str:
+def apply_diff(original_code: str, diff_text: str, fuzzy_threshold: float = 1.0) -> str:
     """
     Apply a diff to the original code
 
     Args:
         original_code: Original source code
         diff_text: Diff in the SEARCH/REPLACE format
+        fuzzy_threshold: Minimum similarity (0.0-1.0) for fuzzy matching of SEARCH
+            blocks; 1.0 disables fuzzy matching
 
     Returns:
         Modified code
     """
-    # Split into lines for easier processing
-    original_lines = original_code.split("\n")
-    result_lines = original_lines.copy()
+    code, _ = apply_diff_with_report(original_code, diff_text, fuzzy_threshold)
+    return code
+
+
+def apply_diff_with_report(
+    original_code: str, diff_text: str, fuzzy_threshold: float = 1.0
+) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Apply a diff to the original code and report the blocks that could not be applied
+
+    Each SEARCH block is matched exactly if possible, then ignoring whitespace
+    differences, then (if fuzzy_threshold < 1.0) by similarity. Candidate positions are
+    looked up in a hash index of the code lines instead of scanning the whole file.
 
-    # Extract diff blocks
-    diff_blocks = extract_diffs(diff_text)
+    Args:
+        original_code: Original source code
+        diff_text: Diff in the SEARCH/REPLACE format
+        fuzzy_threshold: Minimum similarity (0.0-1.0) for fuzzy matching of SEARCH
+            blocks; 1.0 disables fuzzy matching
+
+    Returns:
+        Tuple of (modified code, list of (search_text, replace_text) blocks that failed)
+    """
+    result_lines = original_code.split("\n")
+    index = _build_line_index(result_lines)
+    failed_blocks = []
 
     # Apply each diff block
-    for search_text, replace_text in diff_blocks:
-        search_lines = search_text.split("\n")
-        replace_lines = replace_text.split("\n")
-
-        # Find where the search pattern starts in the original code
-        for i in range(len(result_lines) - len(search_lines) + 1):
-            if result_lines[i : i + len(search_lines)] == search_lines:
-                # Replace the matched section
-                result_lines[i : i + len(search_lines)] = replace_lines
+    for search_text, replace_text in extract_diffs(diff_text):
+        if not _apply_diff_block(result_lines, index, search_text, replace_text, fuzzy_threshold):
+            failed_blocks.append((search_text, replace_text))
+
+    return "\n".join(result_lines), failed_blocks
+
+
+def apply_diff_to_evolve_blocks(
+    original_code: str, diff_text: str, fuzzy_threshold: float = 1.0
+) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Apply a diff only inside the EVOLVE-BLOCK regions of the code
+
+    Each SEARCH block is applied to the first region that contains it; blocks that match
+    only outside the regions (or across their markers) fail. Code without evolve blocks
+    is patched as a whole, like apply_diff_with_report.
+
+    Args:
+        original_code: Original source code
+        diff_text: Diff in the SEARCH/REPLACE format
+        fuzzy_threshold: Minimum similarity (0.0-1.0) for fuzzy matching of SEARCH
+            blocks; 1.0 disables fuzzy matching
+
+    Returns:
+        Tuple of (modified code, list of (search_text, replace_text) blocks that failed)
+    """
+    blocks = parse_evolve_blocks(original_code)
+    if not blocks:
+        return apply_diff_with_report(original_code, diff_text, fuzzy_threshold)
+
+    lines = original_code.split("\n")
+    regions = [lines[start + 1 : end] for start, end, _ in blocks]
+    indexes = [_build_line_index(region) for region in regions]
+    failed_blocks = []
+
+    for search_text, replace_text in extract_diffs(diff_text):
+        for i, region in enumerate(regions):
+            if _apply_diff_block(region, indexes[i], search_text, replace_text, fuzzy_threshold):
                 break
+        else:
+            failed_blocks.append((search_text, replace_text))
+
+    # Put the patched regions back between their markers
+    result_lines = []
+    previous_end = 0
+    for (start, end, _), region in zip(blocks, regions):
+        result_lines.extend(lines[previous_end : start + 1])
+        result_lines.extend(region)
+        previous_end = end
+    result_lines.extend(lines[previous_end:])
+
+    return "\n".join(result_lines), failed_blocks
+
+
+def build_evolve_block_view(code: str, language: str = "python") -> str:
+    """
+    Show the EVOLVE-BLOCK regions of a program in full and the rest as signatures only
+
+    Outside the regions, top-level lines and function/class/import lines are kept; runs
+    of other lines are replaced by a comment saying how many lines were omitted.
+
+    Args:
+        code: Source code with evolve blocks
+        language: Programming language (selects the comment syntax)
+
+    Returns:
+        Compressed view of the code, or the code unchanged if it has no evolve blocks
+    """
+    blocks = parse_evolve_blocks(code)
+    if not blocks:
+        return code
 
-    return "\n".join(result_lines)
+    lines = code.split("\n")
+    inside = set()
+    for start, end, _ in blocks:
+        inside.update(range(start, end + 1))
+    comment = _LINE_COMMENT_PREFIXES.get(language, "#")
+
+    view = []
+    omitted = []
+    for i, line in enumerate(lines + [""]):  # The sentinel flushes the last omitted run
+        keep = (
+            i >= len(lines)
+            or i in inside
+            or _SIGNATURE_PATTERN.match(line)
+            or (line.strip() and not line[0].isspace())
+        )
+        if not keep:
+            omitted.append(line)
+            continue
+
+        # Collapse the preceding run of omitted lines, keeping its trailing blank lines
+        trailing_blank = len(omitted)
+        while trailing_blank > 0 and not omitted[trailing_blank - 1].strip():
+            trailing_blank -= 1
+        if trailing_blank > 0:
+            first = next(text for text in omitted if text.strip())
+            indent = first[: len(first) - len(first.lstrip())]
+            view.append(f"{indent}{comment} ... ({trailing_blank} lines omitted)")
+        view.extend(omitted[trailing_blank:])
+        omitted = []
+        if i < len(lines):
+            view.append(line)
+
+    return "\n".join(view)
+
+
+def _apply_diff_block(
+    lines: List[str],
+    index: Dict[str, List[int]],
+    search_text: str,
+    replace_text: str,
+    fuzzy_threshold: float,
+) -> bool:
+    """
+    Replace the first match of a SEARCH block in a list of lines, in place
+
+    The line index is updated along with the lines.
+
+    Returns:
+        True if the block was found and replaced
+    """
+    search_lines = search_text.split("\n")
+    match = _find_search_block(lines, index, search_lines, fuzzy_threshold)
+    if match is None:
+        return False
+
+    start, exact = match
+    replace_lines = replace_text.split("\n")
+    if not exact:
+        replace_lines = _reindent(
+            replace_lines, search_lines, lines[start : start + len(search_lines)]
+        )
+
+    # Replace the matched section
+    _update_line_index(index, start, lines[start : start + len(search_lines)], replace_lines)
+    lines[start : start + len(search_lines)] = replace_lines
+    return True
+
+
+def _normalize_line(line: str) -> str:
+    """Collapse all whitespace in a line, for whitespace-insensitive matching"""
+    return " ".join(line.split())
+
+
+def _build_line_index(lines: List[str]) -> Dict[str, List[int]]:
+    """Map each whitespace-normalized line to the positions where it occurs"""
+    index: Dict[str, List[int]] = {}
+    for i, line in enumerate(lines):
+        index.setdefault(_normalize_line(line), []).append(i)
+    return index
+
+
+def _update_line_index(
+    index: Dict[str, List[int]], start: int, old_lines: List[str], new_lines: List[str]
+) -> None:
+    """
+    Update a line index for replacing old_lines at a position with new_lines
+
+    Only the replaced and inserted lines are normalized; positions after the edit are
+    shifted in place, keeping every position list sorted.
+    """
+    for i, line in enumerate(old_lines):
+        key = _normalize_line(line)
+        positions = index[key]
+        del positions[bisect.bisect_left(positions, start + i)]
+        if not positions:
+            del index[key]
+
+    shift = len(new_lines) - len(old_lines)
+    if shift:
+        for positions in index.values():
+            for i in range(bisect.bisect_left(positions, start), len(positions)):
+                positions[i] += shift
+
+    for i, line in enumerate(new_lines):
+        bisect.insort(index.setdefault(_normalize_line(line), []), start + i)
+
+
+def _find_search_block(
+    lines: List[str],
+    index: Dict[str, List[int]],
+    search_lines: List[str],
+    fuzzy_threshold: float,
+) -> Optional[Tuple[int, bool]]:
+    """
+    Locate a SEARCH block in the code
+
+    Args:
+        lines: Current code lines
+        index: Line index of the code (see _build_line_index)
+        search_lines: Lines of the SEARCH block
+        fuzzy_threshold: Minimum similarity for a fuzzy match (1.0 disables fuzzy matching)
+
+    Returns:
+        Tuple of (start line, whether the match is exact), or None if not found
+    """
+    num_lines = len(search_lines)
+    last_start = len(lines) - num_lines
+    normalized_search = [_normalize_line(line) for line in search_lines]
+
+    # Anchor candidates on the first non-blank line of the block
+    anchor = next((i for i, line in enumerate(normalized_search) if line), 0)
+    candidates = [
+        position - anchor
+        for position in index.get(normalized_search[anchor], [])
+        if 0 <= position - anchor <= last_start
+    ]
+
+    # Exact match first, then whitespace-insensitive, earliest position first
+    for start in candidates:
+        if lines[start : start + num_lines] == search_lines:
+            return start, True
+    for start in candidates:
+        window = lines[start : start + num_lines]
+        if [_normalize_line(line) for line in window] == normalized_search:
+            return start, False
+
+    if fuzzy_threshold >= 1.0:
+        return None
+
+    # Fuzzy match: windows sharing the most lines with the block are the candidates
+    votes = _vote_positions(index, normalized_search, last_start)
+    search_text = "\n".join(normalized_search)
+    best_start, best_score = None, fuzzy_threshold
+    for start in sorted(votes, key=lambda s: (-votes[s], s))[:_MAX_FUZZY_CANDIDATES]:
+        window = "\n".join(_normalize_line(line) for line in lines[start : start + num_lines])
+        score = fuzz.ratio(search_text, window) / 100.0
+        if score >= best_score:
+            best_start, best_score = start, score
+            if score == 1.0:
+                break
+
+    return None if best_start is None else (best_start, False)
+
+
+def _vote_positions(
+    index: Dict[str, List[int]], normalized_search: List[str], last_start: int
+) -> Dict[int, int]:
+    """Count, for each start position, how many lines of a block match the code there"""
+    votes: Dict[int, int] = {}
+    for offset, line in enumerate(normalized_search):
+        if not line:
+            continue
+        for position in index.get(line, []):
+            start = position - offset
+            if 0 <= start <= last_start:
+                votes[start] = votes.get(start, 0) + 1
+    return votes
+
+
+def find_closest_region(code: str, search_text: str, context_lines: int = 3) -> Optional[str]:
+    """
+    Find the part of the code that a (non-matching) SEARCH block most likely refers to
+
+    Args:
+        code: Source code
+        search_text: Text of the SEARCH block
+        context_lines: Number of extra lines to include before and after the region
+
+    Returns:
+        The closest region of the code, or None if no line resembles the block
+    """
+    lines = code.split("\n")
+    search_lines = search_text.split("\n")
+    normalized_search = [_normalize_line(line) for line in search_lines]
+    last_start = max(len(lines) - len(search_lines), 0)
+
+    votes = _vote_positions(_build_line_index(lines), normalized_search, last_start)
+    if votes:
+        start = min(votes, key=lambda s: (-votes[s], s))
+    else:
+        # No line matches exactly: anchor on the line most similar to the block's first line
+        anchor = next((line for line in normalized_search if line), "")
+        scores = [fuzz.ratio(anchor, _normalize_line(line)) for line in lines]
+        if not anchor or not scores or max(scores) == 0:
+            return None
+        start = scores.index(max(scores))
+
+    first = max(start - context_lines, 0)
+    last = min(start + len(search_lines) + context_lines, len(lines))
+    return "\n".join(lines[first:last])
+
+
+def _reindent(
+    replace_lines: List[str], search_lines: List[str], matched_lines: List[str]
+) -> List[str]:
+    """Shift the indentation of replacement lines to match the code they replace"""
+
+    def indentation(lines: List[str]) -> Optional[str]:
+        for line in lines:
+            if line.strip():
+                return line[: len(line) - len(line.lstrip())]
+        return None
+
+    search_indent = indentation(search_lines)
+    code_indent = indentation(matched_lines)
+    if search_indent is None or code_indent is None or search_indent == code_indent:
+        return replace_lines
+
+    return [
+        code_indent + line[len(search_indent) :] if line.startswith(search_indent) else line
+        for line in replace_lines
+    ]
 
 
 def extract_diffs(diff_text: str) -> List[Tuple[str, str]]:
@@ -159,6 +497,38 @@ def calculate_edit_distance(code1: str, code2: str) -> int:
     return Levenshtein.distance(code1, code2)
 
 
+def normalize_code(code: str, language: str = "python") -> str:
+    """
+    Normalize code so that trivially reformatted programs compare equal
+
+    Python code is canonicalized through the AST, which drops comments and
+    formatting. Other languages (and Python that fails to parse) have comments
+    and blank lines removed and whitespace collapsed.
+
+    Args:
+        code: Source code
+        language: Programming language
+
+    Returns:
+        Normalized code
+    """
+    if language == "python":
+        try:
+            return ast.unparse(ast.parse(code))
+        except (SyntaxError, ValueError, RecursionError):
+            pass
+
+    if language in ("cpp", "java", "javascript", "rust"):
+        code = re.sub(r"/\*.*?\*/", "", code, flags=re.DOTALL)
+
+    comment_pattern = _LINE_COMMENT_PATTERNS.get(language)
+    if comment_pattern:
+        code = re.sub(comment_pattern, "", code, flags=re.MULTILINE)
+
+    lines = (" ".join(line.split()) for line in code.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
 def extract_code_language(code: str) -> str:
     """
     Try to determine the language of a code snippet
@@ -0,0 +1,215 @@
+"""
+Collections supporting fast uniform, weighted and rank-based random sampling
+"""
+
+import bisect
+import math
+import random
+from collections.abc import MutableSet
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Tuple
+
+
+class IndexedSet(MutableSet):
+    """
+    Set that also supports indexing, for O(1) random choice without building a list
+
+    Items are kept in a list with a map from item to list position. Removing an item
+    moves the last item into its slot, so add, discard, membership and choice are all
+    O(1). Iteration order is insertion order, disturbed by removals.
+    """
+
+    def __init__(self, items: Iterable[Hashable] = ()):
+        self._items: List[Hashable] = []
+        self._positions: Dict[Hashable, int] = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._positions
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index: int) -> Hashable:
+        return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"IndexedSet({self._items!r})"
+
+    def add(self, item: Hashable) -> None:
+        """Add an item (no-op if present)"""
+        if item not in self._positions:
+            self._positions[item] = len(self._items)
+            self._items.append(item)
+
+    def discard(self, item: Hashable) -> None:
+        """Remove an item if present"""
+        position = self._positions.pop(item, None)
+        if position is None:
+            return
+        last = self._items.pop()
+        if position < len(self._items):
+            self._items[position] = last
+            self._positions[last] = position
+
+    def choice(self) -> Hashable:
+        """
+        Pick a uniformly random item, using the global random generator
+
+        Raises:
+            IndexError: If the set is empty
+        """
+        return random.choice(self._items)
+
+
+class WeightedIndexedSet(IndexedSet):
+    """
+    Indexed set with a weight per item, for O(log n) weighted random choice
+
+    Weights are kept in a Fenwick (binary indexed) tree over the item positions, so
+    adding, removing or reweighting an item and drawing a weighted sample all take
+    O(log n), however large the set grows.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Hashable, float]] = ()):
+        self._weights: List[float] = []
+        self._tree: List[float] = [0.0]  # 1-based Fenwick tree
+        super().__init__()
+        for item, weight in items:
+            self.add(item, weight)
+
+    def _prefix_sum(self, index: int) -> float:
+        """Sum of the weights at positions 0 .. index - 1"""
+        total = 0.0
+        while index > 0:
+            total += self._tree[index]
+            index -= index & -index
+        return total
+
+    def _update(self, position: int, delta: float) -> None:
+        """Add delta to the weight at a position"""
+        index = position + 1
+        while index < len(self._tree):
+            self._tree[index] += delta
+            index += index & -index
+
+    @property
+    def total_weight(self) -> float:
+        """Sum of all weights"""
+        return self._prefix_sum(len(self._items))
+
+    def weight(self, item: Hashable) -> float:
+        """Weight of an item"""
+        return self._weights[self._positions[item]]
+
+    def add(self, item: Hashable, weight: float = 1.0) -> None:
+        """Add an item, or update its weight if present"""
+        if item in self._positions:
+            self.set_weight(item, weight)
+            return
+        super().add(item)
+        # The new tree node covers the positions (index - lowbit(index), index]
+        index = len(self._items)
+        lower = index - (index & -index)
+        self._weights.append(weight)
+        self._tree.append(weight + self._prefix_sum(index - 1) - self._prefix_sum(lower))
+
+    def discard(self, item: Hashable) -> None:
+        """Remove an item if present"""
+        position = self._positions.get(item)
+        if position is None:
+            return
+        last_position = len(self._items) - 1
+        if position != last_position:
+            # The last item moves into the freed position
+            self._update(position, self._weights[last_position] - self._weights[position])
+            self._weights[position] = self._weights[last_position]
+        # Only the last tree node covers the last position, so it can simply be dropped
+        self._weights.pop()
+        self._tree.pop()
+        super().discard(item)
+
+    def set_weight(self, item: Hashable, weight: float) -> None:
+        """Change the weight of an item"""
+        position = self._positions[item]
+        self._update(position, weight - self._weights[position])
+        self._weights[position] = weight
+
+    def weighted_choice(self) -> Hashable:
+        """
+        Pick an item with probability proportional to its weight
+
+        Falls back to a uniform choice if no item has a positive weight.
+
+        Raises:
+            IndexError: If the set is empty
+        """
+        total = self.total_weight
+        if not self._items or total <= 0:
+            return self.choice()
+
+        # Descend the tree to the first position whose prefix sum exceeds the target
+        target = random.random() * total
+        index = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            next_index = index + step
+            if next_index < len(self._tree) and self._tree[next_index] <= target:
+                index = next_index
+                target -= self._tree[next_index]
+            step >>= 1
+        return self._items[min(index, len(self._items) - 1)]
+
+
+class RankedSet:
+    """
+    Set of items ordered by a sort key, for O(1) access by rank
+
+    Items are kept in a sorted list: adding and removing cost a binary search plus a
+    list shift, and the item of any rank is an index lookup.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[float, Hashable]] = []
+        self._item_keys: Dict[Hashable, Tuple[float, Hashable]] = {}
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._item_keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, rank: int) -> Hashable:
+        """Item of a rank (0 = lowest key)"""
+        return self._keys[rank][1]
+
+    def add(self, item: Hashable, key: float) -> None:
+        """Add an item, or move it if present"""
+        self.discard(item)
+        entry = (key, item)
+        bisect.insort(self._keys, entry)
+        self._item_keys[item] = entry
+
+    def discard(self, item: Hashable) -> None:
+        """Remove an item if present"""
+        entry = self._item_keys.pop(item, None)
+        if entry is not None:
+            del self._keys[bisect.bisect_left(self._keys, entry)]
+
+    def linear_rank_choice(self) -> Hashable:
+        """
+        Pick an item with probability proportional to its rank (1 = lowest key)
+
+        Raises:
+            IndexError: If the set is empty
+        """
+        n = len(self._keys)
+        if n == 0:
+            raise IndexError("Cannot choose from an empty set")
+        # Invert the cumulative rank weights r (r + 1) / 2 for a uniform target
+        target = random.random() * n * (n + 1) / 2
+        rank = int(math.ceil((math.sqrt(1 + 8 * target) - 1) / 2))
+        return self._keys[min(max(rank, 1), n) - 1][1]
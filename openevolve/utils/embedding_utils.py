@@ -0,0 +1,187 @@
+"""
+Code embedding and vector index utilities for feature-based diversity
+"""
+
+import importlib
+import math
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from openevolve.utils.sketch_utils import tokenize_code
+
+
+class HashedTokenEmbedder:
+    """
+    Embeds code as a hashed bag of tokens and token bigrams
+
+    This needs no model download or network access. Each token (and bigram) is hashed
+    into one of `dim` buckets with a hash-derived sign, counts are log-scaled and the
+    resulting vector is L2-normalized, so cosine similarity is a plain dot product.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, code: str) -> np.ndarray:
+        tokens = tokenize_code(code)
+        features = Counter(tokens)
+        features.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in features.items():
+            h = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            vector[h % self.dim] += sign * (1.0 + math.log(count))
+
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+
+def load_embedder(name: str = "hashed", dim: int = 256) -> Callable[[str], np.ndarray]:
+    """
+    Load a code embedding function
+
+    Args:
+        name: "hashed" for the built-in hashed bag-of-tokens embedder, or an import
+            path "package.module:attribute" of a callable mapping code to a vector
+            (e.g. a wrapper around a local embedding model)
+        dim: Dimension of the built-in embedder
+
+    Returns:
+        Callable mapping code to a 1-D embedding vector
+    """
+    if name == "hashed":
+        return HashedTokenEmbedder(dim)
+
+    if ":" not in name:
+        raise ValueError(f"Unknown embedding model '{name}', expected 'hashed' or 'module:attr'")
+
+    module_name, attr = name.split(":", 1)
+    embedder = getattr(importlib.import_module(module_name), attr)
+    if not callable(embedder):
+        raise TypeError(f"Embedding model '{name}' is not callable")
+    return embedder
+
+
+def random_projection(dim: int, num_components: int, seed: int = 0) -> np.ndarray:
+    """
+    Create a fixed random projection with unit-norm columns
+
+    Args:
+        dim: Embedding dimension
+        num_components: Number of projected coordinates
+        seed: Seed for the projection matrix
+
+    Returns:
+        Matrix of shape (dim, num_components)
+    """
+    rng = np.random.RandomState(seed)
+    projection = rng.normal(size=(dim, num_components)).astype(np.float32)
+    return projection / np.linalg.norm(projection, axis=0, keepdims=True)
+
+
+class VectorIndex:
+    """
+    In-process index of unit-norm vectors supporting similarity search
+
+    Vectors live in one contiguous matrix (grown by doubling) with a position map, so
+    add and remove are O(1) and a search is a single matrix-vector product. For the
+    population sizes used in evolution this is faster than any tree-based index.
+    """
+
+    def __init__(self, dim: int):
+        self.dim = dim
+        self.vectors = np.zeros((16, dim), dtype=np.float32)
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+
+    def add(self, key: str, vector: np.ndarray) -> None:
+        """
+        Add or replace a vector
+
+        Args:
+            key: Identifier of the vector
+            vector: Unit-norm vector of length dim
+        """
+        if key in self.positions:
+            self.vectors[self.positions[key]] = vector
+            return
+
+        if len(self.ids) == len(self.vectors):
+            grown = np.zeros((2 * len(self.vectors), self.dim), dtype=np.float32)
+            grown[: len(self.ids)] = self.vectors
+            self.vectors = grown
+
+        self.positions[key] = len(self.ids)
+        self.vectors[len(self.ids)] = vector
+        self.ids.append(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a vector by swapping the last vector into its slot
+
+        Args:
+            key: Identifier of the vector
+        """
+        position = self.positions.pop(key, None)
+        if position is None:
+            return
+
+        last = len(self.ids) - 1
+        if position != last:
+            last_key = self.ids[last]
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = last_key
+            self.positions[last_key] = position
+        self.ids.pop()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get the vector stored for a key"""
+        position = self.positions.get(key)
+        return None if position is None else self.vectors[position]
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int = 5,
+        farthest: bool = False,
+        exclude: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most (or least) similar vectors by cosine similarity
+
+        Args:
+            vector: Query vector
+            k: Number of results
+            farthest: Return the least similar vectors instead of the most similar
+            exclude: Key to leave out of the results (e.g. the query itself)
+
+        Returns:
+            List of (key, similarity) tuples in result order
+        """
+        count = len(self.ids)
+        if count == 0 or k <= 0:
+            return []
+
+        scores = self.vectors[:count] @ vector
+        if exclude is not None and exclude in self.positions:
+            scores[self.positions[exclude]] = np.inf if farthest else -np.inf
+
+        ranked = scores if farthest else -scores
+        k = min(k, count)
+        top = np.argpartition(ranked, k - 1)[:k]
+        top = top[np.argsort(ranked[top], kind="stable")]
+
+        results = [(self.ids[i], float(scores[i])) for i in top]
+        if exclude is not None:
+            results = [result for result in results if result[0] != exclude]
+        return results
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.positions
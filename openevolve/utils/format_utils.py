@@ -63,3 +63,24 @@ def format_improvement_safe(parent_metrics: Dict[str, Any], child_metrics: Dict[
                     continue
 
     return ", ".join(improvement_parts)
+
+
+ARTIFACT_TRUNCATION_MARKER = "\n... (truncated)"
+
+
+def truncate_artifact(content: str, max_length: int) -> str:
+    """
+    Truncate artifact text for display, marking that it was truncated
+
+    Truncating an already truncated text to the same length leaves it unchanged.
+
+    Args:
+        content: Artifact text
+        max_length: Maximum number of characters kept
+
+    Returns:
+        The text, or its first max_length characters followed by a truncation marker
+    """
+    if len(content) > max_length:
+        return content[:max_length] + ARTIFACT_TRUNCATION_MARKER
+    return content
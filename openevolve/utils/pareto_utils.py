@@ -0,0 +1,205 @@
+"""
+Incremental non-dominated sorting for multi-objective selection
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def dominates(values1: Sequence[float], values2: Sequence[float]) -> bool:
+    """
+    Check whether one objective vector Pareto-dominates another (all objectives maximized)
+
+    Args:
+        values1: First objective vector
+        values2: Second objective vector
+
+    Returns:
+        True if values1 is at least as good in every objective and better in one
+    """
+    return all(a >= b for a, b in zip(values1, values2)) and any(
+        a > b for a, b in zip(values1, values2)
+    )
+
+
+class _Front:
+    """Items of one front with their objective values as rows of a matrix"""
+
+    def __init__(self, num_objectives: int):
+        self.items: List[Hashable] = []
+        self.positions: Dict[Hashable, int] = {}
+        self.matrix = np.empty((8, num_objectives))
+        self.crowding: Optional[Dict[Hashable, float]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.matrix[: len(self.items)]
+
+    def add(self, item: Hashable, values: np.ndarray) -> None:
+        if len(self.items) == len(self.matrix):
+            self.matrix = np.concatenate([self.matrix, np.empty_like(self.matrix)])
+        self.positions[item] = len(self.items)
+        self.matrix[len(self.items)] = values
+        self.items.append(item)
+        self.crowding = None
+
+    def discard(self, item: Hashable) -> None:
+        # The last item moves into the freed row
+        position = self.positions.pop(item)
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+            self.matrix[position] = self.matrix[len(self.items)]
+        self.crowding = None
+
+    def dominated_by(self, dominators: np.ndarray) -> List[Hashable]:
+        """Items dominated by any row of a matrix of objective vectors"""
+        values = self.values[None, :, :]
+        dominators = dominators[:, None, :]
+        mask = np.any(
+            np.all(dominators >= values, axis=2) & np.any(dominators > values, axis=2), axis=0
+        )
+        return [self.items[i] for i in np.flatnonzero(mask)]
+
+    def dominates(self, values: np.ndarray) -> bool:
+        """Whether any item dominates an objective vector"""
+        matrix = self.values
+        return bool(np.any(np.all(matrix >= values, axis=1) & np.any(matrix > values, axis=1)))
+
+
+class ParetoArchive:
+    """
+    Items ranked into non-dominated fronts, as in NSGA-II, with all objectives maximized
+
+    Fronts are updated incrementally on every add and removal (efficient non-domination
+    level update): a new item is placed in the first front where nothing dominates it,
+    found by binary search, and only the items it pushes down cascade to later fronts;
+    a removal only promotes items of later fronts that the removed item dominated. Within
+    a front, items are ordered by crowding distance, computed per front when needed.
+    """
+
+    def __init__(self):
+        self.fronts: List[_Front] = []
+        self.ranks: Dict[Hashable, int] = {}
+        self.values: Dict[Hashable, np.ndarray] = {}
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.ranks
+
+    def __len__(self) -> int:
+        return len(self.ranks)
+
+    def _move(self, items: List[Hashable], source: Optional[int], target: int) -> None:
+        """Move items between fronts, appending a front if the target is past the end"""
+        if target == len(self.fronts):
+            self.fronts.append(_Front(len(self.values[items[0]])))
+        for item in items:
+            if source is not None:
+                self.fronts[source].discard(item)
+            self.fronts[target].add(item, self.values[item])
+            self.ranks[item] = target
+
+    def add(self, item: Hashable, values: Sequence[float]) -> None:
+        """
+        Add an item, or move it if its objective values changed
+
+        Args:
+            item: Item to add
+            values: Objective values (higher is better; use -inf for undefined values)
+        """
+        self.discard(item)
+        vector = np.asarray(values, dtype=float)
+        self.values[item] = vector
+
+        # Dominators of the item in front k imply dominators in every earlier front
+        low, high = 0, len(self.fronts)
+        while low < high:
+            middle = (low + high) // 2
+            if self.fronts[middle].dominates(vector):
+                low = middle + 1
+            else:
+                high = middle
+        rank = low
+
+        # Items the new item dominates drop a front, pushing down what they dominate
+        pushed = self.fronts[rank].dominated_by(vector[None]) if rank < len(self.fronts) else []
+        self._move([item], None, rank)
+        while pushed:
+            next_pushed = (
+                self.fronts[rank + 1].dominated_by(np.array([self.values[i] for i in pushed]))
+                if rank + 1 < len(self.fronts)
+                else []
+            )
+            self._move(pushed, rank, rank + 1)
+            pushed = next_pushed
+            rank += 1
+
+    def discard(self, item: Hashable) -> None:
+        """Remove an item if present"""
+        rank = self.ranks.pop(item, None)
+        if rank is None:
+            return
+        self.fronts[rank].discard(item)
+
+        # Items the removed ones dominated move up a front if nothing else there dominates them
+        removed = [self.values.pop(item)]
+        while removed and rank + 1 < len(self.fronts):
+            promoted = [
+                candidate
+                for candidate in self.fronts[rank + 1].dominated_by(np.array(removed))
+                if not self.fronts[rank].dominates(self.values[candidate])
+            ]
+            self._move(promoted, rank + 1, rank)
+            removed = [self.values[i] for i in promoted]
+            rank += 1
+
+        # Only trailing fronts can be emptied
+        while self.fronts and not self.fronts[-1]:
+            self.fronts.pop()
+
+    def rank(self, item: Hashable) -> int:
+        """Front of an item (0 = non-dominated)"""
+        return self.ranks[item]
+
+    def front(self, rank: int) -> List[Hashable]:
+        """Items of a front"""
+        return list(self.fronts[rank].items)
+
+    def crowding_distance(self, item: Hashable) -> float:
+        """
+        Crowding distance of an item within its front (infinite at the front's extremes)
+        """
+        front = self.fronts[self.ranks[item]]
+        if front.crowding is None:
+            front.crowding = self._front_crowding(front)
+        return front.crowding[item]
+
+    @staticmethod
+    def _front_crowding(front: _Front) -> Dict[Hashable, float]:
+        """Crowding distances of all items of a front"""
+        matrix = front.values
+        distances = np.zeros(len(front))
+        for objective in range(matrix.shape[1]):
+            order = np.argsort(matrix[:, objective], kind="stable")
+            column = matrix[order, objective]
+            distances[order[0]] = distances[order[-1]] = np.inf
+            spread = column[-1] - column[0]
+            if len(front) > 2 and np.isfinite(spread) and spread > 0:
+                distances[order[1:-1]] += (column[2:] - column[:-2]) / spread
+        return {item: float(distances[i]) for i, item in enumerate(front.items)}
+
+    def sort_key(self, item: Hashable) -> Tuple[int, float]:
+        """Crowded-comparison key: lower front first, then larger crowding distance"""
+        return self.ranks[item], -self.crowding_distance(item)
+
+    def worst_first(self) -> List[Hashable]:
+        """All items from the last front to the first, least isolated first within a front"""
+        ordered = []
+        for rank in range(len(self.fronts) - 1, -1, -1):
+            ordered.extend(sorted(self.fronts[rank].items, key=self.crowding_distance))
+        return ordered
@@ -0,0 +1,211 @@
+"""
+Utilities for approximate code similarity using MinHash sketches
+"""
+
+import re
+import zlib
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+# Mersenne prime used for the universal hash family (keeps a * x + b inside uint64)
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_HASH_MASK = (1 << 31) - 1
+
+# Tokens are identifiers/numbers or single punctuation characters; whitespace is ignored
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Permutation coefficients are cached per sketch size so that sketches are comparable
+# across database instances and processes
+_PERMUTATIONS = {}
+
+
+def _get_permutations(num_perm: int):
+    """Get the (a, b) coefficients of the hash permutations for a sketch size"""
+    if num_perm not in _PERMUTATIONS:
+        rng = np.random.RandomState(num_perm)
+        a = rng.randint(1, _HASH_MASK, size=num_perm, dtype=np.int64).astype(np.uint64)
+        b = rng.randint(0, _HASH_MASK, size=num_perm, dtype=np.int64).astype(np.uint64)
+        _PERMUTATIONS[num_perm] = (a, b)
+    return _PERMUTATIONS[num_perm]
+
+
+def tokenize_code(code: str) -> List[str]:
+    """
+    Split code into tokens for shingling
+
+    Args:
+        code: Source code
+
+    Returns:
+        List of tokens (whitespace is discarded)
+    """
+    return _TOKEN_PATTERN.findall(code)
+
+
+def compute_minhash(code: str, num_perm: int = 64, shingle_size: int = 3) -> np.ndarray:
+    """
+    Compute a MinHash sketch of the token shingles of a code snippet
+
+    Args:
+        code: Source code
+        num_perm: Number of hash permutations (sketch length)
+        shingle_size: Number of consecutive tokens per shingle
+
+    Returns:
+        Array of shape (num_perm,) with the minimum hash value per permutation
+    """
+    tokens = tokenize_code(code)
+    if len(tokens) < shingle_size:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {
+            " ".join(tokens[i : i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)
+        }
+
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) & _HASH_MASK for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+    a, b = _get_permutations(num_perm)
+    permuted = (np.outer(hashes, a) + b) % _MERSENNE_PRIME
+    return permuted.min(axis=0)
+
+
+def minhash_similarity(sketch1: np.ndarray, sketch2: np.ndarray) -> float:
+    """
+    Estimate the Jaccard similarity of two programs from their sketches
+
+    Args:
+        sketch1: First MinHash sketch
+        sketch2: Second MinHash sketch
+
+    Returns:
+        Estimated Jaccard similarity between 0.0 and 1.0
+    """
+    return float(np.mean(sketch1 == sketch2))
+
+
+def estimate_edit_distance(
+    sketch1: np.ndarray, sketch2: np.ndarray, length1: int, length2: int
+) -> float:
+    """
+    Approximate the edit distance between two programs from their sketches
+
+    The estimate scales the Jaccard distance by the longer program length, which keeps
+    it on the same scale as the Levenshtein distance it replaces.
+
+    Args:
+        sketch1: First MinHash sketch
+        sketch2: Second MinHash sketch
+        length1: Length of the first program in characters
+        length2: Length of the second program in characters
+
+    Returns:
+        Approximate edit distance
+    """
+    return (1.0 - minhash_similarity(sketch1, sketch2)) * max(length1, length2)
+
+
+def pairwise_similarity(sketches: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Estimate all pairwise Jaccard similarities for a set of sketches
+
+    Args:
+        sketches: Sequence of MinHash sketches of equal length
+
+    Returns:
+        Symmetric matrix of shape (len(sketches), len(sketches))
+    """
+    matrix = np.stack(sketches)
+    return (matrix[:, None, :] == matrix[None, :, :]).mean(axis=2)
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive hashing index over MinHash sketches
+
+    Sketches are split into bands; two sketches become candidates for each other
+    when all rows of at least one band are equal. Candidates are then verified
+    against the full sketch, so lookups cost O(bands) instead of O(population).
+    """
+
+    def __init__(self, num_perm: int = 64, num_bands: int = 16):
+        if num_bands <= 0 or num_perm % num_bands != 0:
+            raise ValueError(
+                f"Number of bands ({num_bands}) must evenly divide the sketch size ({num_perm})"
+            )
+        self.num_perm = num_perm
+        self.num_bands = num_bands
+        self.rows_per_band = num_perm // num_bands
+
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(num_bands)]
+        self.sketches: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, sketch: np.ndarray) -> List[bytes]:
+        """Get the bucket key of each band of a sketch"""
+        rows = self.rows_per_band
+        return [sketch[i * rows : (i + 1) * rows].tobytes() for i in range(self.num_bands)]
+
+    def add(self, key: str, sketch: np.ndarray) -> None:
+        """
+        Add a sketch to the index
+
+        Args:
+            key: Identifier of the sketched item
+            sketch: MinHash sketch
+        """
+        if key in self.sketches:
+            self.remove(key)
+        self.sketches[key] = sketch
+        for band, band_key in zip(self.buckets, self._band_keys(sketch)):
+            band.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """
+        Remove a sketch from the index
+
+        Args:
+            key: Identifier of the sketched item
+        """
+        sketch = self.sketches.pop(key, None)
+        if sketch is None:
+            return
+        for band, band_key in zip(self.buckets, self._band_keys(sketch)):
+            bucket = band.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del band[band_key]
+
+    def query(self, sketch: np.ndarray, threshold: float = 0.0) -> List[Tuple[str, float]]:
+        """
+        Find indexed sketches similar to a sketch
+
+        Args:
+            sketch: MinHash sketch to look up
+            threshold: Minimum estimated Jaccard similarity of returned items
+
+        Returns:
+            List of (key, similarity) tuples, most similar first
+        """
+        candidates = set()
+        for band, band_key in zip(self.buckets, self._band_keys(sketch)):
+            candidates.update(band.get(band_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = minhash_similarity(sketch, self.sketches[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.sketches)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.sketches
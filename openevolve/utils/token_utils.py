@@ -0,0 +1,94 @@
+"""
+Token counting utilities for budgeting prompt size
+"""
+
+import math
+from typing import Dict, Optional
+
+try:
+    import tiktoken
+except ImportError:  # Optional dependency
+    tiktoken = None
+
+# Average characters per token of BPE tokenizers on code and English text
+CHARS_PER_TOKEN = 4.0
+
+_ENCODINGS: Dict[str, object] = {}
+
+
+def _get_encoding(model: Optional[str]):
+    """Get (and cache) the tiktoken encoding for a model, or None if unavailable"""
+    if tiktoken is None:
+        return None
+
+    key = model or ""
+    if key not in _ENCODINGS:
+        try:
+            _ENCODINGS[key] = tiktoken.encoding_for_model(model)
+        except (KeyError, TypeError, ValueError):
+            # Unknown (e.g. non-OpenAI) models get the most common modern encoding
+            _ENCODINGS[key] = tiktoken.get_encoding("cl100k_base")
+    return _ENCODINGS[key]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count (or estimate) the number of tokens in a text
+
+    Uses tiktoken when it is installed; otherwise estimates from the text length.
+
+    Args:
+        text: Text to measure
+        model: Optional model name used to select the tokenizer
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(
+    text: str,
+    max_tokens: int,
+    model: Optional[str] = None,
+    marker: str = "\n... (truncated)",
+) -> str:
+    """
+    Truncate a text to fit in a number of tokens, keeping whole lines where possible
+
+    Args:
+        text: Text to truncate
+        max_tokens: Maximum number of tokens of the result (including the marker)
+        model: Optional model name used to select the tokenizer
+        marker: Text appended when the text was truncated
+
+    Returns:
+        Text of at most max_tokens tokens
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text
+
+    budget = max_tokens - count_tokens(marker, model)
+    if budget <= 0:
+        return ""
+
+    # Binary search the longest prefix that fits, then cut back to a line boundary
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(text[:mid], model) <= budget:
+            low = mid
+        else:
+            high = mid - 1
+
+    prefix = text[:low]
+    line_end = prefix.rfind("\n")
+    if line_end > 0:
+        prefix = prefix[:line_end]
+    return prefix + marker
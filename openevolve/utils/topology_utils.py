@@ -0,0 +1,79 @@
+"""
+Migration topologies connecting the islands of an island model
+"""
+
+import math
+import random
+from typing import List, Tuple
+
+MIGRATION_TOPOLOGIES = ("ring", "torus", "fully_connected", "random_k")
+
+
+def get_ring_neighbors(island_idx: int, num_islands: int) -> List[int]:
+    """
+    Get the islands adjacent to an island in a ring topology
+
+    Args:
+        island_idx: Index of the island
+        num_islands: Total number of islands
+
+    Returns:
+        Sorted list of distinct neighbor indices (empty for a single island)
+    """
+    neighbors = {(island_idx + 1) % num_islands, (island_idx - 1) % num_islands}
+    neighbors.discard(island_idx)
+    return sorted(neighbors)
+
+
+def get_torus_shape(num_islands: int) -> Tuple[int, int]:
+    """
+    Get the grid shape of a torus of islands, as close to square as possible
+
+    Returns:
+        (rows, columns) with rows * columns == num_islands (a prime count gives one row)
+    """
+    rows = max(r for r in range(1, math.isqrt(num_islands) + 1) if num_islands % r == 0)
+    return rows, num_islands // rows
+
+
+def get_migration_targets(
+    island_idx: int, num_islands: int, topology: str = "ring", k: int = 2
+) -> List[int]:
+    """
+    Get the islands an island sends migrants to
+
+    Args:
+        island_idx: Index of the source island
+        num_islands: Total number of islands
+        topology: "ring" (both neighbors), "torus" (four neighbors on a wrapped grid),
+            "fully_connected" (all other islands) or "random_k" (k other islands drawn
+            anew on every call, using the global random generator)
+        k: Number of targets of the random_k topology
+
+    Returns:
+        Sorted list of distinct target indices, never including the source island
+    """
+    if topology == "ring":
+        return get_ring_neighbors(island_idx, num_islands)
+
+    if topology == "torus":
+        rows, cols = get_torus_shape(num_islands)
+        row, col = divmod(island_idx, cols)
+        neighbors = {
+            ((row + 1) % rows) * cols + col,
+            ((row - 1) % rows) * cols + col,
+            row * cols + (col + 1) % cols,
+            row * cols + (col - 1) % cols,
+        }
+        neighbors.discard(island_idx)
+        return sorted(neighbors)
+
+    others = [i for i in range(num_islands) if i != island_idx]
+    if topology == "fully_connected":
+        return others
+    if topology == "random_k":
+        return sorted(random.sample(others, min(k, len(others))))
+
+    raise ValueError(
+        f"Unknown migration topology: {topology} (expected one of {MIGRATION_TOPOLOGIES})"
+    )
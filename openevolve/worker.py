@@ -0,0 +1,182 @@
+"""
+Distributed evaluation worker for OpenEvolve
+
+Run `openevolve-worker evaluator.py --queue path/to/jobs.db` on any machine that can
+reach the controller's job queue file to add evaluation capacity.
+"""
+
+import argparse
+import asyncio
+import copy
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Optional
+
+from openevolve.config import Config, load_config
+from openevolve.evaluator import Evaluator
+from openevolve.job_queue import Job, JobQueue
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command-line arguments"""
+    parser = argparse.ArgumentParser(description="OpenEvolve - Distributed evaluation worker")
+
+    parser.add_argument(
+        "evaluation_file", help="Path to the evaluation file containing an 'evaluate' function"
+    )
+
+    parser.add_argument("--config", "-c", help="Path to configuration file (YAML)", default=None)
+
+    parser.add_argument(
+        "--queue",
+        "-q",
+        help="Path to the job queue database (defaults to evaluator.queue_path from the config)",
+        default=None,
+    )
+
+    parser.add_argument("--worker-id", help="Worker ID (defaults to host-pid)", default=None)
+
+    parser.add_argument(
+        "--max-jobs", help="Exit after evaluating this many jobs", type=int, default=None
+    )
+
+    parser.add_argument(
+        "--log-level",
+        "-l",
+        help="Logging level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
+        default="INFO",
+    )
+
+    return parser.parse_args()
+
+
+class EvaluationWorker:
+    """
+    Pulls evaluation jobs from a job queue and posts their results back
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        evaluation_file: str,
+        queue: JobQueue,
+        worker_id: Optional[str] = None,
+    ):
+        self.config = config.evaluator
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+
+        # The worker evaluates locally; only the controller talks to the queue as a client
+        evaluator_config = copy.deepcopy(config.evaluator)
+        evaluator_config.distributed = False
+        evaluator_config.use_llm_feedback = False
+        self.evaluator = Evaluator(evaluator_config, evaluation_file)
+
+    def _send_heartbeats(self, job: Job, stop: threading.Event) -> None:
+        """Keep the lease of a job alive until stopped"""
+        while not stop.wait(self.config.heartbeat_interval):
+            if not self.queue.heartbeat(job.job_id, self.worker_id):
+                logger.warning(f"Lost the lease on job {job.job_id}; its result may be discarded")
+                return
+
+    def process(self, job: Job) -> bool:
+        """
+        Evaluate one job and post its result
+
+        Args:
+            job: Claimed job
+
+        Returns:
+            True if the result was recorded, False if another worker finished first
+        """
+        logger.info(f"Worker {self.worker_id} evaluating job {job.job_id} (attempt {job.attempts})")
+
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self._send_heartbeats, args=(job, stop), daemon=True)
+        heartbeat.start()
+        try:
+            metrics = asyncio.run(self.evaluator.evaluate_program(job.code, job.program_id))
+            artifacts = self.evaluator.get_pending_artifacts(job.program_id)
+        finally:
+            stop.set()
+            heartbeat.join()
+
+        recorded = self.queue.complete(job.job_id, self.worker_id, metrics, artifacts)
+        if not recorded:
+            logger.info(f"Discarding duplicate result for job {job.job_id}")
+        return recorded
+
+    def run(self, max_jobs: Optional[int] = None) -> int:
+        """
+        Process jobs until interrupted
+
+        Args:
+            max_jobs: Stop after this many jobs (runs forever if None)
+
+        Returns:
+            Number of jobs processed
+        """
+        logger.info(f"Worker {self.worker_id} polling {self.queue.path}")
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                time.sleep(self.config.poll_interval)
+                continue
+
+            self.process(job)
+            processed += 1
+
+        return processed
+
+
+def main() -> int:
+    """
+    Main entry point
+
+    Returns:
+        Exit code
+    """
+    args = parse_args()
+
+    logging.basicConfig(
+        level=getattr(logging, args.log_level),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    if not os.path.exists(args.evaluation_file):
+        print(f"Error: Evaluation file '{args.evaluation_file}' not found")
+        return 1
+
+    config = load_config(args.config)
+    queue_path = args.queue or config.evaluator.queue_path
+    if not queue_path:
+        print("Error: No job queue given (use --queue or evaluator.queue_path)")
+        return 1
+
+    queue = JobQueue(
+        queue_path,
+        lease_timeout=config.evaluator.lease_timeout,
+        max_attempts=config.evaluator.max_job_attempts,
+    )
+    worker = EvaluationWorker(config, args.evaluation_file, queue, args.worker_id)
+
+    try:
+        worker.run(args.max_jobs)
+    except KeyboardInterrupt:
+        print("\nWorker interrupted")
+    finally:
+        queue.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
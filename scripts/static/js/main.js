@@ -119,7 +119,24 @@ if (window.STATIC_DATA) {
             });
     }
     fetchAndRender();
-    setInterval(fetchAndRender, 2000); // Live update every 2s
+    if (window.EventSource) {
+        // The server announces new checkpoints, so the full data is only fetched when it changed
+        const events = new EventSource('/api/events');
+        events.addEventListener('checkpoint', fetchAndRender);
+        events.addEventListener('reset', fetchAndRender);
+        // Programs stream in one by one while a run is going; refresh at most every 2s
+        let pendingFetch = null;
+        events.addEventListener('programs', () => {
+            if (pendingFetch === null) {
+                pendingFetch = setTimeout(() => {
+                    pendingFetch = null;
+                    fetchAndRender();
+                }, 2000);
+            }
+        });
+    } else {
+        setInterval(fetchAndRender, 2000); // Live update every 2s
+    }
 }
 
 export let width = window.innerWidth;
@@ -4,8 +4,20 @@ import glob
 import logging
 import shutil
 import re as _re
-from flask import Flask, render_template, render_template_string, jsonify
-
+import threading
+import time
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    render_template_string,
+    request,
+    stream_with_context,
+)
+
+from openevolve.checkpoint_index import CheckpointIndex
+from openevolve.event_log import EVENT_LOG_FILE, EventLogReader
 
 logger = logging.getLogger("openevolve.visualizer")
 app = Flask(__name__, template_folder="templates")
@@ -20,7 +32,14 @@ def find_latest_checkpoint(base_folder):
     if not checkpoint_folders:
         logger.info(f"No checkpoint folders found in {base_folder}")
         return None
-    checkpoint_folders = [os.path.join(base_folder, folder) for folder in checkpoint_folders]
+    # Skip checkpoints that are still being written
+    checkpoint_folders = [
+        os.path.join(base_folder, folder)
+        for folder in checkpoint_folders
+        if not folder.endswith(".tmp")
+    ]
+    if not checkpoint_folders:
+        return None
     checkpoint_folders.sort(key=lambda x: os.path.getmtime(x), reverse=True)
     logger.debug(f"Found checkpoint folder: {checkpoint_folders[0]}")
     return checkpoint_folders[0]
@@ -29,25 +48,36 @@ def find_latest_checkpoint(base_folder):
 def load_evolution_data(checkpoint_folder):
     meta_path = os.path.join(checkpoint_folder, "metadata.json")
     programs_dir = os.path.join(checkpoint_folder, "programs")
-    if not os.path.exists(meta_path) or not os.path.exists(programs_dir):
-        logger.info(f"Missing metadata.json or programs dir in {checkpoint_folder}")
+    has_index = CheckpointIndex.exists(checkpoint_folder)
+    if not os.path.exists(meta_path) or not (has_index or os.path.exists(programs_dir)):
+        logger.info(f"Missing metadata.json or program data in {checkpoint_folder}")
         return {"archive": [], "nodes": [], "edges": [], "checkpoint_dir": checkpoint_folder}
     with open(meta_path) as f:
         meta = json.load(f)
 
     nodes = []
     id_to_program = {}
-    for island_idx, id_list in enumerate(meta.get("islands", [])):
-        for pid in id_list:
-            prog_path = os.path.join(programs_dir, f"{pid}.json")
-            if os.path.exists(prog_path):
-                with open(prog_path) as pf:
-                    prog = json.load(pf)
-                prog["island"] = island_idx
-                nodes.append(prog)
-                id_to_program[pid] = prog
-            else:
-                logger.debug(f"Program file not found: {prog_path}")
+    if has_index:
+        # Checkpoint index: all programs in one memory-mapped read
+        with CheckpointIndex(checkpoint_folder) as index:
+            islands = index.table["island"].tolist()
+            for island_idx, prog in zip(islands, index.records()):
+                if island_idx >= 0:
+                    prog["island"] = island_idx
+                    nodes.append(prog)
+                    id_to_program[prog["id"]] = prog
+    else:
+        for island_idx, id_list in enumerate(meta.get("islands", [])):
+            for pid in id_list:
+                prog_path = os.path.join(programs_dir, f"{pid}.json")
+                if os.path.exists(prog_path):
+                    with open(prog_path) as pf:
+                        prog = json.load(pf)
+                    prog["island"] = island_idx
+                    nodes.append(prog)
+                    id_to_program[pid] = prog
+                else:
+                    logger.debug(f"Program file not found: {prog_path}")
 
     edges = []
     for prog in nodes:
@@ -61,9 +91,160 @@ def load_evolution_data(checkpoint_folder):
         "nodes": nodes,
         "edges": edges,
         "checkpoint_dir": checkpoint_folder,
+        "last_iteration": meta.get("last_iteration", 0),
     }
 
 
+# Fields of the lightweight node summaries served by the paginated and lineage endpoints
+SUMMARY_FIELDS = ("id", "parent_id", "island", "generation", "iteration_found", "metrics")
+
+# Number of checkpoint deltas kept for server-sent event clients that fall behind
+MAX_DELTAS = 100
+
+
+def summarize(prog):
+    return {key: prog.get(key) for key in SUMMARY_FIELDS}
+
+
+def find_event_log(base_folder, checkpoint_folder):
+    # The event log lives in the run's output directory, next to the checkpoints/ folder
+    if checkpoint_folder:
+        output_dir = os.path.dirname(os.path.dirname(os.path.abspath(checkpoint_folder)))
+        path = os.path.join(output_dir, EVENT_LOG_FILE)
+        if os.path.exists(path):
+            return path
+    # No checkpoint yet: use the most recently updated event log below the base folder
+    paths = glob.glob(f"**/{EVENT_LOG_FILE}", root_dir=base_folder, recursive=True)
+    if not paths:
+        return None
+    paths = [os.path.join(base_folder, path) for path in paths]
+    return max(paths, key=os.path.getmtime)
+
+
+class CheckpointCache:
+    """
+    Evolution data of the latest checkpoint, reloaded only when the checkpoint changes,
+    plus the programs appended to the run's event log since that checkpoint
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.key = None
+        self.version = 0
+        self.data = {"archive": [], "nodes": [], "edges": [], "checkpoint_dir": ""}
+        self.by_id = {}
+        self.children = {}
+        self.live = {}  # Programs from the event log that are not in the checkpoint yet
+        self.reader = None
+        self.deltas = []  # (version, kind, added ids, removed ids), oldest first
+
+    def get(self, base_folder):
+        checkpoint_folder = find_latest_checkpoint(base_folder)
+        key = None
+        if checkpoint_folder:
+            meta_path = os.path.join(checkpoint_folder, "metadata.json")
+            mtime = os.stat(meta_path).st_mtime_ns if os.path.exists(meta_path) else None
+            key = (checkpoint_folder, mtime)
+        event_path = find_event_log(base_folder, checkpoint_folder)
+
+        with self.lock:
+            if key != self.key:
+                self._reload(checkpoint_folder, key)
+            if event_path:
+                self._tail(event_path)
+            return self.data
+
+    def _reload(self, checkpoint_folder, key):
+        if checkpoint_folder:
+            logger.info(f"Loading data from checkpoint: {checkpoint_folder}")
+            data = load_evolution_data(checkpoint_folder)
+        else:
+            data = {"archive": [], "nodes": [], "edges": [], "checkpoint_dir": ""}
+
+        # Live programs are dropped once a checkpoint covers their iteration
+        by_id = {prog["id"]: prog for prog in data["nodes"]}
+        last_iteration = data.get("last_iteration", 0)
+        self.live = {
+            pid: prog
+            for pid, prog in self.live.items()
+            if pid not in by_id and prog.get("iteration_found", 0) > last_iteration
+        }
+        old_ids = self.by_id
+        self.key = key
+        self._set_data(data, list(self.live.values()))
+
+        added = [pid for pid in self.by_id if pid not in old_ids]
+        removed = [pid for pid in old_ids if pid not in self.by_id]
+        self._add_delta("checkpoint", added, removed)
+
+    def _tail(self, event_path):
+        if self.reader is None or self.reader.path != event_path:
+            self.reader = EventLogReader(event_path)
+
+        new_programs = []
+        for event in self.reader.read_new():
+            prog = event.get("program")
+            if event.get("type") != "program" or not prog or prog["id"] in self.by_id:
+                continue
+            prog["island"] = event.get("island") or 0
+            self.live[prog["id"]] = prog
+            new_programs.append(prog)
+
+        if new_programs:
+            self._set_data(self.data, new_programs)
+            self._add_delta("programs", [prog["id"] for prog in new_programs], [])
+
+    def _set_data(self, data, extra_nodes):
+        # Served data is replaced rather than mutated, as responses may still be using it
+        base_ids = {prog["id"] for prog in data["nodes"]}
+        nodes = data["nodes"] + [prog for prog in extra_nodes if prog["id"] not in base_ids]
+        by_id = {prog["id"]: prog for prog in nodes}
+        edges = data["edges"] + [
+            {"source": prog["parent_id"], "target": prog["id"]}
+            for prog in extra_nodes
+            if prog.get("parent_id") in by_id
+        ]
+        children = {}
+        for edge in edges:
+            children.setdefault(edge["source"], []).append(edge["target"])
+        self.data = {**data, "nodes": nodes, "edges": edges}
+        self.by_id, self.children = by_id, children
+
+    def _add_delta(self, kind, added, removed):
+        self.version += 1
+        self.deltas = (self.deltas + [(self.version, kind, added, removed)])[-MAX_DELTAS:]
+
+    def changes_since(self, version):
+        """Merged delta from a version to the current one, or None if it is no longer known"""
+        with self.lock:
+            if version == self.version:
+                return {"version": version, "kind": None, "added": [], "removed": []}
+            if version > self.version or not self.deltas or self.deltas[0][0] > version + 1:
+                return None
+            kind = "programs"
+            added, removed = set(), set()
+            for delta_version, delta_kind, delta_added, delta_removed in self.deltas:
+                if delta_version > version:
+                    if delta_kind == "checkpoint":
+                        kind = "checkpoint"
+                    added = (added - set(delta_removed)) | set(delta_added)
+                    removed = (removed - set(delta_added)) | set(delta_removed)
+            return {
+                "version": self.version,
+                "kind": kind,
+                "checkpoint_dir": self.data["checkpoint_dir"],
+                "added": [summarize(self.by_id[pid]) for pid in added if pid in self.by_id],
+                "removed": sorted(removed),
+            }
+
+
+cache = CheckpointCache()
+
+
+def get_data():
+    return cache.get(os.environ.get("EVOLVE_OUTPUT", "examples/"))
+
+
 @app.route("/")
 def index():
     return render_template("index.html", checkpoint_dir=checkpoint_dir)
@@ -75,26 +256,123 @@ checkpoint_dir = None  # Global variable to store the checkpoint directory
 @app.route("/api/data")
 def data():
     global checkpoint_dir
-    base_folder = os.environ.get("EVOLVE_OUTPUT", "examples/")
-    checkpoint_dir = find_latest_checkpoint(base_folder)
+    data = get_data()
+    checkpoint_dir = data["checkpoint_dir"] or None
     if not checkpoint_dir:
-        logger.info(f"No checkpoints found in {base_folder}")
-        return jsonify({"archive": [], "nodes": [], "edges": [], "checkpoint_dir": ""})
-
-    logger.info(f"Loading data from checkpoint: {checkpoint_dir}")
-    data = load_evolution_data(checkpoint_dir)
-    logger.debug(f"Data: {data}")
+        logger.info(f"No checkpoints found in {os.environ.get('EVOLVE_OUTPUT', 'examples/')}")
     return jsonify(data)
 
 
+@app.route("/api/nodes")
+def nodes():
+    # Paginated node summaries, optionally sorted by a metric (best first)
+    data = get_data()
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 1000)
+    metric = request.args.get("sort")
+
+    node_list = data["nodes"]
+    if metric:
+        node_list = sorted(
+            node_list,
+            key=lambda prog: (prog.get("metrics") or {}).get(metric, float("-inf")),
+            reverse=True,
+        )
+    return jsonify(
+        {
+            "total": len(node_list),
+            "offset": offset,
+            "limit": limit,
+            "checkpoint_dir": data["checkpoint_dir"],
+            "nodes": [summarize(prog) for prog in node_list[offset : offset + limit]],
+        }
+    )
+
+
+@app.route("/api/program/<program_id>")
+def program_data(program_id):
+    get_data()
+    prog = cache.by_id.get(program_id)
+    if prog is None:
+        return jsonify({"error": f"Program {program_id} not found"}), 404
+    return jsonify(prog)
+
+
+@app.route("/api/lineage/<program_id>")
+def lineage(program_id):
+    # Ancestors up to the root plus descendants up to `depth` generations below the program
+    get_data()
+    by_id, children = cache.by_id, cache.children
+    if program_id not in by_id:
+        return jsonify({"error": f"Program {program_id} not found"}), 404
+    depth = max(request.args.get("depth", 2, type=int), 0)
+
+    ids = [program_id]
+    current = by_id[program_id].get("parent_id")
+    while current in by_id and current not in ids:
+        ids.append(current)
+        current = by_id[current].get("parent_id")
+
+    frontier = [program_id]
+    for _ in range(depth):
+        frontier = [child for pid in frontier for child in children.get(pid, [])]
+        ids.extend(frontier)
+
+    included = set(ids)
+    return jsonify(
+        {
+            "nodes": [summarize(by_id[pid]) for pid in ids],
+            "edges": [
+                {"source": by_id[pid]["parent_id"], "target": pid}
+                for pid in ids
+                if by_id[pid].get("parent_id") in included
+            ],
+        }
+    )
+
+
+@app.route("/api/events")
+def events():
+    # Server-sent events with the added and removed nodes: "checkpoint" when a new checkpoint
+    # was loaded, "programs" when programs were appended to the event log, or "reset" if the
+    # client fell too far behind
+    base_folder = os.environ.get("EVOLVE_OUTPUT", "examples/")
+    poll_interval = float(os.environ.get("EVOLVE_POLL_INTERVAL", "1.0"))
+    last_version = request.headers.get("Last-Event-ID", type=int)
+
+    def stream():
+        version = last_version
+        while True:
+            cache.get(base_folder)
+            if version is None:
+                version = cache.version
+                yield f"event: hello\nid: {version}\ndata: {json.dumps({'version': version})}\n\n"
+            delta = cache.changes_since(version)
+            if delta is None:
+                version = cache.version
+                yield f"event: reset\nid: {version}\ndata: {json.dumps({'version': version})}\n\n"
+            elif delta["version"] != version:
+                version = delta["version"]
+                yield f"event: {delta['kind']}\nid: {version}\ndata: {json.dumps(delta)}\n\n"
+            time.sleep(poll_interval)
+
+    return Response(
+        stream_with_context(stream()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
 @app.route("/program/<program_id>")
 def program_page(program_id):
     global checkpoint_dir
+    checkpoint_dir = get_data()["checkpoint_dir"] or None
     if checkpoint_dir is None:
         return "No checkpoint loaded", 500
 
-    data = load_evolution_data(checkpoint_dir)
-    program_data = next((p for p in data["nodes"] if p["id"] == program_id), None)
+    program_data = cache.by_id.get(program_id)
+    if program_data is None:
+        return f"Program {program_id} not found", 404
     program_data = {"code": "", "prompts": {}, **program_data}
 
     return render_template(
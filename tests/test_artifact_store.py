@@ -0,0 +1,219 @@
+"""
+Tests for the content-addressed artifact store
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from openevolve.artifact_store import (
+    ArtifactCache,
+    ArtifactStore,
+    compress,
+    decompress,
+    read_text_prefix,
+)
+from openevolve.config import DatabaseConfig, PromptConfig
+from openevolve.database import Program, ProgramDatabase
+from openevolve.prompt.sampler import PromptSampler
+
+
+class TestArtifactStore(unittest.TestCase):
+    """Tests for ArtifactStore"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.store = ArtifactStore(os.path.join(self.test_dir, "artifacts"))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_round_trip_and_deduplication(self):
+        """Test that identical content is stored once and read back per program"""
+        traceback = "Traceback (most recent call last):\n" * 1000
+        first = self.store.put("a", {"stderr": traceback, "blob": b"\x00\xff"})
+        size = self.store.total_size()
+        second = self.store.put("b", {"stderr": traceback})
+
+        self.assertGreater(first, 0)
+        self.assertEqual(second, 0)
+        self.assertEqual(self.store.total_size(), size)
+        self.assertLess(size, len(traceback))
+        self.assertEqual(self.store.get("a"), {"stderr": traceback, "blob": b"\x00\xff"})
+        self.assertEqual(self.store.get("b"), {"stderr": traceback})
+        self.assertEqual(decompress(compress(b"data")), b"data")
+
+    def test_garbage_collection(self):
+        """Test that expired manifests and unreferenced blobs are deleted"""
+        self.store.put("live", {"stderr": "shared"})
+        self.store.put("old", {"stderr": "shared", "stdout": "only old"})
+        self.store.put("recent", {"stdout": "only recent"})
+        past = time.time() - 2 * 86400
+        os.utime(os.path.join(self.store.path, "manifests", "old.json"), (past, past))
+        time.sleep(0.01)
+
+        deleted = self.store.collect_garbage(["live"], retention_days=1)
+
+        self.assertEqual(deleted, (1, 1))
+        self.assertFalse(self.store.has("old"))
+        self.assertEqual(self.store.get("live"), {"stderr": "shared"})
+        self.assertEqual(self.store.get("recent"), {"stdout": "only recent"})
+
+    def test_partial_read(self):
+        """Test that a length-limited read decompresses only the needed prefix"""
+        log = "é" + "log line\n" * 100000
+        self.store.put("a", {"log": log, "short": "ok"})
+
+        artifacts = self.store.get("a", max_length=100)
+
+        self.assertEqual(artifacts["log"], log[:101])
+        self.assertEqual(artifacts["short"], "ok")
+
+    def test_read_text_prefix(self):
+        """Test that prefixes hold whole characters without reading ahead"""
+        stream = io.BytesIO("ééé abc".encode("utf-8"))
+        self.assertEqual(read_text_prefix(stream, 3).decode("utf-8"), "ééé")
+        self.assertEqual(stream.tell(), 6)
+
+
+class TestArtifactCache(unittest.TestCase):
+    """Tests for ArtifactCache"""
+
+    def test_lru_eviction_by_size(self):
+        """Test that the least recently used entries are evicted to stay within budget"""
+        cache = ArtifactCache(max_bytes=10)
+        cache.put("a", {"x": "aaaa"})
+        cache.put("b", {"x": "bbbb"})
+        cache.get("a")
+        cache.put("c", {"x": "cccc"})
+
+        self.assertEqual(cache.get("a"), {"x": "aaaa"})
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNone(cache.get("a", max_length=2))
+        self.assertEqual(cache.size, 8)
+
+        cache.put("d", {"x": "d" * 11})
+        self.assertIsNone(cache.get("d"))
+        self.assertEqual(len(cache), 2)
+
+
+class TestDatabaseArtifactStore(unittest.TestCase):
+    """Tests for the database's use of the artifact store"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.database = ProgramDatabase(
+            DatabaseConfig(db_path=self.test_dir, cleanup_old_artifacts=False)
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_large_artifacts_deduplicated(self):
+        """Test that programs with the same large artifact share one blob"""
+        stderr = "error line\n" * 5000
+        for i in range(3):
+            self.database.add(Program(id=f"p{i}", code=f"x = {i}"))
+            self.database.store_artifacts(f"p{i}", {"stderr": stderr})
+
+        store = self.database._get_artifact_store()
+        blobs = [
+            name for _, _, names in os.walk(os.path.join(store.path, "blobs")) for name in names
+        ]
+        self.assertEqual(len(blobs), 1)
+        self.assertEqual(self.database.get_artifacts("p2"), {"stderr": stderr})
+
+    def test_max_bytes(self):
+        """Test that artifacts over the storage limit are truncated or dropped"""
+        self.database.add(Program(id="p", code="x = 1"))
+        artifacts = {"stdout": "ok", "stderr": "e" * 1000, "core": b"\x00" * 1000}
+
+        self.database.store_artifacts("p", artifacts, max_bytes=500)
+
+        stored = self.database.get_artifacts("p")
+        self.assertEqual(list(stored), ["stdout", "stderr"])
+        self.assertEqual(stored["stdout"], "ok")
+        self.assertTrue(stored["stderr"].endswith("(truncated)"))
+        self.assertLessEqual(len(stored["stderr"]), 498)
+
+    def test_render_ready_artifacts_cached(self):
+        """Test that truncated artifacts are read once and then served from the cache"""
+        stderr = "error line\n" * 5000
+        self.database.add(Program(id="p", code="x = 1"))
+        self.database.store_artifacts("p", {"stderr": stderr, "stdout": "done"})
+        store = self.database._get_artifact_store()
+
+        with patch.object(store, "get", wraps=store.get) as mock_get:
+            first = self.database.get_artifacts("p", max_length=100)
+            second = self.database.get_artifacts("p", max_length=100)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first["stderr"], stderr[:100] + "\n... (truncated)")
+        self.assertEqual(first["stdout"], "done")
+
+        # Storing new artifacts invalidates the cached ones
+        self.database.store_artifacts("p", {"stdout": "again"})
+        self.assertEqual(self.database.get_artifacts("p", max_length=100)["stdout"], "again")
+
+    def test_secret_crossing_the_limit_redacted(self):
+        """Test that a token cut by the artifact limit is filtered before truncation"""
+        token = "A1b2C3d4E5f6G7h8I9j0K1l2M3n4O5p6Q7r8"
+        sampler = PromptSampler(PromptConfig(max_artifact_bytes=50))
+
+        rendered = sampler._render_artifacts({"stderr": "x" * 30 + " " + token})
+        self.assertIn("<REDACTED_TOKEN>", rendered)
+        self.assertNotIn(token[:19], rendered)
+
+        # Large artifacts are read from disk only as far as the sampler asks
+        self.database.add(Program(id="p", code="x = 1"))
+        self.database.store_artifacts("p", {"stderr": "x" * 30 + " " + token + "\n" * 40000})
+        artifacts = self.database.get_artifacts("p", max_length=sampler.artifact_read_length())
+        rendered = sampler._render_artifacts(artifacts)
+        self.assertIn("<REDACTED_TOKEN>", rendered)
+        self.assertNotIn(token[:19], rendered)
+
+    def test_legacy_artifact_dir(self):
+        """Test that artifacts written as loose files by older versions are still read"""
+        legacy_dir = os.path.join(self.test_dir, "artifacts", "old")
+        os.makedirs(legacy_dir)
+        with open(os.path.join(legacy_dir, "large_log"), "w") as f:
+            f.write("legacy")
+        self.database.add(Program(id="old", code="x = 1", artifact_dir=legacy_dir))
+
+        self.assertEqual(self.database.get_artifacts("old"), {"large_log": "legacy"})
+
+    def test_gc_sees_live_program_ids(self):
+        """Test that garbage collection gets a snapshot of the programs still in the database"""
+        database = ProgramDatabase(
+            DatabaseConfig(db_path=self.test_dir, artifact_gc_interval=3600.0)
+        )
+        stderr = "error line\n" * 5000
+        for i in range(3):
+            database.add(Program(id=f"p{i}", code=f"x = {i}"))
+            database.store_artifacts(f"p{i}", {"stderr": stderr + str(i)})
+        store = database._get_artifact_store()
+        try:
+            self.assertIsNotNone(store._gc_thread)
+            database._remove_program("p0")
+
+            live_ids = database._snapshot_live_program_ids()
+            database.add(Program(id="p3", code="x = 3"))
+            self.assertEqual(live_ids, {"p1", "p2"})
+
+            for program_id in ("p0", "p1"):
+                old = time.time() - 10
+                os.utime(store._manifest_path(program_id), (old, old))
+            self.assertEqual(store.collect_garbage(live_ids, retention_days=0), (1, 1))
+            self.assertFalse(store.has("p0"))
+            self.assertEqual(database.get_artifacts("p1"), {"stderr": stderr + "1"})
+        finally:
+            store.stop_gc()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Tests for bandit-driven adaptive selection
+"""
+
+import random
+import unittest
+
+from openevolve.config import DatabaseConfig
+from openevolve.database import SAMPLING_STRATEGIES, Program, ProgramDatabase
+from openevolve.utils.bandit_utils import Bandit
+
+
+class TestBandit(unittest.TestCase):
+    """Tests for Bandit"""
+
+    def _run(self, policy, payoffs, costs=None, pulls=500):
+        random.seed(0)
+        bandit = Bandit(len(payoffs), policy=policy, exploration=0.5)
+        counts = [0] * len(payoffs)
+        for _ in range(pulls):
+            arm = bandit.select()
+            counts[arm] += 1
+            reward = 0.1 if random.random() < payoffs[arm] else 0.0
+            bandit.update(arm, reward, costs[arm] if costs else 1.0)
+        return counts
+
+    def test_policies_favor_best_arm(self):
+        """Test that both policies pull the most rewarding arm most often"""
+        for policy in ("ucb", "thompson"):
+            counts = self._run(policy, [0.1, 0.6, 0.2])
+            self.assertEqual(counts.index(max(counts)), 1, policy)
+
+    def test_reward_per_cost(self):
+        """Test that an equally rewarding but cheaper arm is preferred"""
+        counts = self._run("ucb", [0.5, 0.5], costs=[10.0, 1.0])
+        self.assertGreater(counts[1], counts[0])
+
+    def test_state_round_trip(self):
+        """Test that arm statistics survive serialization"""
+        bandit = Bandit(2)
+        bandit.update(1, 0.5, 2.0)
+        restored = Bandit(2)
+        restored.load_dict(bandit.to_dict())
+        self.assertEqual(restored.to_dict(), bandit.to_dict())
+
+        with self.assertRaises(ValueError):
+            Bandit(2, policy="greedy")
+
+
+class TestAdaptiveSelection(unittest.TestCase):
+    """Tests for adaptive selection in the database"""
+
+    def test_strategy_and_island_credited(self):
+        """Test that improvements credit the sampled strategy and the child's island"""
+        config = DatabaseConfig(adaptive_selection=True, num_islands=2)
+        database = ProgramDatabase(config)
+        parent = Program(id="parent", code="x = 1", metrics={"combined_score": 0.2})
+        database.add(parent)
+
+        sampled, _ = database.sample()
+        strategy = database.last_strategy
+        self.assertIn(SAMPLING_STRATEGIES[strategy], SAMPLING_STRATEGIES)
+
+        child = Program(id="child", code="x = 2", metrics={"combined_score": 0.5})
+        database.add(child, target_island=1)
+        improvement = database.record_outcome(sampled, child, cost=2.0)
+
+        self.assertAlmostEqual(improvement, 0.3)
+        self.assertEqual(database.strategy_bandit.successes[strategy], 1.0)
+        self.assertAlmostEqual(database.island_bandit.rewards[1], 0.3)
+        self.assertEqual(database.island_bandit.pulls[0], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
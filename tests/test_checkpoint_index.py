@@ -0,0 +1,89 @@
+"""
+Tests for the memory-mapped checkpoint index
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from openevolve.checkpoint_index import CheckpointIndex
+from openevolve.config import Config
+from openevolve.database import Program, ProgramDatabase
+
+
+class TestCheckpointIndex(unittest.TestCase):
+    """Tests for saving and loading databases through the checkpoint index"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "checkpoint")
+        self.config = Config()
+        self.config.database.num_islands = 2
+        self.database = ProgramDatabase(self.config.database)
+        self.database.add(
+            Program(id="root", code="def f():\n    return 1\n", metrics={"score": 0.2})
+        )
+        self.database.add(
+            Program(
+                id="child",
+                code="def f():\n    return 2\n",
+                parent_id="root",
+                generation=1,
+                metrics={"score": 0.4, "speed": 3, "note": "fast"},
+            ),
+            target_island=1,
+        )
+        self.database.find_duplicate("x = 1")  # Sketch all programs
+        self.database.save(self.path, iteration=7)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index_columns(self):
+        """Test that the index exposes program columns without parsing records"""
+        with CheckpointIndex(self.path) as index:
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.ids(), ["root", "child"])
+            self.assertEqual(index.metric_names, ["score", "speed"])
+            self.assertEqual(index.metrics(0), {"score": 0.2})
+            self.assertEqual(index.metrics(1), {"score": 0.4, "speed": 3.0})
+            self.assertEqual(index.table["parent_id"][1], b"root")
+            self.assertEqual(list(index.table["island"]), [0, 1])
+            self.assertEqual(index.record(1)["metrics"]["note"], "fast")
+            self.assertEqual(index.record(1)["code"], "def f():\n    return 2\n")
+            self.assertEqual([record["id"] for record in index.records()], ["root", "child"])
+
+    def test_load_restores_programs_and_sketches(self):
+        """Test that loading restores programs and reuses the stored sketches"""
+        loaded = ProgramDatabase(self.config.database)
+        with patch("openevolve.database.compute_minhash") as mock_minhash:
+            loaded.load(self.path)
+            mock_minhash.assert_not_called()
+
+        self.assertEqual(set(loaded.programs), {"root", "child"})
+        self.assertEqual(loaded.get("child").parent_id, "root")
+        self.assertEqual(loaded.last_iteration, 7)
+
+        with patch("openevolve.database.compute_minhash") as mock_minhash:
+            self.assertEqual(loaded.find_duplicate("def f():\n    return 2\n").id, "child")
+            mock_minhash.assert_not_called()
+        np.testing.assert_array_equal(loaded.sketches["root"], self.database.sketches["root"])
+
+    def test_load_individual_program_files(self):
+        """Test that program files outside the index (older checkpoints) are still loaded"""
+        programs_dir = os.path.join(self.path, "programs")
+        os.makedirs(programs_dir)
+        with open(os.path.join(programs_dir, "extra.json"), "w") as f:
+            json.dump(Program(id="extra", code="x = 3").to_dict(), f)
+
+        loaded = ProgramDatabase(self.config.database)
+        loaded.load(self.path)
+        self.assertEqual(set(loaded.programs), {"root", "child", "extra"})
+
+
+if __name__ == "__main__":
+    unittest.main()
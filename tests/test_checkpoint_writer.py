@@ -0,0 +1,83 @@
+"""
+Tests for database snapshots and the background checkpoint writer
+"""
+
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from openevolve.checkpoint_index import CheckpointIndex
+from openevolve.checkpoint_writer import CheckpointWriter
+from openevolve.config import Config
+from openevolve.database import Program, ProgramDatabase
+
+
+class TestCheckpointWriter(unittest.TestCase):
+    """Tests for snapshotting and writing checkpoints in the background"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        config = Config()
+        config.database.in_memory = True
+        self.database = ProgramDatabase(config.database)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_snapshot_is_isolated(self):
+        """Test that changes after a snapshot do not leak into the written checkpoint"""
+        program = Program(id="p1", code="x = 1", metrics={"score": 0.5})
+        self.database.add(program)
+
+        snapshot = self.database.snapshot(iteration=3)
+        program.metadata["note"] = "changed"
+        self.database.add(Program(id="p2", code="x = 2", metrics={"score": 0.6}))
+
+        path = os.path.join(self.temp_dir.name, "checkpoint")
+        snapshot.write(path, fsync=True)
+
+        with CheckpointIndex(path) as index:
+            self.assertEqual(index.ids(), ["p1"])
+            self.assertNotIn("note", index.record(0)["metadata"])
+        with open(os.path.join(path, "metadata.json")) as f:
+            self.assertEqual(json.load(f)["last_iteration"], 3)
+
+        loaded = ProgramDatabase(Config().database)
+        loaded.load(path)
+        self.assertEqual(loaded.get("p1").code, "x = 1")
+
+    def test_backpressure_and_errors(self):
+        """Test that a second write waits for the first and failures are reported"""
+        writer = CheckpointWriter(max_pending=1)
+        release = threading.Event()
+        order = []
+
+        writer.submit(lambda: (release.wait(5), order.append(1)))
+        submitted = threading.Event()
+
+        def submit_second():
+            writer.submit(lambda: order.append(2))
+            submitted.set()
+
+        thread = threading.Thread(target=submit_second)
+        thread.start()
+        self.assertFalse(submitted.wait(0.1))
+
+        release.set()
+        thread.join(5)
+        writer.flush()
+        self.assertEqual(order, [1, 2])
+
+        def fail():
+            raise OSError("disk full")
+
+        writer.submit(fail)
+        with self.assertRaises(RuntimeError):
+            writer.flush()
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,19 @@
 Tests for code utilities in openevolve.utils.code_utils
 """
 
+import random
 import unittest
-from openevolve.utils.code_utils import apply_diff, extract_diffs
+from openevolve.utils.code_utils import (
+    _apply_diff_block,
+    _build_line_index,
+    apply_diff,
+    apply_diff_to_evolve_blocks,
+    apply_diff_with_report,
+    build_evolve_block_view,
+    extract_diffs,
+    find_closest_region,
+    normalize_code,
+)
 
 
 class TestCodeUtils(unittest.TestCase):
@@ -88,6 +99,138 @@ class TestCodeUtils(unittest.TestCase):
             expected_code,
         )
 
+    def test_normalize_code(self):
+        """Test that reformatting and comments do not change normalized code"""
+        original = "def f(x):\n    return x + 1\n"
+        reformatted = "# helper\ndef f( x ):\n\n    return (x + 1)  # add one\n"
+        self.assertEqual(normalize_code(original), normalize_code(reformatted))
+        self.assertNotEqual(normalize_code(original), normalize_code(original.replace("1", "2")))
+
+        # Code that does not parse falls back to comment and whitespace stripping
+        self.assertEqual(
+            normalize_code("int main() {  // entry\n  return 0;\n}", "cpp"),
+            "int main() {\nreturn 0;\n}",
+        )
+
+    def test_apply_diff_whitespace_insensitive(self):
+        """Test that SEARCH blocks with wrong indentation still match and are reindented"""
+        original_code = "class A:\n    def f(self):\n        x = 1\n        return x\n"
+        diff_text = (
+            "<<<<<<< SEARCH\n"
+            "def f(self):\n    x = 1\n"
+            "=======\n"
+            "def f(self):\n    x = 2\n"
+            ">>>>>>> REPLACE"
+        )
+
+        result, failed = apply_diff_with_report(original_code, diff_text)
+        self.assertEqual(failed, [])
+        self.assertEqual(result, original_code.replace("x = 1", "x = 2"))
+
+    def test_apply_diff_fuzzy_and_failed_blocks(self):
+        """Test fuzzy matching above the threshold and reporting of unmatched blocks"""
+        original_code = "def total(values):\n    result = 0\n    for v in values:\n        result += v\n    return result\n"
+        fuzzy_block = (
+            "<<<<<<< SEARCH\n"
+            "    result = 0\n    for v in values:\n        result += v  # accumulate\n"
+            "=======\n"
+            "    result = sum(values)\n"
+            ">>>>>>> REPLACE"
+        )
+        missing_block = (
+            "<<<<<<< SEARCH\n"
+            "print('unrelated')\n"
+            "=======\n"
+            "print('changed')\n"
+            ">>>>>>> REPLACE"
+        )
+        diff_text = fuzzy_block + "\n" + missing_block
+
+        result, failed = apply_diff_with_report(original_code, diff_text)
+        self.assertEqual(result, original_code)
+        self.assertEqual(len(failed), 2)
+
+        result, failed = apply_diff_with_report(original_code, diff_text, fuzzy_threshold=0.8)
+        self.assertEqual(
+            result, "def total(values):\n    result = sum(values)\n    return result\n"
+        )
+        self.assertEqual(failed, [("print('unrelated')", "print('changed')")])
+
+    def test_apply_diff_repeated_search_text(self):
+        """Test that identical SEARCH blocks replace successive occurrences"""
+        original_code = "x = 1\ny = 2\nx = 1\n"
+        block = "<<<<<<< SEARCH\nx = 1\n=======\nx = {}\n>>>>>>> REPLACE"
+        diff_text = block.format(3) + "\n" + block.format(4)
+
+        self.assertEqual(apply_diff(original_code, diff_text), "x = 3\ny = 2\nx = 4\n")
+
+    def test_line_index_updated_incrementally(self):
+        """Test that the line index stays equal to a rebuilt one through many edits"""
+        rng = random.Random(0)
+        lines = [f"x{rng.randrange(10)} = {rng.randrange(3)}" for _ in range(60)]
+        index = _build_line_index(lines)
+        for _ in range(200):
+            start = rng.randrange(len(lines))
+            search_text = "\n".join(lines[start : start + rng.randint(1, 3)])
+            replace_text = "\n".join(
+                f"  x{rng.randrange(10)} = {rng.randrange(3)}" for _ in range(rng.randint(0, 4))
+            )
+            self.assertTrue(_apply_diff_block(lines, index, search_text, replace_text, 1.0))
+            self.assertEqual(index, _build_line_index(lines))
+            if len(lines) < 20:
+                lines.extend(f"y{i} = 0" for i in range(20))
+                index = _build_line_index(lines)
+
+    def test_find_closest_region(self):
+        """Test locating the code a non-matching SEARCH block refers to"""
+        code = "\n".join(f"line_{i} = {i}" for i in range(20))
+
+        region = find_closest_region(code, "line_10 = 10\nline_11 = 99", context_lines=1)
+        self.assertEqual(region, "line_9 = 9\nline_10 = 10\nline_11 = 11\nline_12 = 12")
+
+        region = find_closest_region(code, "line_15 = 16", context_lines=0)
+        self.assertEqual(region, "line_15 = 15")
+
+        self.assertIsNone(find_closest_region(code, ""))
+
+    def test_evolve_block_scoping(self):
+        """Test the signature-only view and applying diffs only inside evolve blocks"""
+        original_code = (
+            "import math\n"
+            "\n"
+            "def helper(x):\n"
+            "    y = x + 1\n"
+            "    return y\n"
+            "\n"
+            "# EVOLVE-BLOCK-START\n"
+            "def solve(n):\n"
+            "    return helper(n)\n"
+            "# EVOLVE-BLOCK-END\n"
+        )
+
+        self.assertEqual(
+            build_evolve_block_view(original_code),
+            "import math\n"
+            "\n"
+            "def helper(x):\n"
+            "    # ... (2 lines omitted)\n"
+            "\n"
+            "# EVOLVE-BLOCK-START\n"
+            "def solve(n):\n"
+            "    return helper(n)\n"
+            "# EVOLVE-BLOCK-END\n",
+        )
+        self.assertEqual(build_evolve_block_view("x = 1\n"), "x = 1\n")
+
+        diff_text = (
+            "<<<<<<< SEARCH\n    return helper(n)\n=======\n    return 2 * helper(n)\n"
+            ">>>>>>> REPLACE\n"
+            "<<<<<<< SEARCH\n    y = x + 1\n=======\n    y = x\n>>>>>>> REPLACE"
+        )
+        result, failed = apply_diff_to_evolve_blocks(original_code, diff_text)
+        self.assertEqual(result, original_code.replace("return helper", "return 2 * helper"))
+        self.assertEqual(failed, [("    y = x + 1", "    y = x")])
+
 
 if __name__ == "__main__":
     unittest.main()
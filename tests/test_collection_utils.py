@@ -0,0 +1,166 @@
+"""
+Tests for the collections used for parent sampling
+"""
+
+import random
+import unittest
+
+from openevolve.config import DatabaseConfig
+from openevolve.database import Program, ProgramDatabase
+from openevolve.utils.collection_utils import IndexedSet, RankedSet, WeightedIndexedSet
+
+
+class TestIndexedSet(unittest.TestCase):
+    """Tests for IndexedSet"""
+
+    def test_matches_set_semantics(self):
+        """Test that random adds and removals keep the set and its index consistent"""
+        rng = random.Random(0)
+        indexed = IndexedSet()
+        reference = set()
+        for _ in range(2000):
+            item = rng.randrange(50)
+            if rng.random() < 0.5:
+                indexed.add(item)
+                reference.add(item)
+            else:
+                indexed.discard(item)
+                reference.discard(item)
+            self.assertEqual(len(indexed), len(reference))
+
+        self.assertEqual(indexed, reference)
+        self.assertEqual(sorted(indexed[i] for i in range(len(indexed))), sorted(reference))
+        self.assertIn(indexed.choice(), reference)
+
+        with self.assertRaises(KeyError):
+            indexed.remove(1000)
+        with self.assertRaises(IndexError):
+            IndexedSet().choice()
+
+
+class TestWeightedIndexedSet(unittest.TestCase):
+    """Tests for WeightedIndexedSet"""
+
+    def test_tree_stays_consistent(self):
+        """Test that prefix sums match the weights after adds, removals and reweights"""
+        rng = random.Random(1)
+        weighted = WeightedIndexedSet()
+        reference = {}
+        for _ in range(1000):
+            item = rng.randrange(40)
+            action = rng.random()
+            if action < 0.5:
+                weight = rng.random()
+                weighted.add(item, weight)
+                reference[item] = weight
+            elif action < 0.8:
+                weighted.discard(item)
+                reference.pop(item, None)
+            elif item in reference:
+                reference[item] = rng.random()
+                weighted.set_weight(item, reference[item])
+
+        self.assertEqual(set(weighted), set(reference))
+        self.assertAlmostEqual(weighted.total_weight, sum(reference.values()))
+        for position in range(len(weighted)):
+            expected = sum(reference[weighted[i]] for i in range(position))
+            self.assertAlmostEqual(weighted._prefix_sum(position), expected)
+
+    def test_weighted_choice_distribution(self):
+        """Test that items are chosen in proportion to their weights"""
+        random.seed(0)
+        weighted = WeightedIndexedSet([("a", 1.0), ("b", 3.0), ("c", 0.0)])
+        counts = {"a": 0, "b": 0, "c": 0}
+        for _ in range(4000):
+            counts[weighted.weighted_choice()] += 1
+
+        self.assertEqual(counts["c"], 0)
+        self.assertAlmostEqual(counts["b"] / 4000, 0.75, delta=0.03)
+
+
+class TestRankedSet(unittest.TestCase):
+    """Tests for RankedSet"""
+
+    def test_rank_order_and_choice(self):
+        """Test that items are ordered by key and chosen in proportion to their rank"""
+        random.seed(0)
+        ranked = RankedSet()
+        for item, key in [("low", 0.1), ("high", 0.9), ("mid", 0.5), ("gone", 0.7)]:
+            ranked.add(item, key)
+        ranked.discard("gone")
+
+        self.assertEqual([ranked[i] for i in range(len(ranked))], ["low", "mid", "high"])
+        counts = {"low": 0, "mid": 0, "high": 0}
+        for _ in range(6000):
+            counts[ranked.linear_rank_choice()] += 1
+        self.assertAlmostEqual(counts["high"] / 6000, 3 / 6, delta=0.03)
+        self.assertAlmostEqual(counts["low"] / 6000, 1 / 6, delta=0.03)
+
+
+class TestDatabaseSamplingIndexes(unittest.TestCase):
+    """Tests for the database's sampling indexes"""
+
+    def test_indexes_follow_population(self):
+        """Test that program, island and archive indexes stay in sync with the database"""
+        config = DatabaseConfig(num_islands=2, archive_size=3, population_size=6)
+        database = ProgramDatabase(config)
+        for i in range(10):
+            program = Program(id=f"p{i}", code=f"x = {i}", metrics={"score": i / 10})
+            database.add(program, target_island=i % 2)
+
+        self.assertEqual(set(database.program_ids), set(database.programs))
+        self.assertEqual(
+            set(database.island_archives[0]) | set(database.island_archives[1]),
+            set(database.archive),
+        )
+        for island, island_archive in enumerate(database.island_archives):
+            for program_id in island_archive:
+                self.assertEqual(database.programs[program_id].metadata["island"], island)
+
+        database.current_island = 1
+        for _ in range(20):
+            parent = database._sample_exploitation_parent()
+            self.assertIn(parent.id, database.island_archives[1])
+            self.assertIn(database._sample_random_parent().id, database.programs)
+
+    def test_parent_selection_strategies(self):
+        """Test that every parent selection favors fitter programs on the island"""
+        for selection in ("tournament", "rank", "fitness_proportionate", "boltzmann"):
+            random.seed(0)
+            config = DatabaseConfig(num_islands=1, parent_selection=selection)
+            database = ProgramDatabase(config)
+            for i in range(10):
+                database.add(Program(id=f"p{i}", code=f"x = {i}", metrics={"score": i / 10}))
+            database.add(Program(id="gone", code="x = -1", metrics={"score": 1.0}))
+            database._remove_from_islands("gone")
+
+            picks = [database._select_from_island(0) for _ in range(500)]
+            self.assertNotIn("gone", picks, selection)
+            top_half = sum(int(pid[1:]) >= 5 for pid in picks)
+            self.assertGreater(top_half, 300, selection)
+
+        with self.assertRaises(ValueError):
+            ProgramDatabase(DatabaseConfig(parent_selection="roulette"))
+
+    def test_boltzmann_independent_of_fitness_offset(self):
+        """Test that Boltzmann selection favors the best program whatever the fitness scale"""
+        for offset in (-100.0, 0.0, 100.0, 10000.0):
+            random.seed(0)
+            database = ProgramDatabase(DatabaseConfig(num_islands=1, parent_selection="boltzmann"))
+            database.add(Program(id="low", code="x = -1", metrics={"combined_score": -1e6}))
+            for i in range(5):
+                metrics = {"combined_score": offset + i}
+                database.add(Program(id=f"p{i}", code=f"x = {i}", metrics=metrics))
+
+            picks = [database._select_from_island(0) for _ in range(2000)]
+            self.assertGreater(picks.count("p4"), 1990, offset)
+
+            # Once the best programs are gone, the next best takes over
+            for i in (4, 3, 2):
+                database._remove_from_islands(f"p{i}")
+            picks = [database._select_from_island(0) for _ in range(2000)]
+            self.assertGreater(picks.count("p1"), 1990, offset)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,9 +2,12 @@
 Tests for ProgramDatabase in openevolve.database
 """
 
+import tempfile
 import unittest
+
 from openevolve.config import Config
 from openevolve.database import Program, ProgramDatabase
+from openevolve.utils.topology_utils import get_migration_targets, get_ring_neighbors
 
 
 class TestProgramDatabase(unittest.TestCase):
@@ -80,6 +83,208 @@ class TestProgramDatabase(unittest.TestCase):
         self.assertIsNotNone(parent)
         self.assertIn(parent.id, ["test1", "test2"])
 
+    def test_find_nearest_programs(self):
+        """Test nearest-neighbor queries answered from sketches"""
+        base = Program(id="base", code="def f(x):\n    return x * 2 + 1\n", metrics={"score": 0.5})
+        close = Program(
+            id="close", code="def f(x):\n    return x * 2 + 3\n", metrics={"score": 0.5}
+        )
+        far = Program(id="far", code="import os\nprint(os.listdir('.'))\n", metrics={"score": 0.5})
+
+        for program in (base, close, far):
+            self.db.add(program)
+
+        nearest = self.db.find_nearest_programs(base, n=2)
+        self.assertEqual([p.id for p in nearest], ["close", "far"])
+        self.assertIn("base", self.db.sketches)
+
+    def test_island_diversity_metrics(self):
+        """Test that sketch-based island diversity tracks the exact edit distance"""
+        programs = [
+            Program(id=f"p{i}", code=f"def f{i}(x):\n    return x + {i}\n" * (i + 1))
+            for i in range(4)
+        ]
+        for program in programs:
+            self.db.add(program)
+
+        approximate = self.db._calculate_island_diversity(programs)
+        self.db.config.diversity_metric = "edit_distance"
+        exact = self.db._calculate_island_diversity(programs)
+
+        self.assertGreater(approximate, 0.0)
+        self.assertGreater(exact, 0.0)
+
+    def test_find_duplicate(self):
+        """Test exact and near-duplicate detection on normalized code"""
+        code = "def solve(values):\n    total = 0\n    for v in values:\n        total += v * v\n    return total\n"
+        self.db.add(Program(id="orig", code=code, metrics={"score": 0.5}))
+
+        reformatted = "# sum of squares\n" + code.replace("total += v * v", "total += (v * v)")
+        duplicate = self.db.find_duplicate(reformatted)
+        self.assertIsNotNone(duplicate)
+        self.assertEqual(duplicate.id, "orig")
+
+        novel = "import math\n\ndef solve(values):\n    return math.fsum(values)\n"
+        self.assertIsNone(self.db.find_duplicate(novel))
+
+    def test_batch_eviction(self):
+        """Test that eviction waits for the high watermark and keeps the elites"""
+        config = Config()
+        config.database.num_islands = 2
+        config.database.archive_size = 3
+        config.database.population_size = 20
+        config.database.population_slack = 0.25
+        db = ProgramDatabase(config.database)
+
+        def score(i):
+            return (i * 7 % 26) / 26
+
+        for i in range(25):
+            db.add(Program(id=f"p{i}", code=f"x = {i}", metrics={"score": score(i)}))
+        self.assertEqual(len(db.programs), 25)
+
+        db.add(Program(id="p25", code="x = 25", metrics={"score": score(25)}))
+        self.assertEqual(len(db.programs), 20)
+        self.assertEqual(set(db.program_ids), set(db.programs))
+        self.assertIn(db.best_program_id, db.programs)
+        for program_id in list(db.feature_map.values()) + list(db.archive):
+            self.assertIn(program_id, db.programs)
+        for island in db.islands:
+            self.assertTrue(set(island) <= set(db.programs))
+
+        # Evicted programs are the worst of those not protected as elites
+        elites = set(db.feature_map.values()) | set(db.archive)
+        evicted = {f"p{i}" for i in range(26)} - set(db.programs)
+        worst_kept = min(
+            db.programs[pid].metrics["score"] for pid in db.programs if pid not in elites
+        )
+        self.assertTrue(all(score(int(pid[1:])) <= worst_kept for pid in evicted))
+
+    def test_age_layered_eviction(self):
+        """Test that age layers keep young programs from being crowded out"""
+        for age_layers, expected_young in ((2, 5), (0, 1)):
+            config = Config()
+            config.database.num_islands = 1
+            config.database.archive_size = 1
+            config.database.feature_dimensions = ["score"]
+            config.database.population_size = 10
+            config.database.population_slack = 0.0
+            config.database.age_layers = age_layers
+            config.database.age_layer_gap = 5
+            db = ProgramDatabase(config.database)
+
+            for i in range(10):
+                program = Program(id=f"old{i}", code=f"x = {i}", generation=10)
+                program.metrics = {"score": 0.5 + i / 100}
+                db.add(program)
+            for i in range(5):
+                program = Program(id=f"young{i}", code=f"y = {i}", generation=0)
+                program.metrics = {"score": i / 100}
+                db.add(program)
+
+            self.assertEqual(len(db.programs), 10)
+            young = [pid for pid in db.programs if pid.startswith("young")]
+            self.assertEqual(len(young), expected_young, age_layers)
+
+    def test_feature_binning_specs(self):
+        """Test log-scaled and per-dimension bins, with coordinates cached on the program"""
+        config = Config()
+        config.database.feature_dimensions = ["complexity", "score"]
+        config.database.feature_binning = {
+            "complexity": {"scale": "log", "min": 10, "max": 100000, "bins": 4},
+            "score": {"min": 0.5, "max": 1.0},
+        }
+        db = ProgramDatabase(config.database)
+
+        program = Program(id="p", code="x" * 2000, metrics={"score": 0.75})
+        db.add(program)
+        self.assertEqual(program.feature_coords, [2, 5])
+        self.assertEqual(program.feature_values["complexity"], 2000.0)
+        self.assertIs(db._get_feature_coords(program), program.feature_coords)
+        self.assertEqual(db._bin_feature("complexity", 10**6), 3)
+        self.assertEqual(db._bin_feature("score", 0.1), 0)
+
+        config.database.feature_binning = {"complexity": {"scale": "log"}}
+        with self.assertRaises(ValueError):
+            ProgramDatabase(config.database)
+
+    def test_adaptive_feature_bins(self):
+        """Test that quantile bins spread clustered programs over the grid and refit on drift"""
+        config = Config()
+        config.database.num_islands = 1
+        config.database.feature_dimensions = ["complexity"]
+        config.database.feature_binning = {"complexity": {"adaptive": True}}
+        db = ProgramDatabase(config.database)
+
+        # Code lengths 2000-2039 all fall into the last fixed bin of 0-1000 characters
+        for i in range(40):
+            db.add(Program(id=f"p{i}", code="x" * (2000 + i), metrics={"score": i / 40}))
+        self.assertEqual(len(db.feature_map), 10)
+        self.assertEqual(db.feature_fit_size, 40)
+
+        # Longer programs outside the fitted range trigger a refit once they pass the drift
+        for i in range(5):
+            db.add(Program(id=f"long{i}", code="x" * (5000 + i), metrics={"score": 0.5}))
+        self.assertEqual(db.feature_fitted_ranges["complexity"][1], 5004.0)
+        self.assertEqual(set(db.feature_map.values()) - set(db.programs), set())
+
+        with tempfile.TemporaryDirectory() as path:
+            db.save(path)
+            restored = ProgramDatabase(config.database)
+            restored.load(path)
+        self.assertEqual(restored.feature_edges, db.feature_edges)
+        self.assertEqual(restored.programs["p3"].feature_coords, db.programs["p3"].feature_coords)
+
+    def test_get_migrants(self):
+        """Test that migrants are the top programs of the source island"""
+        for i in range(10):
+            self.db.add(
+                Program(id=f"m{i}", code=f"x = {i}", metrics={"score": i / 10}), target_island=0
+            )
+
+        migrants = self.db.get_migrants(0)
+        self.assertEqual([p.id for p in migrants], ["m9"])
+        self.assertEqual(self.db.get_migrants(1), [])
+
+    def test_migration_shares_programs(self):
+        """Test that migrants join target islands by reference and are not duplicated"""
+        config = Config()
+        config.database.num_islands = 4
+        db = ProgramDatabase(config.database)
+        for i in range(8):
+            db.add(
+                Program(id=f"m{i}", code=f"x = {i}", metrics={"score": i / 10}), target_island=i % 4
+            )
+        num_programs = len(db.programs)
+
+        db.migrate_programs()
+
+        # Each island's best program joined both ring neighbors
+        self.assertEqual(sum(len(island) for island in db.islands), 8 + 2 * 4)
+        self.assertIn("m7", db.islands[0])
+        self.assertIn("m7", db.islands[2])
+        self.assertEqual(db.programs["m7"].metadata["island"], 3)
+
+        db.migrate_programs()
+        self.assertEqual(len(db.programs), num_programs)
+
+    def test_migration_topologies(self):
+        """Test the targets of each migration topology"""
+        self.assertEqual(get_migration_targets(0, 6, "torus"), [1, 2, 3])
+        self.assertEqual(get_migration_targets(4, 9, "torus"), [1, 3, 5, 7])
+        self.assertEqual(get_migration_targets(1, 4, "fully_connected"), [0, 2, 3])
+        targets = get_migration_targets(2, 8, "random_k", k=3)
+        self.assertEqual(len(targets), 3)
+        self.assertNotIn(2, targets)
+        with self.assertRaises(ValueError):
+            get_migration_targets(0, 4, "star")
+
+    def test_ring_neighbors(self):
+        """Test the ring topology used by island worker processes"""
+        self.assertEqual(get_ring_neighbors(0, 5), [1, 4])
+        self.assertEqual(get_ring_neighbors(1, 2), [0])
+        self.assertEqual(get_ring_neighbors(0, 1), [])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for repairing SEARCH/REPLACE blocks that could not be applied
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Set dummy API key for testing to prevent OpenAI SDK import failures
+os.environ["OPENAI_API_KEY"] = "test"
+
+from openevolve.config import Config, LLMModelConfig
+from openevolve.controller import OpenEvolve
+from openevolve.database import Program
+from openevolve.llm.ensemble import LLMEnsemble
+from openevolve.utils.bandit_utils import Bandit
+
+PARENT_CODE = "def f():\n    x = 1\n    return x\n\n\ndef g():\n    return 2\n"
+
+
+def make_diff(search, replace):
+    return f"<<<<<<< SEARCH\n{search}\n=======\n{replace}\n>>>>>>> REPLACE"
+
+
+class TestDiffRepair(unittest.TestCase):
+    """Tests for the follow-up requests correcting unusable diffs"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        program_path = os.path.join(self.test_dir, "program.py")
+        with open(program_path, "w") as f:
+            f.write(PARENT_CODE)
+        evaluator_path = os.path.join(self.test_dir, "evaluator.py")
+        with open(evaluator_path, "w") as f:
+            f.write("def evaluate(program_path):\n    return {'score': 0.1}\n")
+
+        self.config = Config()
+        self.config.diff_fuzzy_threshold = 1.0
+        with patch("openevolve.controller.Evaluator"):
+            self.controller = OpenEvolve(
+                initial_program_path=program_path,
+                evaluation_file=evaluator_path,
+                config=self.config,
+                output_dir=self.test_dir,
+            )
+        self.parent = Program(id="parent", code=PARENT_CODE, metrics={"score": 0.1})
+        self.prompt = {"system": "system", "user": "improve the program"}
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _parse(self, response, repairs):
+        with patch.object(
+            self.controller.llm_ensemble, "generate_with_context", side_effect=repairs
+        ) as mock_llm:
+            parsed = asyncio.run(
+                self.controller._parse_response(self.parent, self.prompt, response, 0)
+            )
+        return parsed, mock_llm
+
+    def test_failed_block_repaired(self):
+        """Test that a corrected block is applied on top of the blocks that did apply"""
+        response = "\n".join(
+            [
+                make_diff("    x = 1", "    x = 5"),
+                make_diff("def g():\n    return 3", "def g():\n    return 4"),
+            ]
+        )
+        repair = make_diff("def g():\n    return 2", "def g():\n    return 4")
+
+        parsed, mock_llm = self._parse(response, [repair])
+
+        self.assertIsNotNone(parsed)
+        child_code, changes_summary = parsed
+        self.assertIn("x = 5", child_code)
+        self.assertIn("return 4", child_code)
+        self.assertIn("2 lines", changes_summary.split("\n")[1])
+
+        # The follow-up continues the conversation and shows the closest parent region
+        messages = mock_llm.call_args.kwargs["messages"]
+        self.assertEqual([m["role"] for m in messages], ["user", "assistant", "user"])
+        self.assertEqual(messages[1]["content"], response)
+        self.assertIn("return 3", messages[2]["content"])
+        self.assertIn("def g():\n    return 2", messages[2]["content"])
+        self.assertNotIn("x = 1", messages[2]["content"].split("Closest matching code")[1])
+
+    def test_missing_diffs_repaired(self):
+        """Test that a response without any blocks is asked for again in diff format"""
+        parsed, mock_llm = self._parse(
+            "Use a larger constant.", [make_diff("    x = 1", "    x = 9")]
+        )
+
+        self.assertIn("x = 9", parsed[0])
+        self.assertIn("SEARCH/REPLACE", mock_llm.call_args.kwargs["messages"][2]["content"])
+
+    def test_repair_attempts_limited(self):
+        """Test that responses are dropped once the repair attempts are used up"""
+        self.config.max_repair_attempts = 2
+        parsed, mock_llm = self._parse("no diff", ["still none", "nothing"])
+        self.assertIsNone(parsed)
+        self.assertEqual(mock_llm.call_count, 2)
+
+        self.config.max_repair_attempts = 0
+        parsed, mock_llm = self._parse("no diff", [])
+        self.assertIsNone(parsed)
+        self.assertEqual(mock_llm.call_count, 0)
+
+    def test_repair_uses_original_model(self):
+        """Test that repairs go to the model that wrote the response, which gets the credit"""
+        ensemble = LLMEnsemble(
+            [
+                LLMModelConfig(name="writer", api_key="test", weight=0.0),
+                LLMModelConfig(name="other", api_key="test", weight=1.0),
+            ],
+            bandit=Bandit(2),
+        )
+        self.controller.llm_ensemble = ensemble
+        self.config.database.adaptive_selection = True
+        response = make_diff("def g():\n    return 3", "def g():\n    return 4")
+        repair = make_diff("def g():\n    return 2", "def g():\n    return 4")
+
+        writer_patch = patch.object(
+            ensemble.models[0], "generate_with_context", return_value=repair
+        )
+        other_patch = patch.object(ensemble.models[1], "generate_with_context")
+        with writer_patch as writer, other_patch as other:
+            # A call sampling a model in between must not redirect the repair or the credit
+            ensemble.sample_model_index()
+            parsed = asyncio.run(
+                self.controller._parse_response(self.parent, self.prompt, response, 0, 0)
+            )
+            ensemble.sample_model_index()
+
+        self.assertIn("return 4", parsed[0])
+        self.assertEqual(writer.call_count, 1)
+        self.assertEqual(other.call_count, 0)
+
+        child = Program(id="child", code=parsed[0], metrics={"score": 0.5})
+        self.controller._record_selection_outcome(self.parent, child, 1.0, model_index=0)
+        self.assertEqual(ensemble.bandit.pulls, [1.0, 0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
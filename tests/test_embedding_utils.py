@@ -0,0 +1,81 @@
+"""
+Tests for code embeddings and the vector index in openevolve.utils.embedding_utils
+"""
+
+import unittest
+
+import numpy as np
+
+from openevolve.config import Config
+from openevolve.database import Program, ProgramDatabase
+from openevolve.utils.embedding_utils import HashedTokenEmbedder, VectorIndex, load_embedder
+
+
+class TestEmbeddingUtils(unittest.TestCase):
+    """Tests for embedding utilities"""
+
+    def test_hashed_embedder(self):
+        """Test that hashed embeddings are unit-norm and similarity-preserving"""
+        embedder = HashedTokenEmbedder(dim=128)
+        a = embedder("def add(a, b):\n    return a + b\n")
+        b = embedder("def add(a, b):\n    return a + b + 0\n")
+        c = embedder("class Matrix:\n    rows = []\n    cols = []\n")
+
+        self.assertEqual(a.shape, (128,))
+        self.assertAlmostEqual(float(np.linalg.norm(a)), 1.0, places=5)
+        self.assertGreater(float(a @ b), float(a @ c))
+
+    def test_load_embedder(self):
+        """Test loading the built-in and custom embedders"""
+        self.assertIsInstance(load_embedder("hashed", 64), HashedTokenEmbedder)
+        self.assertIs(load_embedder("numpy:ones_like"), np.ones_like)
+        with self.assertRaises(ValueError):
+            load_embedder("unknown")
+
+    def test_vector_index_search_and_remove(self):
+        """Test nearest and farthest search and swap-removal"""
+        index = VectorIndex(dim=2)
+        index.add("x", np.array([1.0, 0.0], dtype=np.float32))
+        index.add("y", np.array([0.0, 1.0], dtype=np.float32))
+        index.add("xy", np.array([0.7071, 0.7071], dtype=np.float32))
+
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        self.assertEqual([key for key, _ in index.search(query, k=2)], ["x", "xy"])
+        self.assertEqual(index.search(query, k=1, farthest=True)[0][0], "y")
+        self.assertEqual([key for key, _ in index.search(query, k=3, exclude="x")], ["xy", "y"])
+
+        index.remove("x")
+        self.assertEqual(len(index), 2)
+        self.assertNotIn("x", index)
+        self.assertEqual(index.search(query, k=1)[0][0], "xy")
+
+
+class TestFeatureBasedDatabase(unittest.TestCase):
+    """Tests for feature-based diversity in the program database"""
+
+    def setUp(self):
+        config = Config()
+        config.database.diversity_metric = "feature_based"
+        config.database.feature_dimensions = ["score", "embedding_0", "embedding_1"]
+        self.db = ProgramDatabase(config.database)
+
+    def test_embedding_feature_dimensions(self):
+        """Test that programs are embedded on add and mapped to valid feature bins"""
+        for i in range(6):
+            self.db.add(Program(id=f"p{i}", code=f"def f{i}(x):\n    return x ** {i}\n" * (i + 1)))
+
+        self.assertEqual(len(self.db.embedding_index), 6)
+        coords = self.db._calculate_feature_coords(self.db.get("p3"))
+        self.assertEqual(len(coords), 3)
+        for coord in coords:
+            self.assertTrue(0 <= coord < self.db.feature_bins)
+
+        nearest = self.db.find_nearest_programs(self.db.get("p3"), n=2)
+        farthest = self.db.find_farthest_programs(self.db.get("p3"), n=2)
+        self.assertEqual(len(nearest), 2)
+        self.assertNotIn("p3", [p.id for p in nearest + farthest])
+        self.assertTrue(set(p.id for p in nearest).isdisjoint(p.id for p in farthest))
+
+
+if __name__ == "__main__":
+    unittest.main()
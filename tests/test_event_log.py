@@ -0,0 +1,54 @@
+"""
+Tests for the evolution event log
+"""
+
+import os
+import tempfile
+import unittest
+
+from openevolve.event_log import EventLog, EventLogReader
+
+
+class TestEventLog(unittest.TestCase):
+    """Tests for appending to and tailing the event log"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "events.jsonl")
+        self.log = EventLog(self.path)
+        self.reader = EventLogReader(self.path)
+
+    def tearDown(self):
+        self.log.close()
+        self.temp_dir.cleanup()
+
+    def test_tail_new_events(self):
+        """Test that each read returns only the events appended since the last one"""
+        self.log.append("program", iteration=1, program={"id": "a"})
+        self.log.append("checkpoint", iteration=1)
+
+        events = self.reader.read_new()
+        self.assertEqual([event["type"] for event in events], ["program", "checkpoint"])
+        self.assertEqual(events[0]["program"], {"id": "a"})
+        self.assertEqual(self.reader.read_new(), [])
+
+        self.log.append("program", iteration=2, program={"id": "b"})
+        self.assertEqual([event["iteration"] for event in self.reader.read_new()], [2])
+
+    def test_partial_line_and_truncation(self):
+        """Test that partial lines wait for completion and truncated logs are re-read"""
+        with open(self.path, "a") as f:
+            f.write('{"type": "program", "iteration": 1}\n{"type": "prog')
+        self.assertEqual(len(self.reader.read_new()), 1)
+
+        with open(self.path, "a") as f:
+            f.write('ram", "iteration": 2}\n')
+        self.assertEqual([event["iteration"] for event in self.reader.read_new()], [2])
+
+        with open(self.path, "w") as f:
+            f.write('{"type": "program", "iteration": 1}\n')
+        self.assertEqual([event["iteration"] for event in self.reader.read_new()], [1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+"""
+Tests for collecting results from island worker processes
+"""
+
+import asyncio
+import multiprocessing
+import os
+import queue
+import shutil
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+# Set dummy API key for testing to prevent OpenAI SDK import failures
+os.environ["OPENAI_API_KEY"] = "test"
+
+from openevolve.config import Config, LLMModelConfig
+from openevolve.controller import OpenEvolve
+from openevolve.database import Program
+from openevolve.island_worker import (
+    MESSAGE_DONE,
+    MESSAGE_PROGRAM,
+    IslandWorker,
+    iter_worker_results,
+)
+
+
+def report_children(
+    island_idx,
+    initial_program_path,
+    evaluation_file,
+    config,
+    output_dir,
+    start_iteration,
+    iterations,
+    seed_programs,
+    inboxes,
+    results,
+):
+    """Stand-in for run_island_worker that reports one child with artifacts per iteration"""
+    for i in range(iterations):
+        child = Program(
+            id=f"island{island_idx}_child{i}",
+            code=f"x = {island_idx * 10 + i + 1}\n",
+            parent_id=seed_programs[0]["id"],
+            metrics={"score": (island_idx * 10 + i + 1) / 100},
+        )
+        results.put((MESSAGE_PROGRAM, island_idx, child.to_dict(), {"stderr": child.id}))
+    results.put((MESSAGE_DONE, island_idx, None, None))
+
+
+EVALUATOR_CODE = """
+def evaluate(program_path):
+    namespace = {}
+    with open(program_path) as f:
+        exec(f.read(), namespace)
+    return {"score": namespace["x"] / 100}
+"""
+
+
+class TestWorkerResults(unittest.TestCase):
+    """Tests for iter_worker_results"""
+
+    def test_killed_worker_counts_as_finished(self):
+        """Test that results are collected and a worker killed without reporting ends the run"""
+        context = multiprocessing.get_context("spawn")
+        results = context.Queue()
+        workers = [context.Process(target=time.sleep, args=(60,)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+
+        # Island 0 reports a program and finishes normally; island 1 is killed
+        results.put((MESSAGE_PROGRAM, 0, {"id": "child"}, None))
+        results.put((MESSAGE_DONE, 0, None, None))
+        workers[1].kill()
+        workers[1].join()
+
+        start = time.time()
+        messages = list(iter_worker_results(results, workers, poll_interval=0.1))
+
+        self.assertEqual(messages, [(MESSAGE_PROGRAM, 0, {"id": "child"}, None)])
+        self.assertLess(time.time() - start, 5.0)
+        workers[0].kill()
+        workers[0].join()
+
+
+class TestIslandWorker(unittest.TestCase):
+    """Tests for the evolution loop of an island worker, with a stub LLM"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.program_path = os.path.join(self.test_dir, "program.py")
+        with open(self.program_path, "w") as f:
+            f.write("x = 0\n")
+        self.evaluator_path = os.path.join(self.test_dir, "evaluator.py")
+        with open(self.evaluator_path, "w") as f:
+            f.write(EVALUATOR_CODE)
+
+        self.config = Config()
+        self.config.diff_based_evolution = False
+        self.config.evaluator.max_retries = 0
+        self.config.llm.models = [
+            LLMModelConfig(name="a", api_key="test"),
+            LLMModelConfig(name="b", api_key="test"),
+        ]
+        self.inboxes = []
+        self.results = queue.Queue()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _make_worker(self, island_idx=0):
+        if not self.inboxes:
+            self.inboxes = [queue.Queue() for _ in range(self.config.database.num_islands)]
+        return IslandWorker(
+            island_idx,
+            self.program_path,
+            self.evaluator_path,
+            self.config,
+            os.path.join(self.test_dir, "islands", f"island_{island_idx}"),
+            self.inboxes,
+            self.results,
+        )
+
+    def _run(self, worker, iterations, value=1):
+        """Run a worker on the initial program, with an LLM writing x = value, value + 1, ..."""
+        seed = Program(id=f"seed{worker.island_idx}", code="x = 0\n", metrics={"score": 0.0})
+        responses = [f"```\nx = {value + i}\n```" for i in range(iterations)]
+        with patch.object(
+            worker.controller.llm_ensemble, "generate_with_context", side_effect=responses
+        ):
+            asyncio.run(worker.run(0, iterations, [seed.to_dict()]))
+
+    def _results(self):
+        messages = []
+        while not self.results.empty():
+            messages.append(self.results.get())
+        return messages
+
+    def test_selection_bandits_credited(self):
+        """Test that a worker's iterations credit its strategy and model bandits"""
+        self.config.database.adaptive_selection = True
+        self.config.database.bandit_decay = 1.0
+        worker = self._make_worker()
+        self._run(worker, 3)
+
+        self.assertEqual(sum(worker.controller.llm_ensemble.bandit.pulls), 3)
+        self.assertEqual(sum(worker.database.strategy_bandit.pulls), 3)
+        self.assertEqual(len(self._results()), 3)
+
+    def test_run_reports_children(self):
+        """Test that accepted children are reported and the worker writes no event log"""
+        worker = self._make_worker()
+        self._run(worker, 2)
+
+        messages = self._results()
+        self.assertEqual([m[0] for m in messages], [MESSAGE_PROGRAM] * 2)
+        self.assertEqual([m[2]["code"] for m in messages], ["x = 1", "x = 2"])
+        self.assertEqual(len(worker.database.programs), 3)
+        self.assertEqual(worker.database.island_generations, [2])
+        self.assertIsNone(worker.controller.event_log)
+        self.assertFalse(
+            os.path.exists(os.path.join(self.test_dir, "islands", "island_0", "events.jsonl"))
+        )
+
+    def test_migration(self):
+        """Test that migrants are sent to the ring neighbor, deduplicated and flagged"""
+        self.config.database.num_islands = 2
+        self.config.database.migration_interval = 2
+        sender = self._make_worker(0)
+        receiver = self._make_worker(1)
+
+        self._run(sender, 2, value=50)
+        self.assertEqual(sender.database.last_migration_generation, 2)
+        batch = self.inboxes[1].get_nowait()
+        self.assertEqual([p["code"] for p in batch], ["x = 51"])
+        self.assertTrue(self.inboxes[0].empty())
+
+        # The same migrant arriving twice, e.g. from two neighbors, is added once
+        self.inboxes[1].put(batch)
+        self.inboxes[1].put(batch)
+        self.assertEqual(receiver.receive_migrants(), 1)
+        self.assertEqual(receiver.receive_migrants(), 0)
+        migrant = receiver.database.programs[batch[0]["id"]]
+        self.assertTrue(migrant.metadata["migrant"])
+        self.assertIn(migrant.id, receiver.database.islands[0])
+
+
+class TestRunIslandWorkers(unittest.TestCase):
+    """Tests for collecting island worker results in the controller"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        program_path = os.path.join(self.test_dir, "program.py")
+        with open(program_path, "w") as f:
+            f.write("x = 0\n")
+        evaluator_path = os.path.join(self.test_dir, "evaluator.py")
+        with open(evaluator_path, "w") as f:
+            f.write(EVALUATOR_CODE)
+
+        config = Config()
+        config.database.num_islands = 2
+        config.checkpoint_interval = 100
+        self.controller = OpenEvolve(
+            initial_program_path=program_path,
+            evaluation_file=evaluator_path,
+            config=config,
+            output_dir=self.test_dir,
+        )
+        self.controller.database.add(Program(id="seed", code="x = 0\n", metrics={"score": 0.0}))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_children_added_to_global_database(self):
+        """Test that reported children land on their island with their artifacts"""
+        with patch("openevolve.controller.run_island_worker", report_children):
+            asyncio.run(self.controller._run_island_workers(0, 4, None))
+
+        database = self.controller.database
+        for island_idx in range(2):
+            for i in range(2):
+                program_id = f"island{island_idx}_child{i}"
+                self.assertIn(program_id, database.islands[island_idx])
+                self.assertEqual(database.get_artifacts(program_id), {"stderr": program_id})
+        self.assertEqual(database.island_generations, [2, 2])
+        self.assertEqual(database.best_program_id, "island1_child1")
+        self.assertEqual(database.last_iteration, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
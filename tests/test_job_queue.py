@@ -0,0 +1,118 @@
+"""
+Tests for the distributed evaluation job queue and worker
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from openevolve.config import Config, EvaluatorConfig
+from openevolve.evaluator import Evaluator
+from openevolve.job_queue import STATUS_PENDING, JobQueue
+from openevolve.worker import EvaluationWorker
+
+
+class TestJobQueue(unittest.TestCase):
+    """Tests for the SQLite job queue"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.queue = JobQueue(
+            os.path.join(self.temp_dir.name, "jobs.db"), lease_timeout=60.0, max_attempts=2
+        )
+
+    def tearDown(self):
+        self.queue.close()
+        self.temp_dir.cleanup()
+
+    def test_submit_claim_complete(self):
+        """Test the job lifecycle, including binary artifacts"""
+        job_id = self.queue.submit("p1", "x = 1")
+        self.queue.submit("p1", "x = 1")
+        self.assertEqual(self.queue.count(), 1)
+
+        job = self.queue.claim("w1")
+        self.assertEqual((job.job_id, job.code, job.attempts), (job_id, "x = 1", 1))
+        self.assertIsNone(self.queue.claim("w2"))
+        self.assertIsNone(self.queue.pop_result(job_id))
+
+        self.assertTrue(self.queue.heartbeat(job_id, "w1"))
+        self.assertFalse(self.queue.heartbeat(job_id, "w2"))
+        self.assertTrue(self.queue.complete(job_id, "w1", {"score": 0.5}, {"log": b"\x00\x01"}))
+
+        metrics, artifacts = self.queue.pop_result(job_id)
+        self.assertEqual(metrics, {"score": 0.5})
+        self.assertEqual(artifacts, {"log": b"\x00\x01"})
+        self.assertEqual(self.queue.count(), 0)
+
+    def test_first_result_wins(self):
+        """Test that a second result for the same job is discarded"""
+        job_id = self.queue.submit("p1", "x = 1")
+        self.queue.claim("w1")
+
+        self.assertTrue(self.queue.complete(job_id, "w1", {"score": 0.5}))
+        self.assertFalse(self.queue.complete(job_id, "w2", {"score": 0.9}))
+        self.assertEqual(self.queue.pop_result(job_id)[0], {"score": 0.5})
+
+    def test_requeue_lost_worker(self):
+        """Test that expired jobs are requeued and eventually failed"""
+        self.queue.lease_timeout = 0.0
+        job_id = self.queue.submit("p1", "x = 1")
+
+        self.queue.claim("w1")
+        time.sleep(0.01)
+        self.assertEqual(self.queue.requeue_expired(), 1)
+        self.assertEqual(self.queue.count(STATUS_PENDING), 1)
+
+        job = self.queue.claim("w2")
+        self.assertEqual(job.attempts, 2)
+        time.sleep(0.01)
+        self.queue.requeue_expired()
+
+        metrics, artifacts = self.queue.pop_result(job_id)
+        self.assertEqual(metrics, {"error": 0.0})
+        self.assertEqual(artifacts["failure_stage"], "distributed")
+
+    def test_worker_processes_job(self):
+        """Test that a worker evaluates a claimed job and posts the result"""
+        evaluation_file = os.path.join(self.temp_dir.name, "evaluator.py")
+        with open(evaluation_file, "w") as f:
+            f.write("def evaluate(program_path):\n    return {'score': 0.75}\n")
+
+        config = Config()
+        config.evaluator.max_retries = 0
+        worker = EvaluationWorker(config, evaluation_file, self.queue, worker_id="w1")
+
+        job_id = self.queue.submit("p1", "x = 1")
+        self.assertEqual(worker.run(max_jobs=1), 1)
+        self.assertEqual(self.queue.pop_result(job_id)[0], {"score": 0.75})
+
+    def test_evaluation_without_workers_times_out(self):
+        """Test that an evaluation no worker picks up fails after the deadline"""
+        evaluation_file = os.path.join(self.temp_dir.name, "evaluator.py")
+        with open(evaluation_file, "w") as f:
+            f.write("def evaluate(program_path):\n    return {'score': 0.75}\n")
+
+        config = EvaluatorConfig(
+            distributed=True,
+            queue_path=os.path.join(self.temp_dir.name, "jobs.db"),
+            timeout=0.1,
+            lease_timeout=0.1,
+            max_job_attempts=1,
+            poll_interval=0.05,
+        )
+        evaluator = Evaluator(config, evaluation_file)
+        try:
+            metrics = asyncio.run(evaluator.evaluate_program("x = 1", "p1"))
+        finally:
+            evaluator.job_queue.close()
+
+        self.assertEqual(metrics, {"error": 0.0})
+        self.assertEqual(evaluator.get_pending_artifacts("p1")["failure_stage"], "distributed")
+        self.assertEqual(self.queue.count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
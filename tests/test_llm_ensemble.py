@@ -3,6 +3,8 @@ Tests for LLMEnsemble in openevolve.llm.ensemble
 """
 
 import unittest
+from types import SimpleNamespace
+
 from openevolve.llm.ensemble import LLMEnsemble
 from openevolve.config import LLMModelConfig
 
@@ -33,6 +35,30 @@ class TestLLMEnsemble(unittest.TestCase):
                 break
         self.assertEqual(len(sampled_models), len(models))
 
+    def test_usage_stats(self):
+        """Test that token usage and prompt-cache hits are summed over models"""
+        ensemble = LLMEnsemble([LLMModelConfig(name="a", api_key="test")] * 2)
+
+        usage = SimpleNamespace(
+            prompt_tokens=1000,
+            completion_tokens=50,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+        )
+        ensemble.models[0]._record_usage(SimpleNamespace(usage=usage))
+        ensemble.models[1]._record_usage(
+            SimpleNamespace(
+                usage=SimpleNamespace(
+                    prompt_tokens=500, completion_tokens=20, prompt_cache_hit_tokens=100
+                )
+            )
+        )
+
+        stats = ensemble.get_usage_stats()
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["prompt_tokens"], 1500)
+        self.assertEqual(stats["cached_tokens"], 900)
+        self.assertEqual(stats["completion_tokens"], 70)
+
 
 if __name__ == "__main__":
     unittest.main()
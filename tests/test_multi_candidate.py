@@ -0,0 +1,160 @@
+"""
+Tests for generating several candidate children per prompt
+"""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Set dummy API key for testing to prevent OpenAI SDK import failures
+os.environ["OPENAI_API_KEY"] = "test"
+
+from openevolve.config import Config
+from openevolve.controller import OpenEvolve
+from openevolve.database import Program
+from openevolve.llm.openai import OpenAILLM
+
+
+class ScoringEvaluator:
+    """Mock evaluator scoring programs by the constant they return"""
+
+    def __init__(self):
+        self.evaluated = []
+
+    async def evaluate_program(self, code, program_id):
+        self.evaluated.append(code)
+        value = int(code.split("return ")[1].split()[0])
+        return {"score": value / 10}
+
+    def get_pending_artifacts(self, program_id):
+        return None
+
+
+def make_diff(value):
+    return f"<<<<<<< SEARCH\n    return 1\n=======\n    return {value}\n>>>>>>> REPLACE"
+
+
+class TestMultiCandidate(unittest.TestCase):
+    """Tests for multi-candidate generation in the controller"""
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.program_path = os.path.join(self.test_dir, "program.py")
+        with open(self.program_path, "w") as f:
+            f.write("def f():\n    return 1\n")
+        self.evaluator_path = os.path.join(self.test_dir, "evaluator.py")
+        with open(self.evaluator_path, "w") as f:
+            f.write("def evaluate(program_path):\n    return {'score': 0.1}\n")
+
+        self.config = Config()
+        self.config.num_candidates = 4
+        self.config.max_repair_attempts = 0
+
+    def tearDown(self):
+        import shutil
+
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _generate(self, selection):
+        self.config.candidate_selection = selection
+        with patch("openevolve.controller.Evaluator") as mock_evaluator_class:
+            evaluator = ScoringEvaluator()
+            mock_evaluator_class.return_value = evaluator
+            controller = OpenEvolve(
+                initial_program_path=self.program_path,
+                evaluation_file=self.evaluator_path,
+                config=self.config,
+                output_dir=self.test_dir,
+            )
+
+        parent = Program(id="parent", code="def f():\n    return 1\n", metrics={"score": 0.1})
+        controller.database.add(parent)
+        responses = [make_diff(3), make_diff(7), make_diff(3), "no diff here"]
+
+        with patch.object(
+            controller.llm_ensemble, "generate_multiple_with_context", return_value=responses
+        ) as mock_llm:
+            children = asyncio.run(controller._generate_children(parent, [], 0))
+            self.assertEqual(mock_llm.call_args.kwargs["n"], 4)
+
+        return children, evaluator
+
+    def test_all_distinct_candidates_evaluated(self):
+        """Test that duplicate and unusable completions are dropped before evaluation"""
+        children, evaluator = self._generate("all")
+
+        self.assertEqual(len(evaluator.evaluated), 2)
+        self.assertEqual([child.metrics["score"] for child, _ in children], [0.7, 0.3])
+
+    def test_best_candidate_selected(self):
+        """Test that only the best candidate is kept with 'best' selection"""
+        children, _ = self._generate("best")
+
+        self.assertEqual(len(children), 1)
+        self.assertEqual(children[0][0].metrics["score"], 0.7)
+        self.assertEqual(children[0][0].parent_id, "parent")
+
+
+class TestOpenAIMultipleChoices(unittest.TestCase):
+    """Tests for requesting several choices from an OpenAI-compatible API"""
+
+    def setUp(self):
+        config = Config()
+        config.llm.update_model_params({"api_key": "test"})
+        self.llm = OpenAILLM(config.llm.models[0])
+
+    def test_uses_n_parameter(self):
+        """Test that one request with `n` serves all candidates"""
+        with patch.object(self.llm, "_call_api", return_value=["a", "b", "c"]) as mock_api:
+            responses = asyncio.run(self.llm.generate_multiple_with_context("sys", [], 3))
+
+        self.assertEqual(responses, ["a", "b", "c"])
+        self.assertEqual(mock_api.call_count, 1)
+        self.assertEqual(mock_api.call_args.args[0]["n"], 3)
+        self.assertTrue(self.llm.supports_n)
+
+    def test_falls_back_when_n_ignored(self):
+        """Test that providers ignoring `n` are topped up with parallel calls"""
+        with patch.object(self.llm, "_call_api", return_value=["a"]) as mock_api:
+            responses = asyncio.run(self.llm.generate_multiple_with_context("sys", [], 3))
+
+        self.assertEqual(responses, ["a", "a", "a"])
+        self.assertEqual(mock_api.call_count, 3)
+        self.assertFalse(self.llm.supports_n)
+
+    def test_transient_error_keeps_probing(self):
+        """Test that a failed first request does not turn off `n` for good"""
+        self.llm.retries = 0
+        with patch.object(self.llm, "_call_api", side_effect=TimeoutError("read timeout")):
+            with self.assertRaises(TimeoutError):
+                asyncio.run(self.llm.generate_multiple_with_context("sys", [], 3))
+        self.assertIsNone(self.llm.supports_n)
+
+        with patch.object(self.llm, "_call_api", return_value=["a", "b", "c"]):
+            asyncio.run(self.llm.generate_multiple_with_context("sys", [], 3))
+        self.assertTrue(self.llm.supports_n)
+
+    def test_falls_back_when_n_rejected(self):
+        """Test that a provider rejecting `n` is served by single-choice calls without retries"""
+
+        class BadRequest(Exception):
+            status_code = 400
+            param = None
+
+        def call_api(params):
+            if "n" in params:
+                raise BadRequest("Unrecognized request argument supplied: n")
+            return ["a"]
+
+        with patch.object(self.llm, "_call_api", side_effect=call_api) as mock_api:
+            responses = asyncio.run(self.llm.generate_multiple_with_context("sys", [], 2))
+
+        self.assertEqual(responses, ["a", "a"])
+        self.assertEqual(mock_api.call_count, 3)
+        self.assertFalse(self.llm.supports_n)
+
+
+if __name__ == "__main__":
+    unittest.main()
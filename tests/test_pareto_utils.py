@@ -0,0 +1,107 @@
+"""
+Tests for Pareto ranking
+"""
+
+import random
+import unittest
+
+from openevolve.config import DatabaseConfig
+from openevolve.database import Program, ProgramDatabase
+from openevolve.utils.pareto_utils import ParetoArchive, dominates
+
+
+def sort_fronts(values):
+    """Reference non-dominated sort by repeatedly peeling off the non-dominated items"""
+    remaining = dict(values)
+    ranks = {}
+    rank = 0
+    while remaining:
+        front = [
+            item
+            for item, vector in remaining.items()
+            if not any(dominates(other, vector) for other in remaining.values())
+        ]
+        for item in front:
+            ranks[item] = rank
+            del remaining[item]
+        rank += 1
+    return ranks
+
+
+class TestParetoArchive(unittest.TestCase):
+    """Tests for ParetoArchive"""
+
+    def test_incremental_fronts_match_full_sort(self):
+        """Test that fronts stay correct through random adds, updates and removals"""
+        rng = random.Random(0)
+        archive = ParetoArchive()
+        values = {}
+        for _ in range(1500):
+            item = rng.randrange(40)
+            if rng.random() < 0.6:
+                values[item] = [rng.randint(0, 5) for _ in range(3)]
+                archive.add(item, values[item])
+            else:
+                archive.discard(item)
+                values.pop(item, None)
+            self.assertEqual(archive.ranks, sort_fronts(values))
+
+    def test_crowding_and_worst_first(self):
+        """Test crowding distances and the eviction order"""
+        archive = ParetoArchive()
+        for item, vector in {
+            "a": [0, 4],
+            "b": [1, 3],
+            "c": [3, 1],
+            "d": [4, 0],
+            "e": [0, 0],
+        }.items():
+            archive.add(item, vector)
+
+        self.assertEqual(archive.front(1), ["e"])
+        self.assertEqual(archive.crowding_distance("a"), float("inf"))
+        self.assertAlmostEqual(archive.crowding_distance("b"), 1.5)
+        self.assertAlmostEqual(archive.crowding_distance("c"), 1.5)
+        self.assertEqual(archive.worst_first()[0], "e")
+        self.assertEqual(set(archive.worst_first()[-2:]), {"a", "d"})
+        self.assertLess(archive.sort_key("d"), archive.sort_key("b"))
+
+
+class TestParetoDatabase(unittest.TestCase):
+    """Tests for multi-objective ranking in the database"""
+
+    def test_trade_offs_survive_eviction(self):
+        """Test that eviction keeps the non-dominated trade-offs between objectives"""
+        config = DatabaseConfig(
+            num_islands=1,
+            archive_size=2,
+            population_size=6,
+            population_slack=0.0,
+            feature_dimensions=["complexity"],
+            feature_bins=1,
+            pareto_objectives=["accuracy", "execution_time"],
+            pareto_minimize=["execution_time"],
+        )
+        database = ProgramDatabase(config)
+        trade_offs = [(0.9, 5.0), (0.7, 2.0), (0.5, 1.0)]
+        for i, (accuracy, seconds) in enumerate(trade_offs):
+            metrics = {"accuracy": accuracy, "execution_time": seconds}
+            database.add(Program(id=f"front{i}", code=f"x = {i}", metrics=metrics))
+        for i in range(6):
+            metrics = {"accuracy": 0.4 - i / 20, "execution_time": 6.0}
+            database.add(Program(id=f"dominated{i}", code=f"y = {i}", metrics=metrics))
+
+        self.assertEqual(len(database.programs), 6)
+        for i in range(len(trade_offs)):
+            self.assertIn(f"front{i}", database.programs)
+            self.assertEqual(database.pareto.rank(f"front{i}"), 0)
+        self.assertTrue(
+            database._is_better(database.programs["front1"], database.programs["dominated0"])
+        )
+
+        with self.assertRaises(ValueError):
+            ProgramDatabase(DatabaseConfig(pareto_objectives=["a"], pareto_minimize=["b"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ Tests for PromptSampler in openevolve.prompt.sampler
 import unittest
 from openevolve.config import Config
 from openevolve.prompt.sampler import PromptSampler
+from openevolve.utils.token_utils import count_tokens
 
 
 class TestPromptSampler(unittest.TestCase):
@@ -48,6 +49,102 @@ class TestPromptSampler(unittest.TestCase):
         self.assertIn("def test(): pass", prompt["user"])
         self.assertIn("score: 0.5", prompt["user"])
 
+    def test_cache_friendly_layout(self):
+        """Test that the cache-friendly layout puts volatile sections last"""
+        config = Config()
+        config.prompt.prompt_layout = "cache_friendly"
+        sampler = PromptSampler(config.prompt)
+        top_programs = [{"id": "top1", "code": "def top1(): pass", "metrics": {"score": 0.6}}]
+
+        prompts = [
+            sampler.build_prompt(
+                current_program=f"def test(): return {i}",
+                program_metrics={"score": i / 10},
+                previous_programs=top_programs,
+                top_programs=top_programs,
+                program_artifacts={"stderr": f"error {i}"},
+            )["user"]
+            for i in range(2)
+        ]
+
+        shared_prefix = prompts[0][: prompts[0].index("def test(): return 0")]
+        self.assertTrue(prompts[1].startswith(shared_prefix))
+        self.assertIn("def top1(): pass", shared_prefix)
+        self.assertIn("SEARCH/REPLACE", shared_prefix)
+        self.assertLess(prompts[0].index("def test()"), prompts[0].index("score: 0.0"))
+        self.assertLess(prompts[0].index("score: 0.0"), prompts[0].index("error 0"))
+
+    def test_prompt_token_budget(self):
+        """Test that optional sections are packed into the token budget by value"""
+        config = Config()
+        config.prompt.num_diverse_programs = 0
+        top_programs = [
+            {"id": f"top{i}", "code": f"def top{i}(): return {i}\n" * 5, "metrics": {"score": i}}
+            for i in range(3)
+        ]
+        kwargs = dict(
+            current_program="def test(): pass",
+            program_metrics={"score": 0.5},
+            previous_programs=top_programs,
+            top_programs=top_programs,
+            program_artifacts={"stderr": "Traceback line\n" * 500},
+        )
+
+        unlimited = PromptSampler(config.prompt).build_prompt(**kwargs)
+
+        config.prompt.max_prompt_tokens = 1000
+        budgeted = PromptSampler(config.prompt).build_prompt(**kwargs)
+
+        self.assertLessEqual(count_tokens(budgeted["system"] + budgeted["user"]), 1000)
+        self.assertLess(len(budgeted["user"]), len(unlimited["user"]))
+        self.assertIn("def test(): pass", budgeted["user"])
+        self.assertIn("Traceback line", budgeted["user"])
+
+        # Leaving room beyond the artifacts keeps the best top program first
+        config.prompt.max_prompt_tokens = 470
+        kwargs["program_artifacts"] = {"stderr": "short error"}
+        budgeted = PromptSampler(config.prompt).build_prompt(**kwargs)
+        self.assertIn("def top2()", budgeted["user"])
+        self.assertNotIn("def top0()", budgeted["user"])
+
+    def test_compiled_templates_match_format(self):
+        """Test that compiled templates render exactly like str.format"""
+        manager = self.prompt_sampler.template_manager
+        values = dict(
+            metrics="- score: 0.5",
+            improvement_areas="- none",
+            evolution_history="history",
+            current_program="def f(): return {}",
+            language="python",
+            artifacts="",
+        )
+        for name in ("diff_user", "full_rewrite_user", "evaluation"):
+            template = manager.get_template(name)
+            self.assertEqual(manager.compile(template).render(**values), template.format(**values))
+
+        self.assertEqual(manager.compile("{x:.2f}").render(x=0.5), "0.50")
+        self.assertIs(
+            manager.get_compiled_template("top_program"),
+            manager.compile(manager.get_template("top_program")),
+        )
+
+    def test_program_renderings_cached(self):
+        """Test that program renderings are memoized by ID with a bounded cache"""
+        config = Config()
+        config.prompt.render_cache_size = 2
+        sampler = PromptSampler(config.prompt)
+        programs = [
+            {"id": f"p{i}", "code": "x = 1\n" * 20, "metrics": {"score": i}} for i in range(3)
+        ]
+
+        first = sampler._get_program_rendering(programs[0])
+        self.assertIs(sampler._get_program_rendering(programs[0]), first)
+        self.assertTrue(first["snippet"].endswith("# ... (truncated for brevity)"))
+
+        sampler._get_program_rendering(programs[1])
+        sampler._get_program_rendering(programs[2])
+        self.assertEqual(list(sampler._program_renderings), ["p1", "p2"])
+
 
 if __name__ == "__main__":
     unittest.main()
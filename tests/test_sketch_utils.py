@@ -0,0 +1,83 @@
+"""
+Tests for MinHash sketch utilities in openevolve.utils.sketch_utils
+"""
+
+import unittest
+
+from openevolve.utils.sketch_utils import (
+    MinHashLSH,
+    compute_minhash,
+    estimate_edit_distance,
+    minhash_similarity,
+    pairwise_similarity,
+)
+
+
+class TestSketchUtils(unittest.TestCase):
+    """Tests for sketch utilities"""
+
+    def setUp(self):
+        self.code_a = "def add(a, b):\n    return a + b\n\nprint(add(1, 2))\n"
+        self.code_b = "def add(a, b):\n    result = a + b\n    return result\n\nprint(add(1, 2))\n"
+        self.code_c = "class Matrix:\n    def __init__(self, rows):\n        self.rows = rows\n"
+
+    def test_identical_code_has_identical_sketch(self):
+        """Test that sketches are deterministic and whitespace-insensitive"""
+        sketch1 = compute_minhash(self.code_a)
+        sketch2 = compute_minhash(self.code_a.replace("    ", "  "))
+        self.assertEqual(minhash_similarity(sketch1, sketch2), 1.0)
+
+    def test_similarity_ordering(self):
+        """Test that similar programs score higher than unrelated ones"""
+        sketch_a = compute_minhash(self.code_a)
+        sketch_b = compute_minhash(self.code_b)
+        sketch_c = compute_minhash(self.code_c)
+
+        self.assertGreater(
+            minhash_similarity(sketch_a, sketch_b), minhash_similarity(sketch_a, sketch_c)
+        )
+
+    def test_estimate_edit_distance(self):
+        """Test that the distance estimate is zero for identical code and bounded by length"""
+        sketch_a = compute_minhash(self.code_a)
+        sketch_c = compute_minhash(self.code_c)
+
+        self.assertEqual(
+            estimate_edit_distance(sketch_a, sketch_a, len(self.code_a), len(self.code_a)), 0.0
+        )
+        distance = estimate_edit_distance(sketch_a, sketch_c, len(self.code_a), len(self.code_c))
+        self.assertGreater(distance, 0.0)
+        self.assertLessEqual(distance, max(len(self.code_a), len(self.code_c)))
+
+    def test_pairwise_similarity(self):
+        """Test the pairwise similarity matrix"""
+        sketches = [compute_minhash(code) for code in (self.code_a, self.code_b, self.code_c)]
+        matrix = pairwise_similarity(sketches)
+
+        self.assertEqual(matrix.shape, (3, 3))
+        for i in range(3):
+            self.assertEqual(matrix[i, i], 1.0)
+        self.assertAlmostEqual(matrix[0, 1], minhash_similarity(sketches[0], sketches[1]))
+
+    def test_lsh_query(self):
+        """Test that the LSH index returns similar sketches and honors removal"""
+        lsh = MinHashLSH(num_perm=64, num_bands=16)
+        lsh.add("a", compute_minhash(self.code_a))
+        lsh.add("c", compute_minhash(self.code_c))
+
+        matches = lsh.query(compute_minhash(self.code_a), threshold=0.9)
+        self.assertEqual(matches[0], ("a", 1.0))
+        self.assertNotIn("c", [key for key, _ in matches])
+
+        lsh.remove("a")
+        self.assertNotIn("a", lsh)
+        self.assertEqual(lsh.query(compute_minhash(self.code_a), threshold=0.9), [])
+
+    def test_lsh_rejects_invalid_bands(self):
+        """Test that the band count must divide the sketch size"""
+        with self.assertRaises(ValueError):
+            MinHashLSH(num_perm=64, num_bands=10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+"""
+Tests for token counting utilities in openevolve.utils.token_utils
+"""
+
+import unittest
+
+from openevolve.utils.token_utils import count_tokens, truncate_to_tokens
+
+
+class TestTokenUtils(unittest.TestCase):
+    """Tests for token utilities"""
+
+    def test_count_tokens(self):
+        """Test that token counts grow with the text and are zero for empty text"""
+        self.assertEqual(count_tokens(""), 0)
+        short = count_tokens("def f(x):\n    return x\n")
+        self.assertGreater(short, 0)
+        self.assertGreater(count_tokens("def f(x):\n    return x\n" * 10), short)
+
+    def test_truncate_to_tokens(self):
+        """Test that truncation respects the budget and cuts at line boundaries"""
+        text = "\n".join(f"line number {i}" for i in range(200))
+
+        self.assertEqual(truncate_to_tokens(text, 10_000), text)
+
+        truncated = truncate_to_tokens(text, 50)
+        self.assertLessEqual(count_tokens(truncated), 50)
+        self.assertTrue(truncated.endswith("\n... (truncated)"))
+        body = truncated[: -len("\n... (truncated)")]
+        self.assertTrue(text.startswith(body))
+        self.assertIn(body.split("\n")[-1], text.split("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests for the visualizer's checkpoint cache and API endpoints
+"""
+
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from openevolve.config import DatabaseConfig
+from openevolve.database import Program, ProgramDatabase
+from openevolve.event_log import EVENT_LOG_FILE, EventLog
+
+VISUALIZER_PATH = os.path.join(os.path.dirname(__file__), "..", "scripts", "visualizer.py")
+spec = importlib.util.spec_from_file_location("visualizer", VISUALIZER_PATH)
+visualizer = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(visualizer)
+
+
+def make_program(i, parent=None, iteration=0):
+    return Program(
+        id=f"p{i}",
+        code=f"x = {i}",
+        parent_id=parent,
+        generation=i,
+        iteration_found=iteration,
+        metrics={"score": i / 10},
+    )
+
+
+class TestVisualizer(unittest.TestCase):
+    """Tests for the visualizer API against a temporary run directory"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = self.temp_dir.name
+        self.event_log = EventLog(os.path.join(self.output_dir, EVENT_LOG_FILE))
+
+        # A chain of programs p0 <- p1 <- ... <- p4 in one checkpoint
+        self.database = ProgramDatabase(DatabaseConfig(num_islands=1))
+        for i in range(5):
+            self.database.add(make_program(i, f"p{i - 1}" if i else None), iteration=i)
+        self._save_checkpoint(5)
+
+        self.env = patch.dict(
+            os.environ, {"EVOLVE_OUTPUT": self.output_dir, "EVOLVE_POLL_INTERVAL": "0"}
+        )
+        self.env.start()
+        visualizer.cache = visualizer.CheckpointCache()
+        self.client = visualizer.app.test_client()
+
+    def tearDown(self):
+        self.env.stop()
+        self.event_log.close()
+        self.temp_dir.cleanup()
+
+    def _save_checkpoint(self, iteration):
+        path = os.path.join(self.output_dir, "checkpoints", f"checkpoint_{iteration}")
+        self.database.save(path, iteration)
+        # Later checkpoints are found by their modification time
+        os.utime(path, (iteration, iteration))
+
+    def _log_program(self, program):
+        self.event_log.append(
+            "program", iteration=program.iteration_found, island=0, program=program.to_dict()
+        )
+
+    def test_nodes_paginated_and_sorted(self):
+        """Test paging through node summaries sorted by a metric, with clamped bounds"""
+        page = self.client.get("/api/nodes?sort=score&offset=1&limit=2").get_json()
+        self.assertEqual(page["total"], 5)
+        self.assertEqual([node["id"] for node in page["nodes"]], ["p3", "p2"])
+        self.assertEqual(set(page["nodes"][0]), set(visualizer.SUMMARY_FIELDS))
+
+        page = self.client.get("/api/nodes?offset=-3&limit=0").get_json()
+        self.assertEqual((page["offset"], page["limit"], len(page["nodes"])), (0, 1, 1))
+        page = self.client.get("/api/nodes?offset=4&limit=5000").get_json()
+        self.assertEqual((page["limit"], len(page["nodes"])), (1000, 1))
+
+    def test_program_and_lineage(self):
+        """Test fetching a program and its lineage cut off at a depth"""
+        self.assertEqual(self.client.get("/api/program/p2").get_json()["code"], "x = 2")
+        self.assertEqual(self.client.get("/api/program/missing").status_code, 404)
+
+        lineage = self.client.get("/api/lineage/p2?depth=1").get_json()
+        self.assertEqual([node["id"] for node in lineage["nodes"]], ["p2", "p1", "p0", "p3"])
+        self.assertEqual(
+            sorted((edge["source"], edge["target"]) for edge in lineage["edges"]),
+            [("p0", "p1"), ("p1", "p2"), ("p2", "p3")],
+        )
+        lineage = self.client.get("/api/lineage/p4?depth=0").get_json()
+        self.assertEqual(len(lineage["nodes"]), 5)
+        self.assertEqual(self.client.get("/api/lineage/missing").status_code, 404)
+
+    def test_deltas_merged_across_checkpoint_reload(self):
+        """Test that changes from the event log and a new checkpoint merge into one delta"""
+        cache = visualizer.cache
+        cache.get(self.output_dir)
+        start = cache.version
+
+        self._log_program(make_program(5, "p4", iteration=6))
+        cache.get(self.output_dir)
+        delta = cache.changes_since(start)
+        self.assertEqual(delta["kind"], "programs")
+        self.assertEqual([node["id"] for node in delta["added"]], ["p5"])
+        self.assertEqual(cache.children["p4"], ["p5"])
+
+        # The next checkpoint contains p5 and a new p6 but no longer p0
+        self.database.add(make_program(5, "p4"), iteration=6)
+        self.database.add(make_program(6, "p5"), iteration=7)
+        self.database._remove_program("p0")
+        self._save_checkpoint(7)
+        cache.get(self.output_dir)
+
+        delta = cache.changes_since(start)
+        self.assertEqual(delta["kind"], "checkpoint")
+        self.assertEqual(delta["version"], start + 2)
+        self.assertEqual(sorted(node["id"] for node in delta["added"]), ["p5", "p6"])
+        self.assertEqual(delta["removed"], ["p0"])
+        self.assertEqual(cache.changes_since(cache.version)["added"], [])
+
+    def test_reset_when_client_falls_behind(self):
+        """Test that a client more than MAX_DELTAS versions behind is told to reset"""
+        cache = visualizer.cache
+        cache.get(self.output_dir)
+        start = cache.version
+
+        for i in range(visualizer.MAX_DELTAS + 1):
+            self._log_program(make_program(10 + i, "p4", iteration=10 + i))
+            cache.get(self.output_dir)
+
+        self.assertIsNone(cache.changes_since(start))
+        self.assertIsNotNone(cache.changes_since(start + 1))
+
+        response = self.client.get(
+            "/api/events", headers={"Last-Event-ID": str(start)}, buffered=False
+        )
+        try:
+            first_event = next(iter(response.response)).decode()
+        finally:
+            response.close()
+        self.assertTrue(first_event.startswith("event: reset\n"))
+        self.assertIn(f"id: {cache.version}\n", first_event)
+
+
+if __name__ == "__main__":
+    unittest.main()